@@ -29,4 +29,6 @@ from chemtools.conceptual.exponential import *
 from chemtools.conceptual.rational import *
 from chemtools.conceptual.cubic import *
 from chemtools.conceptual.general import *
+from chemtools.conceptual.batch import *
+from chemtools.conceptual.lazy import *
 from chemtools.conceptual.mixed import *
@@ -29,9 +29,11 @@ linear, quadratic, exponential, general energy models.
 
 import logging
 import numpy as np
-import sympy as sp
 
 from scipy.optimize import newton
+from scipy.special import comb
+
+from chemtools.conceptual.utils import broadcast_value
 
 
 __all__ = ["BaseGlobalTool", "BaseLocalTool", "BaseCondensedTool"]
@@ -271,8 +273,8 @@ class BaseGlobalTool(object):
 
         Parameters
         ----------
-        n_elec: float
-            Number of electrons, :math:`N_{\text{elec}}`.
+        n_elec: float or np.ndarray
+            Number of electrons, :math:`N_{\text{elec}}`, or array of number of electrons.
         """
         raise NotImplementedError
 
@@ -290,8 +292,8 @@ class BaseGlobalTool(object):
 
         Parameters
         ----------
-        n_elec: float
-            Number of electrons, :math:`N_{\text{elec}}`.
+        n_elec: float or np.ndarray
+            Number of electrons, :math:`N_{\text{elec}}`, or array of number of electrons.
         order : int, default=1
             The order of derivative denoted by :math:`n` in the formula.
 
@@ -315,8 +317,8 @@ class BaseGlobalTool(object):
 
         Parameters
         ----------
-        n_elec : float
-            Number of electrons, :math:`N_{\text{elec}}`.
+        n_elec : float or np.ndarray
+            Number of electrons, :math:`N_{\text{elec}}`, or array of number of electrons.
         """
         if n_elec is None or self.energy_derivative(n_elec, 1) is None:
             return None
@@ -377,12 +379,13 @@ class BaseGlobalTool(object):
 
         Parameters
         ----------
-        n_elec : float
-            Number of electrons, :math:`N_{\text{elec}}`.
+        n_elec : float or np.ndarray
+            Number of electrons, :math:`N_{\text{elec}}`, or array of number of electrons.
+            For an array, the derivatives which are not defined are set to ``np.nan``.
         order : int, default=1
             The order of derivative denoted by :math:`n` in the formula.
         """
-        if n_elec is not None and n_elec < 0.0:
+        if n_elec is not None and np.any(np.asarray(n_elec) < 0.0):
             raise ValueError('Number of electrons cannot be negativ! #elec={0}'.format(n_elec))
         if not (isinstance(order, int) and order > 0):
             raise ValueError('Argument order should be an integer greater than or equal to 1.')
@@ -395,7 +398,12 @@ class BaseGlobalTool(object):
         elif order == 2:
             # 2nd order derivative is inverse hardness
             hardness = self.energy_derivative(n_elec, order=2)
-            if hardness is not None and hardness != 0.0:
+            if isinstance(n_elec, np.ndarray):
+                hardness = broadcast_value(hardness, n_elec)
+                deriv = np.full(n_elec.shape, np.nan)
+                mask = hardness != 0.0
+                deriv[mask] = -1.0 / hardness[mask]
+            elif hardness is not None and hardness != 0.0:
                 deriv = -1.0 / hardness
             else:
                 deriv = None
@@ -409,8 +417,8 @@ class BaseGlobalTool(object):
             else:
                 deriv = 0
                 for k in xrange(1, order - 1):
-                    deriv -= g_deriv[k - 1] * sp.bell(order - 1, k, e_deriv[:order - k])
-                deriv /= sp.bell(order - 1, order - 1, [e_deriv[0]])
+                    deriv -= g_deriv[k - 1] * _bell_polynomial(order - 1, k, e_deriv[:order - k])
+                deriv /= _bell_polynomial(order - 1, order - 1, [e_deriv[0]])
         return deriv
 
     def grand_potential_mu(self, mu):
@@ -425,8 +433,8 @@ class BaseGlobalTool(object):
 
         Parameters
         ----------
-        mu : float
-            Chemical potential :math:`\mu`.
+        mu : float or np.ndarray
+            Chemical potential :math:`\mu`, or array of chemical potentials.
         """
         # find N corresponding to the given mu
         n_elec = self.convert_mu_to_n(mu)
@@ -459,8 +467,8 @@ class BaseGlobalTool(object):
 
         Parameters
         ----------
-        mu : float
-            Chemical potential, :math:`\mu`.
+        mu : float or np.ndarray
+            Chemical potential, :math:`\mu`, or array of chemical potentials.
         order : int, default=1
             The order of derivative denoted by :math:`n` in the formula.
         """
@@ -484,11 +492,14 @@ class BaseGlobalTool(object):
 
         Here we solve for :math:`N` which results in the specified :math:`\mu` according to the
         equation above, i.e. :math:`N(\mu) = \mu^{-1}(N)`, using ``scipy.optimize.newton``.
+        For an array of :math:`\mu` values, the closed-form inverse of the energy model is used
+        if available, otherwise the Newton iterations are performed for all values at once.
+        The :math:`N` values which could not be found are set to ``np.nan``.
 
         Parameters
         ----------
-        mu : float
-            Chemical potential, :math:`\mu`.
+        mu : float or np.ndarray
+            Chemical potential, :math:`\mu`, or array of chemical potentials.
         guess : float, default=None
             Initial guess used for solving for :math:`N`.
             If ``None``, the reference number of electrons :math:`N_0` is used as an initial guess.
@@ -496,6 +507,15 @@ class BaseGlobalTool(object):
         # assign an initial guess for N
         if guess is None:
             guess = self._n0
+        if isinstance(mu, np.ndarray):
+            n_elec = self._convert_mu_to_n_array(mu.astype(float), guess)
+            # only non-negative number of electrons are acceptable
+            with np.errstate(invalid='ignore'):
+                n_elec[~(n_elec >= 0.)] = np.nan
+            if np.any(np.isnan(n_elec)):
+                logging.warning("Number of electrons corresponding to {0} out of {1} mu values "
+                                "could not be found!".format(np.sum(np.isnan(n_elec)), mu.size))
+            return n_elec
         # solve for N corresponding to the given mu using scipy.optimize.newton
         try:
             n_elec = newton(lambda n: self.energy_derivative(n, 1) - mu,
@@ -513,6 +533,50 @@ class BaseGlobalTool(object):
                             "mu(N={0})={2}".format(n_elec, mu, self.energy_derivative(n_elec, 1)))
         return n_elec
 
+    def _convert_mu_to_n_array(self, mu, guess, tol=1.48e-8, maxiter=50):
+        r"""Return array of :math:`N` values matching the array of :math:`\mu` values.
+
+        The Newton iterations are performed for all :math:`\mu` values at once, and values for
+        which the iterations do not converge are set to ``np.nan``. Subclasses with a closed-form
+        inverse of :math:`\mu(N)` override this method.
+        """
+        n_elec = np.zeros(mu.shape) + guess
+        active = np.ones(mu.shape, dtype=bool)
+        for _ in range(maxiter):
+            if not np.any(active):
+                break
+            n_active = n_elec[active]
+            value = self.energy_derivative(n_active, 1) - mu[active]
+            deriv = self.energy_derivative(n_active, 2)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = value / deriv
+                n_new = n_active - step
+                failed = ~np.isfinite(n_new) | (n_new < 0.)
+                converged = ~failed & (np.abs(step) < tol)
+            n_new[failed] = np.nan
+            n_elec[active] = n_new
+            active[active] = ~(failed | converged)
+        # values which did not converge within maxiter iterations
+        n_elec[active] = np.nan
+        return n_elec
+
+
+def _bell_polynomial(n, k, values):
+    r"""Return the incomplete (partial) Bell polynomial :math:`B_{n,k}(x_1, \dots, x_{n-k+1})`.
+
+    The recurrence relation :math:`B_{n,k} = \sum_{i=1}^{n-k+1} \binom{n-1}{i-1} x_i
+    B_{n-i,k-1}` is used, so the values :math:`x_i` can be floats or arrays.
+    """
+    if n == 0 and k == 0:
+        return 1.
+    if n == 0 or k == 0:
+        return 0.
+    result = 0.
+    for i in range(1, n - k + 2):
+        result = result + comb(n - 1, i - 1, exact=True) * values[i - 1] * \
+            _bell_polynomial(n - i, k - 1, values)
+    return result
+
 
 class BaseLocalTool(object):
     """Base class of local conceptual DFT reactivity descriptors."""
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Conceptual Density Functional Theory (DFT) Global Reactivity Tools for Many Molecules.
+
+This module contains the global tool class which evaluates the energy models of many molecules
+at once, given the energy values of each molecule as a row of an array.
+"""
+
+
+import numpy as np
+
+from chemtools.conceptual.linear import linear_params, linear_energy, linear_energy_derivative
+from chemtools.conceptual.quadratic import (quadratic_params, quadratic_energy,
+                                            quadratic_energy_derivative)
+from chemtools.conceptual.exponential import (exponential_params, exponential_energy,
+                                              exponential_energy_derivative)
+from chemtools.conceptual.rational import (rational_params, rational_energy,
+                                           rational_energy_derivative)
+from chemtools.conceptual.cubic import cubic_params, cubic_energy, cubic_energy_derivative
+from chemtools.conceptual.squareroot import (squareroot_params, squareroot_energy,
+                                             squareroot_energy_derivative)
+
+
+__all__ = ["BatchGlobalTool"]
+
+
+class BatchGlobalTool(object):
+    r"""
+    Class of global conceptual DFT reactivity descriptors of many molecules.
+
+    The parameters of the energy model of all molecules are computed at once from the arrays of
+    :math:`E(N_0 - 1)`, :math:`E(N_0)` and :math:`E(N_0 + 1)` values, and each descriptor is
+    returned as an array with one value per molecule. The descriptors are the same as the
+    corresponding attributes of the global tool class of each energy model, except that the
+    undefined values (``None``) are represented by ``np.nan``. Molecules whose energy values are
+    not acceptable for the model (e.g. non-monotonic energies for the exponential model) get
+    ``np.nan`` descriptors, instead of raising an error.
+    """
+
+    models = ["linear", "quadratic", "exponential", "rational", "cubic", "squareroot"]
+
+    descriptors = ["n0", "ip", "ea", "mu", "eta", "electronegativity", "softness",
+                   "hyper_hardness", "n_max", "electrophilicity", "nucleofugality",
+                   "electrofugality"]
+
+    def __init__(self, energies, n0, model="quadratic", omega=0.5):
+        r"""Initialize energy model of many molecules.
+
+        Parameters
+        ----------
+        energies : np.ndarray, shape=(M, 3)
+            Energy values of M molecules, where each row contains the :math:`E(N_0 - 1)`,
+            :math:`E(N_0)` and :math:`E(N_0 + 1)` values of one molecule.
+        n0 : int or np.ndarray, shape=(M,)
+            Reference number of electrons of all molecules, or of each molecule.
+        model : str, optional
+            Energy model, i.e. "linear", "quadratic", "exponential", "rational", "cubic"
+            or "squareroot".
+        omega : float, optional
+            Value of omega parameter of the cubic energy model.
+        """
+        energies = np.asarray(energies, dtype=float)
+        if energies.ndim != 2 or energies.shape[1] != 3:
+            raise ValueError("Argument energies should be a 2D-array with 3 columns! "
+                             "Given energies.shape={0}".format(energies.shape))
+        n0 = np.asarray(n0, dtype=float)
+        if n0.ndim == 0:
+            n0 = np.full(energies.shape[0], n0)
+        if n0.shape != (energies.shape[0],):
+            raise ValueError("Argument n0 should be a number or an array with {0} values! "
+                             "Given n0.shape={1}".format(energies.shape[0], n0.shape))
+        if np.any(n0 < 1):
+            raise ValueError("The n0 cannot be less than one! Given min(n0)={0}".format(n0.min()))
+        if model.lower() not in self.models:
+            raise ValueError("Model={0} is not available!".format(model.lower()))
+        self._model = model.lower()
+        self._n0 = n0
+        self._omega = omega
+        # compute parameters & N_max of energy model for all molecules
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._params, n_max = self._compute_params(*energies.T)
+        self._n_max = n_max + np.zeros(n0.shape)
+
+    @property
+    def model(self):
+        """Energy model."""
+        return self._model
+
+    @property
+    def n0(self):
+        """Reference number of electrons of molecules, i.e. :math:`N_0`."""
+        return self._n0
+
+    @property
+    def n_max(self):
+        r"""Maximum number of electrons that molecules can accept, i.e. :math:`N_{\text{max}}`."""
+        return self._n_max
+
+    @property
+    def ip(self):
+        r"""Ionization potential of molecules, :math:`IP = E\left(N_0 - 1\right) - E(N_0)`."""
+        return self.energy(self._n0 - 1) - self.energy(self._n0)
+
+    @property
+    def ea(self):
+        r"""Electron affinity of molecules, :math:`EA = E(N_0) - E\left(N_0 + 1\right)`."""
+        return self.energy(self._n0) - self.energy(self._n0 + 1)
+
+    @property
+    def mu(self):
+        r"""Chemical potential of molecules, i.e. first derivative of energy at :math:`N_0`."""
+        return self.energy_derivative(self._n0, 1)
+
+    @property
+    def eta(self):
+        r"""Chemical hardness of molecules, i.e. second derivative of energy at :math:`N_0`."""
+        return self.energy_derivative(self._n0, 2)
+
+    @property
+    def electronegativity(self):
+        r"""Mulliken electronegativity of molecules, :math:`\chi = - \mu`."""
+        return - self.mu
+
+    @property
+    def softness(self):
+        r"""Chemical softness of molecules, :math:`S = 1 / \eta`."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = 1. / self.eta
+        value[~np.isfinite(value)] = np.nan
+        return value
+
+    @property
+    def hyper_hardness(self):
+        r"""Second-order hyper-hardness, i.e. third derivative of energy at :math:`N_0`."""
+        return self.energy_derivative(self._n0, 3)
+
+    @property
+    def electrophilicity(self):
+        r"""Electrophilicity of molecules.
+
+        .. math::
+           \omega_{\text{electrophilicity}} = \text{sgn}\left(N_{\text{max}} - N_0\right)
+                                              \times \left(E(N_0) - E(N_{\text{max}})\right)
+        """
+        sign = np.sign(self._n_max - self._n0)
+        return sign * (self.energy(self._n0) - self.energy(self._n_max))
+
+    @property
+    def nucleofugality(self):
+        r"""Nucleofugality of molecules.
+
+        .. math::
+           \nu_{\text{nucleofugality}} = \text{sgn}\left(N_0 + 1 - N_{\text{max}}\right)
+                                         \times \left(E(N_0 + 1) - E(N_{\text{max}})\right)
+        """
+        sign = np.sign(self._n0 + 1 - self._n_max)
+        return sign * (self.energy(self._n0 + 1) - self.energy(self._n_max))
+
+    @property
+    def electrofugality(self):
+        r"""Electrofugality of molecules.
+
+        .. math::
+           \nu_{\text{electrofugality}} = \text{sgn}\left(N_{\text{max}} - N_0 + 1\right)
+                                          \times \left(E(N_0 - 1) - E(N_{\text{max}})\right)
+        """
+        sign = np.sign(self._n_max - self._n0 + 1)
+        return sign * (self.energy(self._n0 - 1) - self.energy(self._n_max))
+
+    def energy(self, n_elec):
+        r"""Return energy of molecules evaluated for the given number of electrons.
+
+        Parameters
+        ----------
+        n_elec : np.ndarray, shape=(M,)
+            Number of electrons of each molecule.
+        """
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return self._energy(np.asarray(n_elec, dtype=float))
+
+    def energy_derivative(self, n_elec, order=1):
+        r"""Return derivative of energy of molecules evaluated for the given number of electrons.
+
+        Parameters
+        ----------
+        n_elec : np.ndarray, shape=(M,)
+            Number of electrons of each molecule.
+        order : int, default=1
+            The order of derivative.
+        """
+        if not (isinstance(order, int) and order > 0):
+            raise ValueError("Argument order should be an integer greater than or equal to 1.")
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return self._energy_derivative(np.asarray(n_elec, dtype=float), order)
+
+    def table(self, names=None):
+        """Return structured array of descriptors with one row per molecule.
+
+        Parameters
+        ----------
+        names : sequence of str, optional
+            Name of descriptors (columns) to include. If None, all :attr:`descriptors` are used.
+        """
+        if names is None:
+            names = self.descriptors
+        for name in names:
+            if name not in self.descriptors:
+                raise ValueError("Descriptor {0} is not available!".format(name))
+        result = np.empty(len(self._n0), dtype=[(str(name), float) for name in names])
+        for name in names:
+            result[name] = getattr(self, name)
+        return result
+
+    def to_csv(self, fname, names=None):
+        """Write table of descriptors with one row per molecule to a CSV file.
+
+        Parameters
+        ----------
+        fname : str
+            Name of the CSV file.
+        names : sequence of str, optional
+            Name of descriptors (columns) to include. If None, all :attr:`descriptors` are used.
+        """
+        table = self.table(names)
+        np.savetxt(fname, np.column_stack([table[name] for name in table.dtype.names]),
+                   delimiter=",", header=",".join(table.dtype.names), comments="", fmt="%.10e")
+
+    def _compute_params(self, energy_m, energy_0, energy_p):
+        """Return parameters & N_max of energy model, which are nan for unacceptable energies."""
+        n_ref = self._n0
+        if self._model == "linear":
+            return linear_params(n_ref, energy_m, energy_0, energy_p)
+        elif self._model == "quadratic":
+            return quadratic_params(n_ref, energy_m, energy_0, energy_p)
+        elif self._model == "cubic":
+            return cubic_params(n_ref, energy_m, energy_0, energy_p, self._omega)
+        elif self._model == "squareroot":
+            params, n_max = squareroot_params(n_ref, energy_m, energy_0, energy_p)
+            # if parameter b is zero, it is a linear model (and N_max is nan)
+            valid = ~np.isnan(n_max)
+        elif self._model == "exponential":
+            params, n_max = exponential_params(n_ref, energy_m, energy_0, energy_p)
+            # energy values should be monotonic, see ExponentialGlobalTool
+            valid = (energy_m > energy_0) & (energy_0 > energy_p)
+        else:
+            params, n_max = rational_params(n_ref, energy_m, energy_0, energy_p)
+            # energy values should be monotonic, see RationalGlobalTool
+            valid = (energy_m > energy_0) & (energy_0 >= energy_p)
+        return [np.where(valid, param, np.nan) for param in params], n_max
+
+    def _energy(self, n_elec):
+        """Return energy of molecules for the given array of number of electrons."""
+        if self._model == "linear":
+            return linear_energy(self._params, self._n0, n_elec)
+        elif self._model == "quadratic":
+            return quadratic_energy(self._params, n_elec)
+        elif self._model == "exponential":
+            return exponential_energy(self._params, self._n0, n_elec)
+        elif self._model == "rational":
+            return rational_energy(self._params, n_elec)
+        elif self._model == "cubic":
+            return cubic_energy(self._params, self._n0, n_elec)
+        return squareroot_energy(self._params, n_elec)
+
+    def _energy_derivative(self, n_elec, order):
+        """Return derivative of energy of molecules for the given array of number of electrons."""
+        if self._model == "linear":
+            return linear_energy_derivative(self._params, self._n0, n_elec, order)
+        elif self._model == "quadratic":
+            return quadratic_energy_derivative(self._params, n_elec, order)
+        elif self._model == "exponential":
+            return exponential_energy_derivative(self._params, self._n0, n_elec, order)
+        elif self._model == "rational":
+            return rational_energy_derivative(self._params, n_elec, order)
+        elif self._model == "cubic":
+            return cubic_energy_derivative(self._params, self._n0, n_elec, order)
+        return squareroot_energy_derivative(self._params, n_elec, order)
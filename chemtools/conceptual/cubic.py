@@ -30,7 +30,7 @@ import numpy as np
 
 from chemtools.utils.utils import doc_inherit
 from chemtools.conceptual.base import BaseGlobalTool
-from chemtools.conceptual.utils import check_dict_values, check_number_electrons
+from chemtools.conceptual.utils import check_dict_values, check_number_electrons, broadcast_value
 
 
 __all__ = ["CubicGlobalTool"]
@@ -74,15 +74,13 @@ class CubicGlobalTool(BaseGlobalTool):
         """
         # check number of electrons & energy values
         n_ref, energy_m, energy_0, energy_p = check_dict_values(dict_energy)
-        # compute parameters of energy model
-        param_a = energy_0
-        param_b = -omega * energy_m + 2. * omega * energy_0 - omega * energy_p
-        param_b += energy_p - energy_0
-        param_c = (energy_m - 2. * energy_0 + energy_p) / 2.
-        param_d = (2. * omega - 1.) * (energy_m - 2. * energy_0 + energy_p) / 2.
+        # compute parameters of energy model & N_max (which is not defined)
+        params, n_max = cubic_params(n_ref, energy_m, energy_0, energy_p, omega)
+        if np.isnan(n_max):
+            n_max = None
         self._omega = omega
-        self._params = np.array([param_a, param_b, param_c, param_d])
-        super(CubicGlobalTool, self).__init__(n_ref, None)
+        self._params = np.array(params)
+        super(CubicGlobalTool, self).__init__(n_ref, n_max)
         self.dict_energy = dict_energy
 
     @property
@@ -99,12 +97,8 @@ class CubicGlobalTool(BaseGlobalTool):
     def energy(self, n_elec):
         # check n_elec argument
         check_number_electrons(n_elec, self._n0 - 1, self._n0 + 1)
-        # compute the change in the number of electrons w.r.t. N0
-        delta_n = n_elec - self._n0
         # compute energy
-        result = self._params[0] + self._params[1] * delta_n + self._params[2] * delta_n ** 2
-        result += self._params[3] * delta_n ** 3.
-        return result
+        return cubic_energy(self._params, self._n0, n_elec)
 
     @doc_inherit(BaseGlobalTool)
     def energy_derivative(self, n_elec, order=1):
@@ -113,16 +107,102 @@ class CubicGlobalTool(BaseGlobalTool):
         # check order
         if not (isinstance(order, int) and order > 0):
             raise ValueError("Argument order should be an integer greater than or equal to 1.")
-        # compute the change in the number of electrons w.r.t. N0
-        delta_n = n_elec - self._n0
         # compute derivative of energy
-        if order == 1:
-            result = self._params[1] + 2. * self._params[2] * delta_n + \
-                     3. * self._params[3] * delta_n ** 2.
-        elif order == 2:
-            result = 2. * self._params[2] + 6. * self._params[3] * delta_n
-        elif order == 3:
-            result = 6. * self._params[3]
-        else:
-            result = 0
-        return result
+        return cubic_energy_derivative(self._params, self._n0, n_elec, order)
+
+    def _convert_mu_to_n_array(self, mu, guess, tol=1.48e-8, maxiter=50):
+        r"""Return array of :math:`N` values using the closed-form inverse of :math:`\mu(N)`."""
+        # closed-form inverse of mu(N) = b + 2c dN + 3d dN^2 on the monotonic branch of N0
+        _, param_b, param_c, param_d = self._params
+        n_elec = np.full(mu.shape, np.nan)
+        if param_d == 0.:
+            if param_c != 0.:
+                n_elec = self._n0 + (mu - param_b) / (2. * param_c)
+            return n_elec
+        discriminant = 4. * param_c**2 + 12. * param_d * (mu - param_b)
+        mask = discriminant >= 0.
+        sign = np.sign(param_c) if param_c != 0. else 1.
+        n_elec[mask] = self._n0 + (-2. * param_c + sign * np.sqrt(discriminant[mask])) / \
+            (6. * param_d)
+        return n_elec
+
+
+def cubic_params(n_ref, energy_m, energy_0, energy_p, omega=0.5):
+    """Return parameters :math:`a`, :math:`b`, :math:`c` & :math:`d` of cubic model and N_max.
+
+    The arguments can be numbers, or arrays with the values of many molecules. The parameters are
+    given in terms of :math:`N - N_0`.
+
+    Parameters
+    ----------
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    energy_m : float or np.ndarray
+        Energy of the :math:`N_0 - 1` electron system.
+    energy_0 : float or np.ndarray
+        Energy of the :math:`N_0` electron system.
+    energy_p : float or np.ndarray
+        Energy of the :math:`N_0 + 1` electron system.
+    omega : float, optional
+        Value of omega parameter in the energy model.
+
+    Returns
+    -------
+    params : list
+        Parameters :math:`a`, :math:`b`, :math:`c` & :math:`d` of energy model.
+    n_max : float or np.ndarray
+        Maximum number of electrons, which is ``np.nan`` (not defined).
+    """
+    param_a = energy_0
+    param_b = -omega * energy_m + 2. * omega * energy_0 - omega * energy_p
+    param_b += energy_p - energy_0
+    param_c = (energy_m - 2. * energy_0 + energy_p) / 2.
+    param_d = (2. * omega - 1.) * (energy_m - 2. * energy_0 + energy_p) / 2.
+    n_max = np.full(np.shape(n_ref), np.nan)[()]
+    return [param_a, param_b, param_c, param_d], n_max
+
+
+def cubic_energy(params, n_ref, n_elec):
+    """Return energy of cubic energy model, see :func:`CubicGlobalTool.energy`.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`cubic_params`.
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    """
+    # compute the change in the number of electrons w.r.t. N0
+    delta_n = n_elec - n_ref
+    result = params[0] + params[1] * delta_n + params[2] * delta_n ** 2
+    result += params[3] * delta_n ** 3.
+    return result
+
+
+def cubic_energy_derivative(params, n_ref, n_elec, order):
+    """Return derivative of cubic energy model w.r.t. number of electrons.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`cubic_params`.
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    order : int
+        The order of derivative.
+    """
+    # compute the change in the number of electrons w.r.t. N0
+    delta_n = n_elec - n_ref
+    if order == 1:
+        result = params[1] + 2. * params[2] * delta_n + 3. * params[3] * delta_n ** 2.
+    elif order == 2:
+        result = 2. * params[2] + 6. * params[3] * delta_n
+    elif order == 3:
+        result = broadcast_value(6. * params[3], n_elec)
+    else:
+        result = broadcast_value(0, n_elec)
+    return result
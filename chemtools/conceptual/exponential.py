@@ -26,7 +26,6 @@ This module contains the global tool class corresponding to exponential energy m
 """
 
 
-import math
 import numpy as np
 
 from chemtools.conceptual.base import BaseGlobalTool
@@ -76,15 +75,8 @@ class ExponentialGlobalTool(BaseGlobalTool):
             energies = [energy_m, energy_0, energy_p]
             raise ValueError("For exponential model, the energy values for consecutive number of "
                              "electrons should be monotonic! E={0}".format(energies))
-        # calculate parameters A, B, gamma parameters of the exponential model
-        param_a = (energy_m - energy_0) * (energy_0 - energy_p)
-        param_a /= (energy_m - 2 * energy_0 + energy_p)
-        param_b = energy_0 - param_a
-        param_g = (energy_m - 2 * energy_0 + energy_p) / (energy_p - energy_0)
-        param_g = math.log(1. - param_g)
-        self._params = [param_a, param_g, param_b]
-        # calculate N_max
-        n_max = float("inf")
+        # calculate parameters A, B, gamma parameters of the exponential model & N_max
+        self._params, n_max = exponential_params(n_ref, energy_m, energy_0, energy_p)
         super(ExponentialGlobalTool, self).__init__(n_ref, n_max)
         self.dict_energy = dict_energy
 
@@ -98,13 +90,7 @@ class ExponentialGlobalTool(BaseGlobalTool):
         # check n_elec argument
         check_number_electrons(n_elec, self._n0 - 1, self._n0 + 1)
         # evaluate energy
-        if np.isinf(n_elec):
-            # limit of E(N) as N goes to infinity equals B
-            value = self._params[2]
-        else:
-            dn = n_elec - self._n0
-            value = self._params[0] * math.exp(- self._params[1] * dn) + self._params[2]
-        return value
+        return exponential_energy(self._params, self._n0, n_elec)
 
     @doc_inherit(BaseGlobalTool)
     def energy_derivative(self, n_elec, order=1):
@@ -114,10 +100,80 @@ class ExponentialGlobalTool(BaseGlobalTool):
         if not (isinstance(order, int) and order > 0):
             raise ValueError("Argument order should be an integer greater than or equal to 1.")
         # evaluate derivative
-        if np.isinf(n_elec):
-            # limit of E(N) derivatives as N goes to infinity equals zero
-            deriv = 0.0
-        else:
-            dn = n_elec - self._n0
-            deriv = self._params[0] * (- self._params[1])**order * math.exp(- self._params[1] * dn)
-        return deriv
+        return exponential_energy_derivative(self._params, self._n0, n_elec, order)
+
+    def _convert_mu_to_n_array(self, mu, guess, tol=1.48e-8, maxiter=50):
+        r"""Return array of :math:`N` values using the closed-form inverse of :math:`\mu(N)`."""
+        # closed-form inverse of mu(N) = -A * gamma * exp(-gamma * (N - N0))
+        ratio = - mu / (self._params[0] * self._params[1])
+        n_elec = np.full(mu.shape, np.nan)
+        n_elec[ratio > 0.] = self._n0 - np.log(ratio[ratio > 0.]) / self._params[1]
+        return n_elec
+
+
+def exponential_params(n_ref, energy_m, energy_0, energy_p):
+    r"""Return parameters :math:`A`, :math:`\gamma` & :math:`B` of exponential model and N_max.
+
+    The arguments can be numbers, or arrays with the values of many molecules. The energy values
+    should be monotonic, see :class:`ExponentialGlobalTool`.
+
+    Parameters
+    ----------
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    energy_m : float or np.ndarray
+        Energy of the :math:`N_0 - 1` electron system.
+    energy_0 : float or np.ndarray
+        Energy of the :math:`N_0` electron system.
+    energy_p : float or np.ndarray
+        Energy of the :math:`N_0 + 1` electron system.
+
+    Returns
+    -------
+    params : list
+        Parameters :math:`A`, :math:`\gamma` & :math:`B` of energy model.
+    n_max : float or np.ndarray
+        Maximum number of electrons, which is infinity.
+    """
+    param_a = (energy_m - energy_0) * (energy_0 - energy_p)
+    param_a /= (energy_m - 2 * energy_0 + energy_p)
+    param_b = energy_0 - param_a
+    param_g = (energy_m - 2 * energy_0 + energy_p) / (energy_p - energy_0)
+    param_g = np.log(1. - param_g)
+    n_max = np.full(np.shape(n_ref), np.inf)[()]
+    return [param_a, param_g, param_b], n_max
+
+
+def exponential_energy(params, n_ref, n_elec):
+    """Return energy of exponential energy model, see :func:`ExponentialGlobalTool.energy`.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`exponential_params`.
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    """
+    # exp(-gamma * dn) goes to zero as N goes to infinity, so E(N) goes to B
+    value = params[0] * np.exp(- params[1] * (n_elec - n_ref)) + params[2]
+    return np.where(np.isinf(n_elec), params[2], value)[()]
+
+
+def exponential_energy_derivative(params, n_ref, n_elec, order):
+    """Return derivative of exponential energy model w.r.t. number of electrons.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`exponential_params`.
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    order : int
+        The order of derivative.
+    """
+    # exp(-gamma * dn) goes to zero as N goes to infinity, so derivatives go to zero
+    return params[0] * (- params[1])**order * np.exp(- params[1] * (n_elec - n_ref))
@@ -33,7 +33,7 @@ import sympy as sp
 
 from scipy.optimize import root, least_squares
 
-from chemtools.conceptual.utils import check_number_electrons
+from chemtools.conceptual.utils import check_number_electrons, broadcast_value
 from chemtools.utils.utils import doc_inherit
 from chemtools.conceptual.base import BaseGlobalTool
 
@@ -51,10 +51,13 @@ class GeneralGlobalTool(BaseGlobalTool):
     the corresponding number of electrons.
 
     The :math:`n^{\text{th}}`-order derivative of the symbolic energy model with respect to the
-    number of electrons at fixed external potential is calculated symbolically.
+    number of electrons at fixed external potential is calculated symbolically. The energy
+    expression and its derivatives are converted to NumPy functions once and cached per order,
+    so they can be evaluated for arrays of number of electrons.
     """
 
-    def __init__(self, expr, n0, n_energies, n_symbol=None, n0_symbol=None, guess=None, opts=None):
+    def __init__(self, expr, n0, n_energies, n_symbol=None, n0_symbol=None, guess=None, opts=None,
+                 order=3):
         """
         Initialize class.
 
@@ -79,7 +82,13 @@ class GeneralGlobalTool(BaseGlobalTool):
         opts : dict, optional
             Optional keyword arguments to pass to the :py:meth:`scipy.optimize.root` solver
             that is used to solve for the parameters in the model.
+        order : int, default=3
+            Maximum order of energy derivative that is precomputed. Derivatives of higher order
+            are computed on first use and cached.
         """
+        if not (isinstance(order, int) and order >= 0):
+            raise ValueError("Argument order should be a non-negative integer. Given order={0}"
+                             "".format(order))
         # make sure that the energy expression depends on number of electrons
         if n_symbol is None:
             n_symbol = sp.symbols('N')
@@ -108,6 +117,12 @@ class GeneralGlobalTool(BaseGlobalTool):
         # substitute values of parameters in energy expression
         self._expr = expr.subs(self._params.items())
 
+        # lambdify energy expression & its derivatives (the 0th-order derivative is the energy)
+        self._derivs = {0: self._expr}
+        self._funcs = {}
+        for index in range(order + 1):
+            self._get_function(index)
+
         # solve for N_max (number of electrons for which the 1st derivative of energy is zero)
         n_max = self._solve_nmax(n0)
 
@@ -133,7 +148,7 @@ class GeneralGlobalTool(BaseGlobalTool):
         # check n_elec argument
         check_number_electrons(n_elec, self._n_min, self._n_max)
         # evaluate energy
-        value = self._expr.subs(self._n_symb, n_elec)
+        value = self._get_function(0)(n_elec)
         return value
 
     @doc_inherit(BaseGlobalTool)
@@ -143,12 +158,25 @@ class GeneralGlobalTool(BaseGlobalTool):
         # check order
         if not (isinstance(order, int) and order > 0):
             raise ValueError("Argument order should be an integer greater than or equal to 1.")
-        # obtain derivative expression
-        deriv = self._expr.diff(self._n_symb, order)
         # evaluate derivative expression at n_elec
-        deriv = deriv.subs(self._n_symb, n_elec)
+        deriv = self._get_function(order)(n_elec)
         return deriv
 
+    def _get_function(self, order):
+        """Return cached NumPy function evaluating the given order derivative of energy.
+
+        The derivative expression is obtained by differentiating the cached expression of the
+        highest lower-order derivative, and the returned function broadcasts its value to the
+        shape of the number of electrons argument (also for constant derivatives).
+        """
+        if order not in self._funcs:
+            lower = max(key for key in self._derivs if key <= order)
+            for index in range(lower + 1, order + 1):
+                self._derivs[index] = self._derivs[index - 1].diff(self._n_symb)
+            func = sp.lambdify(self._n_symb, self._derivs[order], 'numpy')
+            self._funcs[order] = lambda n_elec, func=func: broadcast_value(func(n_elec), n_elec)
+        return self._funcs[order]
+
     def _solve_parameters(self, expr, n_energies, guess, opts=None):
         r"""
         Solve for the unknown parameters of the energy model.
@@ -231,8 +259,7 @@ class GeneralGlobalTool(BaseGlobalTool):
 
     def _solve_nmax(self, guess):
         r"""Solve for the :math:`N_{\text{max}}` of the energy model."""
-        d_expr = self._expr.diff(self._n_symb)
-        n_max_eqn = sp.lambdify(self._n_symb, d_expr, 'numpy')
+        n_max_eqn = self._get_function(1)
         result = root(n_max_eqn, guess)
         print result
         if result.success:
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Conceptual Density Functional Theory (DFT) Local Reactivity Tools Evaluated Lazily.
+
+This module contains the local tool class which evaluates the densities of the energy model on
+blocks of points only when a local descriptor is requested, and memoizes the descriptors.
+"""
+
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+__all__ = ["LazyLocalTool"]
+
+
+class LazyLocalTool(object):
+    r"""
+    Class of local conceptual DFT reactivity descriptors evaluated lazily on blocks of points.
+
+    The :math:`\rho_{N_0 - 1}(\mathbf{r})`, :math:`\rho_{N_0}(\mathbf{r})` and
+    :math:`\rho_{N_0 + 1}(\mathbf{r})` densities are not stored. When a descriptor is requested,
+    the densities of one block of points are computed, the local tool of the energy model is
+    built for the block, and the descriptor of the block is written into the output array.
+    So, only the requested descriptor is computed, and the peak memory is a few blocks on top
+    of the output array.
+
+    The computed descriptors are memoized, and the least recently used ones are evicted when
+    their total size exceeds the given memory budget.
+    """
+
+    def __init__(self, func_density, points, tool, n_max=None, global_softness=None,
+                 block_size=10000, memory=None):
+        r"""Initialize lazy local tool.
+
+        Parameters
+        ----------
+        func_density : callable
+            Function taking a (n, 3) array of points and returning the dictionary of number of
+            electrons (keys) and corresponding density arrays (values) on those points, as
+            expected by `tool`.
+        points : np.ndarray, shape=(N, 3) or UniformGrid
+            Cartesian coordinates of points on which local descriptors are evaluated, or a grid
+            (e.g. :class:`UniformGrid`) whose points are generated block by block with its
+            `iter_points` method, so the coordinates of all points are never stored.
+        tool : type
+            Local tool class of the energy model, e.g. :class:`LinearLocalTool` or
+            :class:`QuadraticLocalTool`.
+        n_max : float, optional
+            Maximum number of electrons that system can accept, i.e. :math:`N_{\text{max}}`.
+        global_softness : float, optional
+            Global softness.
+        block_size : int, optional
+            Number of points evaluated at once.
+        memory : int, optional
+            Maximum number of bytes of memoized descriptors. If None, all descriptors are kept.
+        """
+        if isinstance(points, np.ndarray):
+            if points.ndim != 2 or points.shape[1] != 3:
+                raise ValueError("Argument points should be a 2D-array with 3 columns!")
+            self._npoints = len(points)
+        elif hasattr(points, "iter_points") and hasattr(points, "npoints"):
+            self._npoints = points.npoints
+        else:
+            raise ValueError("Argument points should be a 2D-array with 3 columns or a grid "
+                             "with iter_points method! Given type={0}".format(type(points)))
+        if not (isinstance(block_size, int) and block_size > 0):
+            raise ValueError("Argument block_size should be a positive integer! "
+                             "block_size={0}".format(block_size))
+        if memory is not None and memory < 0:
+            raise ValueError("Argument memory cannot be negative! memory={0}".format(memory))
+        self._func = func_density
+        self._points = points
+        self._tool = tool
+        self._n_max = n_max
+        self._global_softness = global_softness
+        self._block_size = block_size
+        self._memory = memory
+        self._cache = OrderedDict()
+        # evaluate tool on the first point to check the densities & get reference N
+        self._n0 = self._make_tool(next(self._iter_points(1))).n0
+
+    def __getattr__(self, attr):
+        """Return local descriptor given as a property of the local tool class."""
+        if attr.startswith("_") or not isinstance(getattr(self._tool, attr, None), property):
+            raise AttributeError("Attribute {0} does not exist!".format(attr))
+        return self._evaluate((attr,), lambda tool: getattr(tool, attr))
+
+    @property
+    def n0(self):
+        r"""Reference number of electrons, i.e. :math:`N_0`."""
+        return self._n0
+
+    @property
+    def n_max(self):
+        r"""Maximum number of electrons that the system accepts, i.e. :math:`N_{\text{max}}`."""
+        return self._n_max
+
+    @property
+    def global_softness(self):
+        r"""Global softness."""
+        return self._global_softness
+
+    @property
+    def tool(self):
+        """Local tool class of the energy model, whose properties are the local descriptors."""
+        return self._tool
+
+    @property
+    def points(self):
+        """Cartesian coordinates of points on which local descriptors are evaluated.
+
+        If the points are given by a grid, the coordinates of all grid points are computed.
+        """
+        if isinstance(self._points, np.ndarray):
+            return self._points
+        return self._points.points
+
+    @property
+    def cached(self):
+        """Sorted list of keys of memoized descriptors."""
+        return sorted(self._cache.keys())
+
+    def density(self, n_elec):
+        r"""Evaluate density model :math:`\rho_N(\mathbf{r})` at the :math:`N_{\text{elec}}`.
+
+        Parameters
+        ----------
+        n_elec: float
+            Number of electrons, :math:`N_{\text{elec}}`.
+        """
+        return self._evaluate(("density", n_elec), lambda tool: tool.density(n_elec))
+
+    def density_derivative(self, n_elec, order=1):
+        r"""Evaluate n-th derivative of density w.r.t. :math:`N` at :math:`N_{\text{elec}}`.
+
+        Parameters
+        ----------
+        n_elec: float
+            Number of electrons, :math:`N_{\text{elec}}`.
+        order : int, optional
+            The order of derivative.
+        """
+        return self._evaluate(("density_derivative", n_elec, order),
+                              lambda tool: tool.density_derivative(n_elec, order))
+
+    def iter_blocks(self, attr, blocks=None):
+        """Return generator of slice of points and value of local descriptor for each block.
+
+        The blocks are not memoized, so the whole descriptor array is never stored.
+
+        Parameters
+        ----------
+        attr : str
+            Name of local descriptor given as a property of the local tool class.
+        blocks : iterable of np.ndarray, optional
+            Blocks of points, each given as a 2D array with 3 columns, on which the descriptor
+            is evaluated. The slices index the concatenated blocks. If None, the points of the
+            tool are split into blocks of `block_size`.
+        """
+        if not isinstance(getattr(self._tool, attr, None), property):
+            raise ValueError("Local descriptor {0} does not exist!".format(attr))
+        if blocks is None:
+            blocks = self._iter_points(self._block_size)
+        return self._iter_blocks(attr, blocks)
+
+    def _iter_blocks(self, attr, blocks):
+        """Yield slice of points and value of local descriptor for each block of points."""
+        start = 0
+        for points in blocks:
+            yield slice(start, start + len(points)), getattr(self._make_tool(points), attr)
+            start += len(points)
+
+    def _iter_points(self, block_size):
+        """Return iterator of consecutive blocks of points with the given size."""
+        if isinstance(self._points, np.ndarray):
+            return (self._points[start:start + block_size]
+                    for start in range(0, self._npoints, block_size))
+        return self._points.iter_points(block_size)
+
+    def _make_tool(self, points):
+        """Return local tool of the energy model on the given points."""
+        return self._tool(self._func(points), self._n_max, self._global_softness)
+
+    def _evaluate(self, key, func):
+        """Return memoized value, or evaluate func on the local tool of each block of points."""
+        if key in self._cache:
+            # mark as most recently used
+            self._cache[key] = self._cache.pop(key)
+            return self._cache[key]
+        result = np.empty(self._npoints)
+        start = 0
+        for points in self._iter_points(self._block_size):
+            value = func(self._make_tool(points))
+            if value is None:
+                return None
+            result[start:start + len(points)] = value
+            start += len(points)
+        self._store(key, result)
+        return result
+
+    def _store(self, key, value):
+        """Memoize value & evict the least recently used values to respect memory budget."""
+        if self._memory is not None:
+            if value.nbytes > self._memory:
+                return
+            while sum(item.nbytes for item in self._cache.values()) + value.nbytes > self._memory:
+                self._cache.popitem(last=False)
+        self._cache[key] = value
@@ -30,7 +30,7 @@ from scipy.misc import factorial
 
 from chemtools.utils.utils import doc_inherit
 from chemtools.conceptual.base import BaseGlobalTool
-from chemtools.conceptual.utils import check_dict_values, check_number_electrons
+from chemtools.conceptual.utils import check_dict_values, check_number_electrons, broadcast_value
 
 
 __all__ = ['LeastNormGlobalTool']
@@ -179,7 +179,7 @@ class LeastNormGlobalTool(BaseGlobalTool):
         for term in range(order, self._nth_order + 1):
             diff = term - order
             deriv += n_elec ** diff * self._params[term] * factorial(term) / factorial(diff)
-        return deriv
+        return broadcast_value(deriv, n_elec)
 
     def _compute_n_max(self):
         # Leading coefficient dictates whether it is bounded or not.
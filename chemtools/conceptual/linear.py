@@ -26,6 +26,8 @@ This module contains the global and local tool classes corresponding to linear e
 """
 
 
+import numpy as np
+
 from chemtools.conceptual.base import BaseGlobalTool, BaseLocalTool, BaseCondensedTool
 from chemtools.conceptual.utils import check_dict_values, check_number_electrons
 from chemtools.utils.utils import doc_inherit
@@ -80,16 +82,9 @@ class LinearGlobalTool(BaseGlobalTool):
         """
         # check number of electrons & energy values
         n_ref, energy_m, energy_0, energy_p = check_dict_values(dict_energy)
-        # calculate parameters a, b, a' and b' of linear energy model
-        param_b = energy_0 - energy_m
-        param_a = energy_0 - n_ref * param_b
-        param_b_prime = energy_p - energy_0
-        param_a_prime = energy_0 - n_ref * param_b_prime
-        self._params = [param_a, param_b, param_a_prime, param_b_prime]
-        # calculate N_max
-        if energy_0 < energy_p:
-            n_max = n_ref
-        else:
+        # calculate parameters a, b, a' and b' of linear energy model & N_max
+        self._params, n_max = linear_params(n_ref, energy_m, energy_0, energy_p)
+        if np.isnan(n_max):
             n_max = None
         super(LinearGlobalTool, self).__init__(n_ref, n_max)
         self.dict_energy = dict_energy
@@ -133,11 +128,7 @@ class LinearGlobalTool(BaseGlobalTool):
         # check n_elec argument
         check_number_electrons(n_elec, self._n0 - 1, self._n0 + 1)
         # evaluate energy
-        if n_elec <= self._n0:
-            value = self._params[0] + n_elec * self._params[1]
-        else:
-            value = self._params[2] + n_elec * self._params[3]
-        return value
+        return linear_energy(self._params, self._n0, n_elec)
 
     @doc_inherit(BaseGlobalTool)
     def energy_derivative(self, n_elec, order=1):
@@ -146,16 +137,10 @@ class LinearGlobalTool(BaseGlobalTool):
         # check order
         if not (isinstance(order, int) and order > 0):
             raise ValueError("Argument order should be an integer greater than or equal to 1.")
-        # evaluate derivative
-        if n_elec == self._n0:
-            deriv = None
-        elif order >= 2:
-            deriv = 0.0
-        elif n_elec < self._n0:
-            deriv = self._params[1]
-        else:
-            deriv = self._params[3]
-        return deriv
+        # evaluate derivative (which is not defined at N0)
+        if not isinstance(n_elec, np.ndarray) and n_elec == self._n0:
+            return None
+        return linear_energy_derivative(self._params, self._n0, n_elec, order)
 
 
 class LinearLocalTool(BaseLocalTool):
@@ -419,3 +404,73 @@ class LinearCondensedTool(BaseCondensedTool):
             else:
                 deriv = 0.
         return deriv
+
+
+def linear_params(n_ref, energy_m, energy_0, energy_p):
+    r"""Return parameters :math:`a`, :math:`b`, :math:`a^\prime` & :math:`b^\prime` and N_max.
+
+    The arguments can be numbers, or arrays with the values of many molecules.
+
+    Parameters
+    ----------
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    energy_m : float or np.ndarray
+        Energy of the :math:`N_0 - 1` electron system.
+    energy_0 : float or np.ndarray
+        Energy of the :math:`N_0` electron system.
+    energy_p : float or np.ndarray
+        Energy of the :math:`N_0 + 1` electron system.
+
+    Returns
+    -------
+    params : list
+        Parameters :math:`a`, :math:`b`, :math:`a^\prime` & :math:`b^\prime` of energy model.
+    n_max : float or np.ndarray
+        Maximum number of electrons, which is :math:`N_0` if the energy increases by adding an
+        electron, and ``np.nan`` (not defined) otherwise.
+    """
+    param_b = energy_0 - energy_m
+    param_a = energy_0 - n_ref * param_b
+    param_b_prime = energy_p - energy_0
+    param_a_prime = energy_0 - n_ref * param_b_prime
+    n_max = np.where(energy_0 < energy_p, n_ref, np.nan)[()]
+    return [param_a, param_b, param_a_prime, param_b_prime], n_max
+
+
+def linear_energy(params, n_ref, n_elec):
+    """Return energy of linear energy model, see :func:`LinearGlobalTool.energy`.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`linear_params`.
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    """
+    return np.where(n_elec <= n_ref,
+                    params[0] + n_elec * params[1],
+                    params[2] + n_elec * params[3])[()]
+
+
+def linear_energy_derivative(params, n_ref, n_elec, order):
+    """Return derivative of linear energy model, which is ``np.nan`` (not defined) at N0.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`linear_params`.
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    order : int
+        The order of derivative.
+    """
+    if order >= 2:
+        deriv = np.zeros(np.broadcast(n_elec, n_ref).shape)
+    else:
+        deriv = np.where(n_elec < n_ref, params[1], params[3])
+    return np.where(n_elec == n_ref, np.nan, deriv)[()]
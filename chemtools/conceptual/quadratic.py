@@ -26,9 +26,11 @@ This module contains the global and local tool classes corresponding to quadrati
 """
 
 
+import numpy as np
+
 from chemtools.utils.utils import doc_inherit
 from chemtools.conceptual.base import BaseGlobalTool, BaseLocalTool, BaseCondensedTool
-from chemtools.conceptual.utils import check_dict_values, check_number_electrons
+from chemtools.conceptual.utils import check_dict_values, check_number_electrons, broadcast_value
 
 
 __all__ = ["QuadraticGlobalTool", "QuadraticLocalTool", "QuadraticCondensedTool"]
@@ -70,14 +72,8 @@ class QuadraticGlobalTool(BaseGlobalTool):
         """
         # check number of electrons & energy values
         n_ref, energy_m, energy_0, energy_p = check_dict_values(dict_energy)
-        # calculate parameters a, b, c of quadratic energy model
-        energy_m, energy_0, energy_p = [dict_energy[n] for n in sorted(dict_energy.keys())]
-        param_c = 0.5 * (energy_m - 2 * energy_0 + energy_p)
-        param_b = 0.5 * (energy_p - energy_m) - 2 * param_c * n_ref
-        param_a = energy_0 - param_b * n_ref - param_c * (n_ref**2)
-        self._params = [param_a, param_b, param_c]
-        # calculate N_max (number of electrons for which energy is minimum)
-        n_max = - param_b / (2 * param_c)
+        # calculate parameters a, b, c of quadratic energy model & N_max
+        self._params, n_max = quadratic_params(n_ref, energy_m, energy_0, energy_p)
         super(QuadraticGlobalTool, self).__init__(n_ref, n_max)
         self.dict_energy = dict_energy
 
@@ -91,8 +87,7 @@ class QuadraticGlobalTool(BaseGlobalTool):
         # check n_elec argument
         check_number_electrons(n_elec, self._n0 - 1, self._n0 + 1)
         # evaluate energy
-        value = self._params[0] + self._params[1] * n_elec + self._params[2] * n_elec**2
-        return value
+        return quadratic_energy(self._params, n_elec)
 
     @doc_inherit(BaseGlobalTool)
     def energy_derivative(self, n_elec, order=1):
@@ -102,13 +97,14 @@ class QuadraticGlobalTool(BaseGlobalTool):
         if not (isinstance(order, int) and order > 0):
             raise ValueError("Argument order should be an integer greater than or equal to 1.")
         # evaluate derivative
-        if order == 1:
-            deriv = self._params[1] + 2 * n_elec * self._params[2]
-        elif order == 2:
-            deriv = 2 * self._params[2]
-        else:
-            deriv = 0.
-        return deriv
+        return quadratic_energy_derivative(self._params, n_elec, order)
+
+    def _convert_mu_to_n_array(self, mu, guess, tol=1.48e-8, maxiter=50):
+        r"""Return array of :math:`N` values using the closed-form inverse of :math:`\mu(N)`."""
+        # closed-form inverse of mu(N) = b + 2cN
+        if self._params[2] == 0.:
+            return np.full(mu.shape, np.nan)
+        return (mu - self._params[1]) / (2 * self._params[2])
 
 
 class QuadraticLocalTool(BaseLocalTool):
@@ -255,3 +251,67 @@ class QuadraticCondensedTool(BaseCondensedTool):
         else:
             deriv = 0.
         return deriv
+
+
+def quadratic_params(n_ref, energy_m, energy_0, energy_p):
+    """Return parameters :math:`a`, :math:`b` & :math:`c` of quadratic energy model and N_max.
+
+    The arguments can be numbers, or arrays with the values of many molecules.
+
+    Parameters
+    ----------
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    energy_m : float or np.ndarray
+        Energy of the :math:`N_0 - 1` electron system.
+    energy_0 : float or np.ndarray
+        Energy of the :math:`N_0` electron system.
+    energy_p : float or np.ndarray
+        Energy of the :math:`N_0 + 1` electron system.
+
+    Returns
+    -------
+    params : list
+        Parameters :math:`a`, :math:`b` & :math:`c` of energy model.
+    n_max : float or np.ndarray
+        Maximum number of electrons, i.e. number of electrons for which energy is minimum.
+    """
+    param_c = 0.5 * (energy_m - 2 * energy_0 + energy_p)
+    param_b = 0.5 * (energy_p - energy_m) - 2 * param_c * n_ref
+    param_a = energy_0 - param_b * n_ref - param_c * (n_ref**2)
+    n_max = - param_b / (2 * param_c)
+    return [param_a, param_b, param_c], n_max
+
+
+def quadratic_energy(params, n_elec):
+    """Return energy of quadratic energy model, see :func:`QuadraticGlobalTool.energy`.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`quadratic_params`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    """
+    return params[0] + params[1] * n_elec + params[2] * n_elec**2
+
+
+def quadratic_energy_derivative(params, n_elec, order):
+    """Return derivative of quadratic energy model w.r.t. number of electrons.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`quadratic_params`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    order : int
+        The order of derivative.
+    """
+    if order == 1:
+        deriv = params[1] + 2 * n_elec * params[2]
+    elif order == 2:
+        deriv = broadcast_value(2 * params[2], n_elec)
+    else:
+        deriv = broadcast_value(0., n_elec)
+    return deriv
@@ -30,7 +30,7 @@ import math
 import numpy as np
 
 from chemtools.conceptual.base import BaseGlobalTool
-from chemtools.conceptual.utils import check_dict_values, check_number_electrons
+from chemtools.conceptual.utils import check_dict_values, check_number_electrons, broadcast_value
 from chemtools.utils.utils import doc_inherit
 
 
@@ -75,14 +75,8 @@ class RationalGlobalTool(BaseGlobalTool):
             energies = [energy_m, energy_0, energy_p]
             raise ValueError("For rational model, the energy values for consecutive number of "
                              "electrons should be monotonic! E={0}".format(energies))
-        # calculate parameters a0, a1 and b1 of rational energy model
-        param_b1 = - (energy_p - 2 * energy_0 + energy_m)
-        param_b1 /= ((n_ref + 1) * energy_p - 2 * n_ref * energy_0 + (n_ref - 1) * energy_m)
-        param_a1 = (1 + param_b1 * n_ref) * (energy_p - energy_0) + (param_b1 * energy_p)
-        param_a0 = - param_a1 * n_ref + energy_0 * (1 + param_b1 * n_ref)
-        self._params = [param_a0, param_a1, param_b1]
-        # calculate N_max
-        n_max = float('inf')
+        # calculate parameters a0, a1 and b1 of rational energy model & N_max
+        self._params, n_max = rational_params(n_ref, energy_m, energy_0, energy_p)
         super(RationalGlobalTool, self).__init__(n_ref, n_max)
         self.dict_energy = dict_energy
 
@@ -96,12 +90,7 @@ class RationalGlobalTool(BaseGlobalTool):
         # check n_elec argument
         check_number_electrons(n_elec, self._n0 - 1, self._n0 + 1)
         # evaluate energy
-        if np.isinf(n_elec):
-            # limit of E(N) as N goes to infinity equals a1/b1
-            value = self._params[1] / self._params[2]
-        else:
-            value = (self._params[0] + self._params[1] * n_elec) / (1 + self._params[2] * n_elec)
-        return value
+        return rational_energy(self._params, n_elec)
 
     @doc_inherit(BaseGlobalTool)
     def energy_derivative(self, n_elec, order=1):
@@ -111,11 +100,89 @@ class RationalGlobalTool(BaseGlobalTool):
         if not (isinstance(order, int) and order > 0):
             raise ValueError("Argument order should be an integer greater than or equal to 1.")
         # evaluate derivative
-        if np.isinf(n_elec):
-            # limit of E(N) derivatives as N goes to infinity equals zero
-            deriv = 0.0
-        else:
-            deriv = (-self._params[2])**(order - 1)
-            deriv *= (self._params[1] - self._params[0] * self._params[2]) * math.factorial(order)
-            deriv /= (1 + self._params[2] * n_elec)**(order + 1)
-        return deriv
+        return rational_energy_derivative(self._params, n_elec, order)
+
+    def _convert_mu_to_n_array(self, mu, guess, tol=1.48e-8, maxiter=50):
+        r"""Return array of :math:`N` values using the closed-form inverse of :math:`\mu(N)`."""
+        # closed-form inverse of mu(N) = (a1 - a0 * b1) / (1 + b1 * N)^2 on the branch of N0
+        if self._params[2] == 0.:
+            return np.full(mu.shape, np.nan)
+        with np.errstate(divide='ignore'):
+            ratio = (self._params[1] - self._params[0] * self._params[2]) / mu
+        sign = np.sign(1 + self._params[2] * self._n0)
+        n_elec = np.full(mu.shape, np.nan)
+        mask = ratio > 0.
+        n_elec[mask] = (sign * np.sqrt(ratio[mask]) - 1) / self._params[2]
+        return n_elec
+
+
+def rational_params(n_ref, energy_m, energy_0, energy_p):
+    """Return parameters :math:`a_0`, :math:`a_1` & :math:`b_1` of rational energy model and N_max.
+
+    The arguments can be numbers, or arrays with the values of many molecules. The energy values
+    should be monotonic, see :class:`RationalGlobalTool`.
+
+    Parameters
+    ----------
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    energy_m : float or np.ndarray
+        Energy of the :math:`N_0 - 1` electron system.
+    energy_0 : float or np.ndarray
+        Energy of the :math:`N_0` electron system.
+    energy_p : float or np.ndarray
+        Energy of the :math:`N_0 + 1` electron system.
+
+    Returns
+    -------
+    params : list
+        Parameters :math:`a_0`, :math:`a_1` & :math:`b_1` of energy model.
+    n_max : float or np.ndarray
+        Maximum number of electrons, which is infinity.
+    """
+    param_b1 = - (energy_p - 2 * energy_0 + energy_m)
+    param_b1 /= ((n_ref + 1) * energy_p - 2 * n_ref * energy_0 + (n_ref - 1) * energy_m)
+    param_a1 = (1 + param_b1 * n_ref) * (energy_p - energy_0) + (param_b1 * energy_p)
+    param_a0 = - param_a1 * n_ref + energy_0 * (1 + param_b1 * n_ref)
+    n_max = np.full(np.shape(n_ref), np.inf)[()]
+    return [param_a0, param_a1, param_b1], n_max
+
+
+def rational_energy(params, n_elec):
+    """Return energy of rational energy model, see :func:`RationalGlobalTool.energy`.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`rational_params`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    """
+    with np.errstate(invalid='ignore'):
+        value = (params[0] + params[1] * np.asarray(n_elec)) / (1 + params[2] * n_elec)
+    if np.any(np.isinf(n_elec)):
+        # limit of E(N) as N goes to infinity equals a1/b1
+        value = np.where(np.isinf(n_elec), params[1] / params[2], value)
+    return value[()]
+
+
+def rational_energy_derivative(params, n_elec, order):
+    """Return derivative of rational energy model w.r.t. number of electrons.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`rational_params`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    order : int
+        The order of derivative.
+    """
+    if np.all(np.isinf(n_elec)):
+        # limit of E(N) derivatives as N goes to infinity equals zero
+        return broadcast_value(0.0, n_elec)
+    # for an array, the infinite number of electrons give zero derivatives
+    deriv = (-params[2])**(order - 1)
+    deriv *= (params[1] - params[0] * params[2]) * math.factorial(order)
+    deriv /= (1 + params[2] * n_elec)**(order + 1)
+    return deriv
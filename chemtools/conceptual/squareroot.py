@@ -74,11 +74,7 @@ class SquareRootGlobalTool(BaseGlobalTool):
         n_ref, energy_m, energy_0, energy_p = check_dict_values(dict_energy)
 
         # Compute The Coefficients
-        param2 = (energy_p - 2. * energy_0 + energy_m) / \
-                 (np.sqrt(n_ref + 1) - 2. * np.sqrt(n_ref) + np.sqrt(n_ref - 1))
-        param3 = (energy_p - energy_m) / 2. - param2 * (np.sqrt(n_ref + 1) - np.sqrt(n_ref - 1)) / 2
-        param1 = energy_0 - param2 * np.sqrt(n_ref) - param3 * n_ref
-        self._params = [param1, param2, param3]
+        self._params, _ = squareroot_params(n_ref, energy_m, energy_0, energy_p)
         n_max = self._compute_nmax()
         super(SquareRootGlobalTool, self).__init__(n_ref, n_max)
 
@@ -91,15 +87,7 @@ class SquareRootGlobalTool(BaseGlobalTool):
     def energy(self, n_elec):
         # check n_elec argument
         check_number_electrons(n_elec, self._n0 - 1, self._n0 + 1)
-
-        # Square Root Model goes to infinity as N goes to infinity.
-        output = self._params[0] + self._params[1] * np.sqrt(n_elec) + self._params[2] * n_elec
-        if np.isinf(n_elec):
-            if self.params[2] > 0.:
-                output = np.inf
-            else:
-                output = -np.inf
-        return output
+        return squareroot_energy(self._params, n_elec)
 
     @doc_inherit(BaseGlobalTool)
     def energy_derivative(self, n_elec, order=1):
@@ -110,41 +98,112 @@ class SquareRootGlobalTool(BaseGlobalTool):
         if not (isinstance(order, int) and order > 0):
             raise ValueError("Argument order should be an integer greater than or equal to 1.")
 
-        # Evaluate Derivative
-        if order == 1:
-            if n_elec == np.inf:
-                # The limit as N goes to infinity on the first order derivative is a2
-                return self._params[2]
-            deriv_value = self._params[2] + self._params[1] / (2. * np.sqrt(n_elec))
-        else:
-            if n_elec == np.inf:
-                # Limit as N goes to infinity on the higher order derivative is zero
-                return 0
-            coefficient_factor = np.prod(2. * np.arange(1, order) - 1) * self._params[1]
-            coefficient_factor /= (2.**order * (-1)**(order - 1))
-            deriv_value = coefficient_factor * n_elec**(-(order - 1)) * np.sqrt(n_elec**(-1))
-        return deriv_value
+        # Evaluate Derivative (the limits at infinity follow from the formulas)
+        return squareroot_energy_derivative(self._params, n_elec, order)
+
+    def _convert_mu_to_n_array(self, mu, guess, tol=1.48e-8, maxiter=50):
+        r"""Return array of :math:`N` values using the closed-form inverse of :math:`\mu(N)`."""
+        # closed-form inverse of mu(N) = c + b / (2 sqrt(N))
+        with np.errstate(divide='ignore'):
+            sqrt_n = self._params[1] / (2. * (mu - self._params[2]))
+        n_elec = np.full(mu.shape, np.nan)
+        mask = np.isfinite(sqrt_n) & (sqrt_n > 0.)
+        n_elec[mask] = sqrt_n[mask]**2
+        return n_elec
 
     def _compute_nmax(self):
         # Compute the local minimum, n_max
-        _, coeff1, coeff2 = self.params
-
-        if coeff1 == 0.:
+        if self.params[1] == 0.:
             # If a1 is zero then it is just a linear model.
             raise ValueError("Coefficient a1 cannot be zero or else it is a linear model.")
+        return squareroot_n_max(self.params)
+
+
+def squareroot_params(n_ref, energy_m, energy_0, energy_p):
+    """Return parameters :math:`a`, :math:`b` & :math:`c` of square-root energy model and N_max.
+
+    The arguments can be numbers, or arrays with the values of many molecules.
+
+    Parameters
+    ----------
+    n_ref : float or np.ndarray
+        Reference number of electrons, i.e. :math:`N_0`.
+    energy_m : float or np.ndarray
+        Energy of the :math:`N_0 - 1` electron system.
+    energy_0 : float or np.ndarray
+        Energy of the :math:`N_0` electron system.
+    energy_p : float or np.ndarray
+        Energy of the :math:`N_0 + 1` electron system.
+
+    Returns
+    -------
+    params : list
+        Parameters :math:`a`, :math:`b` & :math:`c` of energy model.
+    n_max : float or np.ndarray
+        Maximum number of electrons, see :func:`squareroot_n_max`.
+    """
+    param2 = (energy_p - 2. * energy_0 + energy_m) / \
+             (np.sqrt(n_ref + 1) - 2. * np.sqrt(n_ref) + np.sqrt(n_ref - 1))
+    param3 = (energy_p - energy_m) / 2. - param2 * (np.sqrt(n_ref + 1) - np.sqrt(n_ref - 1)) / 2
+    param1 = energy_0 - param2 * np.sqrt(n_ref) - param3 * n_ref
+    params = [param1, param2, param3]
+    return params, squareroot_n_max(params)
+
+
+def squareroot_n_max(params):
+    """Return maximum number of electrons, i.e. local minimum, of square-root energy model.
+
+    The :math:`N_{\text{max}}` is the local minimum if it exists, zero if the energy is
+    monotonically increasing, and infinity if the energy goes to negative infinity. If parameter
+    :math:`b` is zero, it is a linear model and ``np.nan`` (not defined) is returned.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`squareroot_params`.
+    """
+    coeff1, coeff2 = np.asarray(params[1], dtype=float), np.asarray(params[2], dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
         # a1 requires to be negative to ensure minimum is concave up
-        if coeff1 < 0.:
-            if coeff2 <= 0.:
-                # Energy goes to negative infinity as it is monotonically decreasing.
-                n_max = np.inf
-            else:
-                # Local Minima exists.
-                n_max = (coeff1 / (2. * coeff2)) ** 2
-        else:
-            if coeff2 >= 0.:
-                # Minima occurs at the origin as it is monotonically increasing.
-                n_max = 0.
-            else:
-                # Energy goes to -infinity.
-                n_max = np.inf
-        return n_max
+        n_max = np.where(coeff1 < 0.,
+                         np.where(coeff2 > 0., (coeff1 / (2. * coeff2)) ** 2, np.inf),
+                         np.where(coeff2 >= 0., 0., np.inf))
+    return np.where(coeff1 == 0., np.nan, n_max)[()]
+
+
+def squareroot_energy(params, n_elec):
+    """Return energy of square-root energy model, see :func:`SquareRootGlobalTool.energy`.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`squareroot_params`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    """
+    with np.errstate(invalid='ignore'):
+        output = params[0] + params[1] * np.sqrt(n_elec) + params[2] * n_elec
+    # Square Root Model goes to infinity as N goes to infinity.
+    limit = np.where(np.asarray(params[2]) > 0., np.inf, -np.inf)
+    return np.where(np.isinf(n_elec), limit, output)[()]
+
+
+def squareroot_energy_derivative(params, n_elec, order):
+    """Return derivative of square-root energy model w.r.t. number of electrons.
+
+    Parameters
+    ----------
+    params : list
+        Parameters of energy model, see :func:`squareroot_params`.
+    n_elec : float or np.ndarray
+        Number of electrons.
+    order : int
+        The order of derivative.
+    """
+    if order == 1:
+        # The limit as N goes to infinity on the first order derivative is a2
+        return params[2] + params[1] / (2. * np.sqrt(n_elec))
+    # Limit as N goes to infinity on the higher order derivative is zero
+    coefficient_factor = np.prod(2. * np.arange(1, order) - 1) * params[1]
+    coefficient_factor /= (2.**order * (-1)**(order - 1))
+    return coefficient_factor * n_elec**(-(order - 1)) * np.sqrt(n_elec**(-1))
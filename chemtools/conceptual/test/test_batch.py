@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.conceptual.batch Module."""
+
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from numpy.testing import assert_raises, assert_almost_equal, assert_equal
+
+from chemtools.conceptual.batch import BatchGlobalTool
+from chemtools.conceptual.linear import LinearGlobalTool
+from chemtools.conceptual.quadratic import QuadraticGlobalTool
+from chemtools.conceptual.exponential import ExponentialGlobalTool
+from chemtools.conceptual.rational import RationalGlobalTool
+from chemtools.conceptual.cubic import CubicGlobalTool
+from chemtools.conceptual.squareroot import SquareRootGlobalTool
+
+
+def check_batch_global_tool(model, energies, n0):
+    """Check descriptors of batch tool against global tool of each molecule."""
+    tools = {"linear": LinearGlobalTool, "quadratic": QuadraticGlobalTool,
+             "exponential": ExponentialGlobalTool, "rational": RationalGlobalTool,
+             "cubic": CubicGlobalTool, "squareroot": SquareRootGlobalTool}
+    batch = BatchGlobalTool(energies, n0, model)
+    table = batch.table()
+    for index, (energy, n_ref) in enumerate(zip(energies, n0)):
+        tool = tools[model]({n_ref - 1: energy[0], n_ref: energy[1], n_ref + 1: energy[2]})
+        for name in BatchGlobalTool.descriptors:
+            if name == "hyper_hardness":
+                expected = tool.hyper_hardness(2)
+            else:
+                expected = getattr(tool, name)
+            if expected is None:
+                expected = np.nan
+            assert_almost_equal(table[name][index], expected, decimal=6)
+            assert_almost_equal(getattr(batch, name)[index], expected, decimal=6)
+
+
+def test_batch_global_raises():
+    energies = np.array([[-10., -11., -11.5], [-20., -21., -21.2]])
+    assert_raises(ValueError, BatchGlobalTool, energies[:, :2], 10)
+    assert_raises(ValueError, BatchGlobalTool, energies, [10, 11, 12])
+    assert_raises(ValueError, BatchGlobalTool, energies, 0)
+    assert_raises(ValueError, BatchGlobalTool, energies, 10, "general")
+    assert_raises(ValueError, BatchGlobalTool(energies, 10).energy_derivative, [10, 10], 0)
+    assert_raises(ValueError, BatchGlobalTool(energies, 10).table, ["ip", "dipole"])
+
+
+def test_batch_global_models():
+    energies = np.array([[-10., -11., -11.5], [-20.5, -21., -21.2], [8.53, 8.0, 7.52],
+                         [-1.0, -1.625, -1.968]])
+    n0 = np.array([10, 15, 10, 2])
+    for model in ["linear", "quadratic", "exponential", "rational", "squareroot"]:
+        check_batch_global_tool(model, energies, n0)
+    check_batch_global_tool("cubic", np.array([[25.3, 100., 50.5], [-10., -11., -11.5]]),
+                            np.array([10, 4]))
+    # non-monotonic energies are not acceptable for exponential model
+    batch = BatchGlobalTool(np.array([[5.2, 4.8, 6.0], [-10., -11., -11.5]]), 5, "exponential")
+    assert_equal(np.isnan(batch.ip), [True, False])
+
+
+def test_batch_global_to_csv():
+    energies = np.array([[-10., -11., -11.5], [-20.5, -21., -21.2]])
+    batch = BatchGlobalTool(energies, [10, 15], "quadratic")
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(tmpdir, "descriptors.csv")
+        batch.to_csv(fname, ["n0", "ip", "ea", "mu"])
+        with open(fname) as handle:
+            assert_equal(handle.readline().strip(), "n0,ip,ea,mu")
+        data = np.loadtxt(fname, delimiter=",", skiprows=1)
+        assert_almost_equal(data[:, 0], [10, 15], decimal=6)
+        assert_almost_equal(data[:, 1], [1.0, 0.5], decimal=6)
+        assert_almost_equal(data[:, 2], [0.5, 0.2], decimal=6)
+        assert_almost_equal(data[:, 3], [-0.75, -0.35], decimal=6)
+    finally:
+        shutil.rmtree(tmpdir)
@@ -154,3 +154,17 @@ def test_global_cubic_omega_one_reactivity():
     assert_almost_equal(model.hyper_hardness(2), -78.72, decimal=10)
     assert_almost_equal(model.hyper_hardness(3), 0., decimal=10)
     assert_almost_equal(model.hyper_hardness(4), 0., decimal=10)
+
+
+def test_global_cubic_array():
+    model = CubicGlobalTool({9: 25.3, 10: 100., 11: 50.5}, omega=1.0)
+    # number of electrons on the monotonic branch of mu(N) containing N0
+    n_elec = np.array([9.8, 9.9, 10., 10.1, 10.3])
+    assert_almost_equal(model.energy(n_elec), [model.energy(n) for n in n_elec], decimal=6)
+    for order in [1, 2, 3, 4]:
+        assert_almost_equal(model.energy_derivative(n_elec, order),
+                            [model.energy_derivative(n, order) for n in n_elec], decimal=6)
+    assert_almost_equal(model.grand_potential_derivative(n_elec, 3),
+                        [model.grand_potential_derivative(n, 3) for n in n_elec], decimal=6)
+    mu = model.energy_derivative(n_elec, 1)
+    assert_almost_equal(model.convert_mu_to_n(mu), n_elec, decimal=6)
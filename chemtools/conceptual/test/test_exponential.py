@@ -22,6 +22,7 @@
 # --
 """Test chemtools.conceptual.exponential Module."""
 
+import numpy as np
 import sympy as sp
 from numpy.testing import assert_raises, assert_equal, assert_almost_equal
 from chemtools.conceptual.exponential import ExponentialGlobalTool
@@ -219,3 +220,24 @@ def test_global_exponential_grand_potential_reactivity():
     # check hyper-softnesses
     assert_almost_equal(model.hyper_softness(2), 1.0 / (5.**2 * 0.1**3), decimal=6)
     assert_almost_equal(model.hyper_softness(3), 2.0 / (5.**3 * 0.1**4), decimal=6)
+
+
+def test_global_exponential_array():
+    # E(N) = 5.0 * exp(-0.1 * (N - 10)) + 3.0
+    energy, deriv, grand = make_symbolic_exponential_model(5.0, -0.1, 3.0, 10)
+    model = ExponentialGlobalTool({10: 8.0, 11: 7.524187090179797, 9: 8.525854590378238})
+    n_elec = np.array([8.034, 9.09, 10., 11.671, 20.4])
+    assert_almost_equal(model.energy(n_elec), [energy(n) for n in n_elec], decimal=6)
+    assert_almost_equal(model.energy_derivative(n_elec, 2), [deriv(n, 2) for n in n_elec],
+                        decimal=6)
+    assert_almost_equal(model.grand_potential(n_elec), [grand(n) for n in n_elec], decimal=6)
+    d2omega, d3omega, _, _ = make_analytical_grand_derivatives(deriv)
+    assert_almost_equal(model.grand_potential_derivative(n_elec, 2),
+                        [d2omega(n) for n in n_elec], decimal=6)
+    assert_almost_equal(model.grand_potential_derivative(n_elec, 3),
+                        [d3omega(n) for n in n_elec], decimal=6)
+    mu = np.array([deriv(n, 1) for n in n_elec])
+    assert_almost_equal(model.convert_mu_to_n(mu), n_elec, decimal=6)
+    assert_almost_equal(model.grand_potential_mu(mu), [grand(n) for n in n_elec], decimal=6)
+    # mu with no corresponding number of electrons
+    assert_equal(np.isnan(model.convert_mu_to_n(np.array([0.5, -0.5]))), [True, False])
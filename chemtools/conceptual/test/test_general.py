@@ -81,6 +81,26 @@ def test_global_general_energy_quadratic():
     np.testing.assert_almost_equal(model.grand_potential(20), grand(20), decimal=6)
 
 
+def test_global_general_energy_quadratic_array():
+    # E(N) = 31.0 - 28.0 * N + 4.0 * N^2
+    n, n0, a, b, c = sp.symbols('n, n0, a, b, c')
+    expr = a + b * n + c * (n**2)
+    model = GeneralGlobalTool(expr, 3.45, {2.1: -10.16, 2.5: -14.0, 4.3: -15.44}, n, n0, order=1)
+    n_elec = np.array([0.55, 1.70, 3.45, 6.30])
+    np.testing.assert_almost_equal(model.energy(n_elec), 31.0 - 28.0 * n_elec + 4.0 * n_elec**2,
+                                   decimal=6)
+    np.testing.assert_almost_equal(model.energy_derivative(n_elec), -28.0 + 8.0 * n_elec,
+                                   decimal=6)
+    # derivatives beyond the precomputed order are constant, but have the shape of n_elec
+    np.testing.assert_almost_equal(model.energy_derivative(n_elec, 2), [8.0] * 4, decimal=6)
+    np.testing.assert_almost_equal(model.energy_derivative(n_elec, 3), [0.0] * 4, decimal=6)
+    np.testing.assert_almost_equal(model.energy_derivative(3.45, 2), 8.0, decimal=6)
+    # check raises
+    np.testing.assert_raises(ValueError, model.energy, np.array([-1.0, 2.0]))
+    np.testing.assert_raises(ValueError, GeneralGlobalTool, expr, 3.45,
+                             {2.1: -10.16, 2.5: -14.0, 4.3: -15.44}, n, n0, None, None, -1)
+
+
 def test_global_general_energy_exponential():
     # E(N) = 6.91 * exp(-0.25 * (N - 7.0)) + 2.74
     n, n0, a, b, gamma = sp.symbols('n, n0, A, B, gamma')
@@ -156,3 +176,19 @@ def test_global_general_energy_exponential():
     # np.testing.assert_almost_equal(model.n0, 7, decimal=6)
     # assert 5 == 6
     # pass
+
+
+def test_global_general_exponential_array():
+    # E(N) = 6.91 * exp(-0.25 * (N - 7.0)) + 2.74
+    n, n0, a, b, gamma = sp.symbols('n, n0, A, B, gamma')
+    expr = a * sp.exp(- gamma * (n - 7.0)) + b
+    n_energies = {7.5: 8.838053596859556, 1.25: 31.832186639954763, 3.6: 18.906959746808596}
+    model = GeneralGlobalTool(expr, 7.0, n_energies, n, n0)
+    n_elec = np.array([3.5, 6.5, 7.0, 8.2, 10.0])
+    mu = 6.91 * (-0.25) * np.exp(-0.25 * (n_elec - 7.0))
+    np.testing.assert_almost_equal(model.energy_derivative(n_elec), mu, decimal=6)
+    # solve for number of electrons with vectorized Newton iterations
+    np.testing.assert_almost_equal(model.convert_mu_to_n(mu), n_elec, decimal=6)
+    np.testing.assert_almost_equal(model.grand_potential_mu_derivative(mu, 1), -n_elec, decimal=6)
+    np.testing.assert_almost_equal(model.grand_potential_derivative(n_elec, 2),
+                                   4. / mu, decimal=6)
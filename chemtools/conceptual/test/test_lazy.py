@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+# pragma pylint: disable=invalid-name
+"""Test chemtools.conceptual.linear Module."""
+
+"""Test chemtools.conceptual.lazy Module."""
+
+
+import numpy as np
+from numpy.testing import assert_raises, assert_equal, assert_almost_equal
+from chemtools.conceptual.linear import LinearLocalTool
+from chemtools.conceptual.quadratic import QuadraticLocalTool
+from chemtools.conceptual.lazy import LazyLocalTool
+
+
+def fake_func_density(points):
+    """Return dictionary of fake densities of 4, 5 & 6 electron systems at given points."""
+    dist = np.linalg.norm(points, axis=1)
+    return {5: np.exp(-dist), 6: 1.2 * np.exp(-dist) + 0.1, 4: 0.7 * np.exp(-dist)}
+
+
+def test_local_lazy_raises():
+    points = np.random.uniform(-2., 2., (10, 3))
+    assert_raises(ValueError, LazyLocalTool, fake_func_density, points[:, :2], LinearLocalTool)
+    assert_raises(ValueError, LazyLocalTool, fake_func_density, points, LinearLocalTool,
+                  block_size=0)
+    assert_raises(ValueError, LazyLocalTool, fake_func_density, points, LinearLocalTool,
+                  block_size=2.5)
+    assert_raises(ValueError, LazyLocalTool, fake_func_density, points, LinearLocalTool,
+                  memory=-1)
+    tool = LazyLocalTool(fake_func_density, points, LinearLocalTool)
+    assert_raises(AttributeError, getattr, tool, "fukui")
+    assert_raises(ValueError, tool.iter_blocks, "fukui")
+    assert_raises(ValueError, tool.iter_blocks, "fukui", [points])
+
+
+def test_local_lazy_matches_eager():
+    points = np.random.uniform(-2., 2., (103, 3))
+    for local_tool in [LinearLocalTool, QuadraticLocalTool]:
+        eager = local_tool(fake_func_density(points), 8.5, 0.25)
+        lazy = LazyLocalTool(fake_func_density, points, local_tool, 8.5, 0.25, block_size=10)
+        assert_equal(lazy.n0, 5)
+        assert_equal(lazy.n_max, 8.5)
+        assert_equal(lazy.global_softness, 0.25)
+        for attr in ["fukui_function", "dual_descriptor", "softness", "hyper_softness"]:
+            expected = getattr(eager, attr)
+            if expected is None:
+                assert getattr(lazy, attr) is None
+                continue
+            assert_almost_equal(getattr(lazy, attr), expected, decimal=8)
+            value = np.concatenate([block for _, block in lazy.iter_blocks(attr)])
+            assert_almost_equal(value, expected, decimal=8)
+            # blocks of points given externally
+            blocks = (points[start:start + 7] for start in range(0, len(points), 7))
+            for index, block in lazy.iter_blocks(attr, blocks):
+                assert_almost_equal(block, expected[index], decimal=8)
+        for n_elec in [4, 5.5, 6]:
+            assert_almost_equal(lazy.density(n_elec), eager.density(n_elec), decimal=8)
+            assert_almost_equal(lazy.density_derivative(n_elec, 1),
+                                eager.density_derivative(n_elec, 1), decimal=8)
+
+
+class FakeGrid(object):
+    """Grid generating its points block by block."""
+
+    def __init__(self, points):
+        self.points = points
+        self.npoints = len(points)
+
+    def iter_points(self, block_size):
+        for start in range(0, self.npoints, block_size):
+            yield self.points[start:start + block_size]
+
+
+def test_local_lazy_grid_points():
+    points = np.random.uniform(-2., 2., (53, 3))
+    eager = QuadraticLocalTool(fake_func_density(points))
+    lazy = LazyLocalTool(fake_func_density, FakeGrid(points), QuadraticLocalTool, block_size=10)
+    assert_equal(lazy.n0, 5)
+    assert_equal(lazy.points, points)
+    assert_almost_equal(lazy.fukui_function, eager.fukui_function, decimal=8)
+    assert_almost_equal(lazy.density(5.5), eager.density(5.5), decimal=8)
+    for index, block in lazy.iter_blocks("dual_descriptor"):
+        assert index.stop - index.start <= 10
+        assert_almost_equal(block, eager.dual_descriptor[index], decimal=8)
+    assert_raises(ValueError, LazyLocalTool, fake_func_density, [[0., 0., 0.]],
+                  QuadraticLocalTool)
+
+
+def test_local_lazy_memoize():
+    points = np.random.uniform(-2., 2., (50, 3))
+    calls = []
+
+    def func_density(pnts):
+        calls.append(len(pnts))
+        return fake_func_density(pnts)
+
+    # all descriptors are memoized
+    tool = LazyLocalTool(func_density, points, QuadraticLocalTool, block_size=20)
+    assert_equal(calls, [1])
+    value = tool.fukui_function
+    assert_equal(calls, [1, 20, 20, 10])
+    assert tool.fukui_function is value
+    assert_equal(calls, [1, 20, 20, 10])
+    assert_equal(tool.cached, [("fukui_function",)])
+    # memory budget of two descriptors evicts the least recently used one
+    tool = LazyLocalTool(fake_func_density, points, QuadraticLocalTool, memory=2 * 50 * 8)
+    tool.fukui_function
+    tool.dual_descriptor
+    tool.fukui_function
+    tool.density(5)
+    assert_equal(tool.cached, [("density", 5), ("fukui_function",)])
+    # descriptor larger than memory budget is not memoized
+    tool = LazyLocalTool(fake_func_density, points, QuadraticLocalTool, memory=100)
+    tool.fukui_function
+    assert_equal(tool.cached, [])
@@ -464,3 +464,15 @@ def test_condensed_linear_h2o_reactivity():
     assert_almost_equal(model.softness, 2.3 * 0.5 * (pop_11 - pop_09), decimal=8)
     assert model.hyper_softness is None
     assert model.dual_descriptor is None
+
+
+def test_global_linear_array():
+    model = LinearGlobalTool({10: -6.0, 11: -5.9, 9: -5.5})
+    n_elec = np.array([9.5, 10., 10.5])
+    assert_almost_equal(model.energy(n_elec), [model.energy(n) for n in n_elec], decimal=6)
+    assert_almost_equal(model.energy_derivative(n_elec), [-0.5, np.nan, 0.1], decimal=6)
+    assert_almost_equal(model.energy_derivative(n_elec, 2), [0.0, np.nan, 0.0], decimal=6)
+    assert_almost_equal(model.grand_potential(n_elec), [model.grand_potential(9.5), np.nan,
+                                                        model.grand_potential(10.5)], decimal=6)
+    # mu(N) is not invertible for linear model
+    assert np.all(np.isnan(model.convert_mu_to_n(np.array([-0.5, 0.1]))))
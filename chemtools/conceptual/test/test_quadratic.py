@@ -658,3 +658,19 @@ def test_condensed_linear_h2o_reactivity():
     assert_almost_equal(model.fukui_function, 0.5 * (pop_11 - pop_09), decimal=8)
     assert_almost_equal(model.dual_descriptor, pop_11 - 2 * pop_10 + pop_09, decimal=8)
     assert_almost_equal(model.softness, 2.3 * 0.5 * (pop_11 - pop_09), decimal=8)
+
+
+def test_global_quadratic_array():
+    # E(N) = -9.0 + (-25.0)*N + N^2, N0=15
+    energy, deriv, grand = make_symbolic_quadratic_model(1.0, -25.0, -9.0)
+    model = QuadraticGlobalTool({15: -159.0, 16: -153.0, 14: -163.0})
+    n_elec = np.array([5.5, 12.5, 15., 16.2])
+    assert_almost_equal(model.energy(n_elec), energy(n_elec), decimal=6)
+    assert_almost_equal(model.energy_derivative(n_elec), deriv(n_elec), decimal=6)
+    assert_almost_equal(model.energy_derivative(n_elec, 2), [2.0] * 4, decimal=6)
+    assert_almost_equal(model.energy_derivative(n_elec, 3), [0.0] * 4, decimal=6)
+    assert_almost_equal(model.grand_potential(n_elec), grand(n_elec), decimal=6)
+    assert_almost_equal(model.grand_potential_derivative(n_elec, 2), [-0.5] * 4, decimal=6)
+    assert_almost_equal(model.grand_potential_derivative(n_elec, 3), [0.0] * 4, decimal=6)
+    assert_almost_equal(model.convert_mu_to_n(deriv(n_elec)), n_elec, decimal=6)
+    assert_almost_equal(model.grand_potential_mu(deriv(n_elec)), grand(n_elec), decimal=6)
@@ -22,6 +22,7 @@
 # --
 """Test chemtools.conceptual.rational Module."""
 
+import numpy as np
 import sympy as sp
 from numpy.testing import assert_raises, assert_equal, assert_almost_equal
 from chemtools.conceptual.rational import RationalGlobalTool
@@ -324,3 +325,22 @@ def test_global_rational_nnpp_grand_potential_reactivity():
     expected = -15 * (1 + b1 * n0)**7 / (8 * b1 * (a1 - a0 * b1)**3)
     assert_almost_equal(model.hyper_softness(3), expected, decimal=4)
     assert_almost_equal(model.grand_potential_derivative(6.5, 4), -expected, decimal=4)
+
+
+def test_global_rational_array():
+    model = RationalGlobalTool({2.: -1.6250, 3.: -1.96774193, 1.: -1.0})
+    n_elec = np.array([1.5, 2., 2.5, 3.8])
+    assert_almost_equal(model.energy(n_elec), [model.energy(n) for n in n_elec], decimal=6)
+    for order in [1, 2, 3]:
+        assert_almost_equal(model.energy_derivative(n_elec, order),
+                            [model.energy_derivative(n, order) for n in n_elec], decimal=6)
+        assert_almost_equal(model.grand_potential_derivative(n_elec, order + 1),
+                            [model.grand_potential_derivative(n, order + 1) for n in n_elec],
+                            decimal=6)
+    assert_almost_equal(model.grand_potential(n_elec),
+                        [model.grand_potential(n) for n in n_elec], decimal=6)
+    mu = model.energy_derivative(n_elec, 1)
+    assert_almost_equal(model.convert_mu_to_n(mu), n_elec, decimal=6)
+    # limit of energy & its derivatives as N goes to infinity
+    assert_almost_equal(model.energy(np.array([np.inf])), [model.energy(np.inf)], decimal=6)
+    assert_almost_equal(model.energy_derivative(np.array([np.inf]), 2), [0.0], decimal=6)
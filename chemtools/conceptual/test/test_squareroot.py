@@ -277,3 +277,18 @@ def test_nmax_using_fixed_examples():
     sqrt._params = [1., 1., 0.]
     desired = 0.
     assert_equal(sqrt._compute_nmax(), desired)
+
+
+def test_energy_array():
+    # Test array evaluation against evaluation of single values.
+    sqrt_root = SquareRootGlobalTool({4: -1., 5: -3.5, 6: -5.})
+    n_elec = np.array([4., 4.5, 5., 5.5, 6.])
+    assert_almost_equal(sqrt_root.energy(n_elec), [sqrt_root.energy(n) for n in n_elec],
+                        decimal=6)
+    for order in [1, 2, 3]:
+        assert_almost_equal(sqrt_root.energy_derivative(n_elec, order),
+                            [sqrt_root.energy_derivative(n, order) for n in n_elec], decimal=6)
+    assert_almost_equal(sqrt_root.grand_potential(n_elec),
+                        [sqrt_root.grand_potential(n) for n in n_elec], decimal=6)
+    mu = sqrt_root.energy_derivative(n_elec, 1)
+    assert_almost_equal(sqrt_root.convert_mu_to_n(mu), n_elec, decimal=6)
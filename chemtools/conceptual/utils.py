@@ -24,9 +24,10 @@
 
 
 import logging
+import numpy as np
 
 
-__all__ = ["check_dict_values", "check_number_electrons"]
+__all__ = ["check_dict_values", "check_number_electrons", "broadcast_value"]
 
 
 def check_dict_values(dict_values):
@@ -66,14 +67,27 @@ def check_number_electrons(n_elec, n_min, n_max):
 
     Parameters
     ----------
-    n_elec : float
-        Number of electrons.
+    n_elec : float or np.ndarray
+        Number of electrons, or array of number of electrons.
     n_min : float
         Minimum number of electrons used for interpolation.
     n_max : float
         Maximum number of electrons used for interpolation.
     """
-    if not isinstance(n_elec, (int, float)):
+    if isinstance(n_elec, np.ndarray):
+        if not np.issubdtype(n_elec.dtype, np.number):
+            raise ValueError("Array of number of electrons should contain numbers. "
+                             "Given dtype={0}".format(n_elec.dtype))
+        if np.any(n_elec < 0.0):
+            raise ValueError("Number of electrons cannot be negative! "
+                             "min(n_elec)={0}".format(np.min(n_elec)))
+        if np.any(n_elec < n_min) or np.any(n_elec > n_max):
+            logging.warning("Property evaluated for n_elec in [{0}, {1}] outside of "
+                            "interpolation region [{2}, {3}].".format(np.min(n_elec),
+                                                                      np.max(n_elec),
+                                                                      n_min, n_max))
+        return
+    if not isinstance(n_elec, (int, float, np.integer, np.floating)):
         raise ValueError("Number of electrons should be a single number. "
                          "Given n_elec={0}".format(n_elec))
     if n_elec < 0.0:
@@ -81,3 +95,21 @@ def check_number_electrons(n_elec, n_min, n_max):
     if not n_min <= n_elec <= n_max:
         logging.warning("Property evaluated for n_elec={0} outside of interpolation "
                         "region [{1}, {2}].".format(n_elec, n_min, n_max))
+
+
+def broadcast_value(value, n_elec):
+    """Return value with the shape of number of electrons array, or value itself otherwise.
+
+    This is used for properties which do not depend on the number of electrons, so that
+    evaluating them for an array of number of electrons gives an array of the same shape.
+
+    Parameters
+    ----------
+    value : float
+        Property value.
+    n_elec : float or np.ndarray
+        Number of electrons, or array of number of electrons.
+    """
+    if isinstance(n_elec, np.ndarray):
+        return value + np.zeros(n_elec.shape)
+    return value
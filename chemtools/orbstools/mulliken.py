@@ -1,12 +1,12 @@
 """Mulliken population analysis."""
 import numpy as np
-from chemtools.orbstools.orthogonalization import power_symmetric
+from chemtools.orbstools.orthogonalization import factorize, power_symmetric
 from chemtools.orbstools.quasi import project
 
 
 # FIXME: bad name (since providing atom_weights will result in the population not being Mulliken)
 def mulliken_populations(
-    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, atom_weights=None
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, atom_weights=None, check=True
 ):
     r"""Return the Mulliken populations of the given molecular orbitals.
 
@@ -93,14 +93,23 @@ def mulliken_populations(
         Index of the atom to which each atomic basis function belongs.
         Data type must be integers.
         `K` is the number of atomic orbitals.
-    atom_weights : np.ndarray(A, K, K)
+    atom_weights : {np.ndarray(A, K, K), iterable of np.ndarray(K, K)}
         Weights of the atomic orbital pairs for the atoms. In other words, this weight controls the
         amount of electrons associated with an atomic orbital pair that will be attributed to an
         atom.
         `A` is the number of atoms and `K` is the number of atomic orbitals.
+        The weights can also be given as an iterable (e.g. a generator) of the `(K, K)` weights of
+        each atom, which can be numpy arrays or sparse matrices, so that the weights of all atoms
+        are never stored at once.
         Default is the Mulliken partitioning scheme where two orbitals that belong to the given atom
         is 1, only one orbital that belong to the given atoms is 0.5, and no orbitals is 0.
 
+    check : {True, bool}
+        Check the numerical properties of the inputs, i.e. the symmetry and normalization of the
+        overlap matrix and the normalization of the molecular orbitals and of the weights.
+        Use False to skip these O(K^2)-O(K^3) checks in loops over inputs that are already
+        verified. The types and shapes of the inputs are always checked.
+
     Returns
     -------
     population : np.ndarray(M,)
@@ -117,7 +126,8 @@ def mulliken_populations(
         If `num_atoms` is not an integer.
         If `ab_atom_indices` is not a a one-dimensional numpy array of ints.
         If `atom_weights` is not the default value (`None`) and is not a 3-dimensional numpy array
-        of ints/flotas.
+        of ints/flotas or an iterable of two-dimensional numpy arrays (or sparse matrices) of
+        ints/floats.
     ValueError
         If `olp_ab_ab` is not square.
         If the number of rows in `coeff_ab_mo` is not equal to the number of rows in
@@ -132,7 +142,8 @@ def mulliken_populations(
         functions (i.e. number of rows in `olp_ab_ab`).
         If `ab_atom_indices` contains indices that are less than 0 or greater than or equal to the
         number of atoms.
-        If `atom_weights` has first dimension that is not equal to the number of atoms.
+        If `atom_weights` has first dimension (or number of items) that is not equal to the number
+        of atoms.
         If `atom_weights` has second and third dimensions that are not equal to the number of atomic
         orbitals.
         If `atom_weights` is not symmetric with respect to the interchange of the second and third
@@ -192,14 +203,16 @@ def mulliken_populations(
             "equal."
         )
 
-    if not np.allclose(olp_ab_ab, olp_ab_ab.T):
-        raise ValueError("Overlap of the atomic basis functions must be symmetric.")
-    if not np.allclose(np.diag(olp_ab_ab), 1):
-        raise ValueError("Overlap of the atomic basis functions must be normalized.")
-    if not np.allclose(np.diag(coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)), 1):
-        raise ValueError(
-            "Molecular orbitals (and the corresponding transformation matrix) must be normalized."
-        )
+    if check:
+        if not np.allclose(olp_ab_ab, olp_ab_ab.T):
+            raise ValueError("Overlap of the atomic basis functions must be symmetric.")
+        if not np.allclose(np.diag(olp_ab_ab), 1):
+            raise ValueError("Overlap of the atomic basis functions must be normalized.")
+        if not np.allclose(np.sum(coeff_ab_mo * olp_ab_ab.dot(coeff_ab_mo), axis=0), 1):
+            raise ValueError(
+                "Molecular orbitals (and the corresponding transformation matrix) must be "
+                "normalized."
+            )
 
     if not np.all(occupations >= 0):
         raise ValueError("Occupation numbers must be greater than or equal to 0.")
@@ -218,65 +231,107 @@ def mulliken_populations(
             " less than the number of atoms"
         )
 
+    # NOTE: the populations are reduced from the elementwise product of the overlap and density
+    # matrices, so that the memory scales as O(K^2) rather than O(A K^2).
+    density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
+    raw_pops = olp_ab_ab * density.T
     if atom_weights is None:
-        num_ab = olp_ab_ab.shape[0]
-        # NOTE: creating this numpy array is quite memory intensive. Since nothing here will ever be
-        # a computational bottleneck, it will be smarter to use a for loop incorporating the next
-        # two parts (weights and density) together. However, we keep these two parts separated to
-        # make it easier to implement different weight paradigms.
-        atom_weights = np.zeros((num_atoms, num_ab, num_ab))
-        ab_atom_indices_separated = ab_atom_indices[None, :] == np.arange(num_atoms)[:, None]
-        atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, :, None]
-        atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, None, :]
+        # Mulliken weights attribute half of the population of an atomic orbital pair to the atom
+        # of each orbital, so the population of an atom is the sum of the row and column sums of
+        # its atomic orbitals
+        ab_pops = 0.5 * (np.sum(raw_pops, axis=0) + np.sum(raw_pops, axis=1))
+        output = np.bincount(ab_atom_indices, weights=ab_pops, minlength=num_atoms)
         # code above is equivalent to the following:
-        # atom_weights = {}
+        # output = np.zeros(num_atoms)
         # for i in range(num_atoms):
         #     weights = np.zeros(num_ab)
         #     weights[ab_atom_indices == i] = 0.5
-        #     atom_weights[i] = weights[:, None] + weights[None, :]
+        #     output[i] = np.sum(raw_pops * (weights[:, None] + weights[None, :]))
     else:
+        if isinstance(atom_weights, np.ndarray):
+            if not (atom_weights.ndim == 3 and atom_weights.dtype in [float, int]):
+                raise TypeError(
+                    "Orbital weights for the atoms must be a 3-dimensional numpy array of "
+                    "ints/floats."
+                )
+            if atom_weights.shape[0] != num_atoms:
+                raise ValueError(
+                    "First dimension of the orbital weights for the atoms must be equal to the "
+                    "number of atoms."
+                )
+        elif not hasattr(atom_weights, "__iter__"):
+            raise TypeError(
+                "Orbital weights for the atoms must be a 3-dimensional numpy array or an iterable "
+                "of the orbital weights of each atom."
+            )
+        output = _weighted_populations(raw_pops, atom_weights, num_atoms, check)
+
+    if not abs(np.sum(occupations) - np.sum(output)) < 1e-6:
+        print("WARNING: Population does not match up with the number of electrons.")
+
+    return output
+
+
+def _weighted_populations(raw_pops, atom_weights, num_atoms, check=True):
+    """Return the populations of the atoms given the weights of the atomic orbital pairs.
+
+    Parameters
+    ----------
+    raw_pops : np.ndarray(K, K)
+        Elementwise product of the overlap matrix and the transposed density matrix.
+    atom_weights : {np.ndarray(A, K, K), iterable of np.ndarray(K, K)}
+        Weights of the atomic orbital pairs for each atom. Sparse matrices are converted to numpy
+        arrays one atom at a time.
+    num_atoms : int
+        Number of atoms.
+    check : {True, bool}
+        Check the symmetry and normalization of the weights.
+
+    Returns
+    -------
+    population : np.ndarray(A,)
+        Number of electrons associated with each atom.
+
+    """
+    output = np.zeros(num_atoms)
+    weights_sum = np.zeros(raw_pops.shape)
+    count = 0
+    for count, weights in enumerate(atom_weights, 1):
+        if hasattr(weights, "toarray"):
+            weights = weights.toarray()
         if not (
-            isinstance(atom_weights, np.ndarray)
-            and atom_weights.ndim == 3
-            and atom_weights.dtype in [float, int]
+            isinstance(weights, np.ndarray) and weights.ndim == 2 and weights.dtype in [float, int]
         ):
             raise TypeError(
-                "Orbital weights for the atoms must be a 3-dimensional numpy array of ints/floats."
+                "Orbital weights of each atom must be a two-dimensional numpy array (or sparse "
+                "matrix) of ints/floats."
             )
-        if atom_weights.shape[0] != num_atoms:
+        if count > num_atoms:
             raise ValueError(
-                "First dimension of the orbital weights for the atoms must be equal to the number "
-                "of atoms."
+                "Number of orbital weights for the atoms must be equal to the number of atoms."
             )
-        if atom_weights.shape[1:] != olp_ab_ab.shape:
+        if weights.shape != raw_pops.shape:
             raise ValueError(
                 "Second and third dimension of the orbital weights for the atoms must be equal to "
                 "the number of atomic orbitals."
             )
-        if not np.allclose(atom_weights, np.swapaxes(atom_weights, 1, 2)):
+        if check and not np.allclose(weights, weights.T):
             raise ValueError(
                 "Orbital weights for each atom must be symmetric, i.e. `atom_weights` must be "
                 "symmetric with respect to the interchange of the second and third indices."
             )
-        if not np.allclose(np.sum(atom_weights, axis=0), 1):
-            raise ValueError(
-                "Orbital weights for the atoms must be normalized, i.e. sum over the first "
-                "dimension must result in 1's."
-            )
-
-    # NOTE: the axis keyword used here for np.sum uses API introduced in numpy 1.7.0. This means
-    # that this function call will restrict the version of numpy used by this package.
-    density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
-    raw_pops = (olp_ab_ab * density.T)[None, :, :] * atom_weights
-    output = np.sum(raw_pops, axis=(1, 2))
-    # code above is equivalent to the following:
-    # output = np.zeros(num_atoms)
-    # for atom_ind, weights in atom_weights.items():
-    #     output[atom_ind] = np.sum(olp_ab_ab * density.T * weights)
-
-    if not abs(np.sum(occupations) - np.sum(output)) < 1e-6:
-        print("WARNING: Population does not match up with the number of electrons.")
-
+        output[count - 1] = np.sum(raw_pops * weights)
+        if check:
+            weights_sum += weights
+    if count != num_atoms:
+        raise ValueError(
+            "Number of orbital weights for the atoms must be equal to the number of atoms."
+        )
+    if check and not np.allclose(weights_sum, 1):
+        raise ValueError(
+            "Orbital weights for the atoms must be normalized, i.e. sum over the first "
+            "dimension must result in 1's."
+        )
     return output
 
 
@@ -288,6 +343,7 @@ def mulliken_populations_newbasis(
     coeff_ab_new,
     new_atom_indices,
     new_atom_weights=None,
+    check=True,
 ):
     r"""Return the Mulliken populations of the given system in a new basis set.
 
@@ -335,6 +391,9 @@ def mulliken_populations_newbasis(
         given atom is 1, only one basis function that belong to the given atoms is 0.5, and no basis
         functions is 0.
 
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `mulliken_populations`.
+
     Returns
     -------
     population : np.ndarray(M,)
@@ -349,7 +408,7 @@ def mulliken_populations_newbasis(
     """
     olp_new_new = coeff_ab_new.T.dot(olp_ab_ab).dot(coeff_ab_new)
     olp_new_mo = coeff_ab_new.T.dot(olp_ab_ab).dot(coeff_ab_mo)
-    coeff_new_mo = project(olp_new_new, olp_new_mo)
+    coeff_new_mo = project(olp_new_new, olp_new_mo, check=check)
     return mulliken_populations(
         coeff_new_mo,
         occupations,
@@ -357,11 +416,12 @@ def mulliken_populations_newbasis(
         num_atoms,
         new_atom_indices,
         atom_weights=new_atom_weights,
+        check=check,
     )
 
 
 def lowdin_populations(
-    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, atom_weights=None
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, atom_weights=None, check=True
 ):
     r"""Return the Lowdin populations of the given molecular orbitals in atomic orbital basis set.
 
@@ -404,6 +464,9 @@ def lowdin_populations(
         Default is the Mulliken partitioning scheme where two orbitals that belong to the given atom
         is 1, only one orbital that belong to the given atoms is 0.5, and no orbitals is 0.
 
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `mulliken_populations`.
+
     Returns
     -------
     population : np.ndarray(M,)
@@ -412,7 +475,7 @@ def lowdin_populations(
         `ab_atom_indices`.
 
     """
-    coeff_ab_oab = power_symmetric(olp_ab_ab, -0.5)
+    coeff_ab_oab = power_symmetric(olp_ab_ab, -0.5, check=check)
     return mulliken_populations_newbasis(
         coeff_ab_mo,
         occupations,
@@ -421,4 +484,339 @@ def lowdin_populations(
         coeff_ab_oab,
         ab_atom_indices,
         new_atom_weights=atom_weights,
+        check=check,
     )
+
+
+def mulliken_populations_batch(
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, check=True
+):
+    r"""Return the Mulliken populations of many sets of molecular orbitals in the same basis set.
+
+    The overlap matrix and the atom indices are validated once, and the populations of all frames
+    (e.g. snapshots of a trajectory or excited states) are computed with batched matrix products.
+    The population of each atomic orbital is obtained directly from the coefficients,
+
+    ..math::
+
+        \sum_k S_{jk} P_{kj} = \sum_i^{occ} n_i C_{ji} (SC)_{ji}
+
+    so that the density matrices of the frames are never formed.
+
+    Parameters
+    ----------
+    coeff_ab_mo : {np.ndarray(F, K, M), np.ndarray(K, M)}
+        Transformation matrices from the atomic basis to molecular orbitals of each frame, or one
+        transformation matrix shared by all frames.
+        Data type must be float.
+        `F` is the number of frames, `K` is the number of atomic orbitals and `M` is the number of
+        molecular orbitals.
+    occupations : {np.ndarray(F, M), np.ndarray(M,)}
+        Occupation numbers of each molecular orbital of each frame, or occupation numbers shared by
+        all frames.
+        Data type must be integers or floats.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions.
+        Data type must be floats.
+    num_atoms : int
+        Number of atoms.
+        Must be an integer.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+        Data type must be integers.
+
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `mulliken_populations`.
+
+    Returns
+    -------
+    population : np.ndarray(F, A)
+        Number of electrons associated with each atom in each frame.
+        `A` is the number of atoms.
+
+    Raises
+    ------
+    TypeError
+        If `coeff_ab_mo` is not a two- or three-dimensional numpy array of floats.
+        If `occupations` is not a one- or two-dimensional numpy array of ints/floats.
+        If `olp_ab_ab` is not a two-dimensional numpy array of floats.
+        If `num_atoms` is not an integer.
+        If `ab_atom_indices` is not a a one-dimensional numpy array of ints.
+    ValueError
+        If the number of frames of `coeff_ab_mo` and `occupations` are not compatible.
+        If `olp_ab_ab` is not square, symmetric or normalized.
+        If the number of atomic orbitals or molecular orbitals are not consistent.
+        If molecular orbitals are not normalized.
+        If `occupations` has any negative numbers.
+        If `ab_atom_indices` is not consistent with the number of atomic orbitals and atoms.
+
+    See Also
+    --------
+    orbstools.mulliken.mulliken_populations
+
+    """
+    coeff_ab_mo, occupations = _check_batch_input(coeff_ab_mo, occupations, olp_ab_ab, check)
+    _check_atom_indices(ab_atom_indices, olp_ab_ab.shape[0], num_atoms)
+    olp_coeff = np.matmul(olp_ab_ab, coeff_ab_mo)
+    if check and not np.allclose(np.sum(coeff_ab_mo * olp_coeff, axis=1), 1):
+        raise ValueError(
+            "Molecular orbitals (and the corresponding transformation matrix) must be normalized."
+        )
+    return _batch_populations(coeff_ab_mo, olp_coeff, occupations, num_atoms, ab_atom_indices)
+
+
+def mulliken_populations_newbasis_batch(
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, coeff_ab_new, new_atom_indices, check=True
+):
+    r"""Return the Mulliken populations of many sets of molecular orbitals in a new basis set.
+
+    The overlap of the new basis set and its inverse are computed once, and the molecular orbitals
+    of all frames are projected onto the new basis set with batched matrix products.
+
+    Parameters
+    ----------
+    coeff_ab_mo : {np.ndarray(F, K, M), np.ndarray(K, M)}
+        Transformation matrices from the atomic basis to molecular orbitals of each frame, or one
+        transformation matrix shared by all frames.
+        Data type must be float.
+    occupations : {np.ndarray(F, M), np.ndarray(M,)}
+        Occupation numbers of each molecular orbital of each frame, or occupation numbers shared by
+        all frames.
+        Data type must be integers or floats.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions.
+        Data type must be floats.
+    num_atoms : int
+        Number of atoms.
+        Must be an integer.
+    coeff_ab_new : np.ndarray(K, L)
+        Transformation matrix from the atomic basis to new basis functions.
+        Data type must be float.
+        `L` is the number of new basis functions.
+    new_atom_indices : np.ndarray(L,)
+        Index of the atom to which each of the new basis function belongs.
+        Data type must be integers.
+
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `mulliken_populations`.
+
+    Returns
+    -------
+    population : np.ndarray(F, A)
+        Number of electrons associated with each atom in each frame.
+        `A` is the number of atoms.
+
+    See Also
+    --------
+    orbstools.mulliken.mulliken_populations_newbasis
+
+    """
+    coeff_ab_mo, occupations = _check_batch_input(coeff_ab_mo, occupations, olp_ab_ab, check)
+    if not (
+        isinstance(coeff_ab_new, np.ndarray)
+        and coeff_ab_new.ndim == 2
+        and coeff_ab_new.shape[0] == olp_ab_ab.shape[0]
+    ):
+        raise TypeError(
+            "Transformation matrix from atomic basis functions to new basis functions must be a "
+            "two-dimensional numpy array with as many rows as atomic basis functions."
+        )
+    _check_atom_indices(new_atom_indices, coeff_ab_new.shape[1], num_atoms)
+    olp_new_ab = coeff_ab_new.T.dot(olp_ab_ab)
+    olp_new_new = olp_new_ab.dot(coeff_ab_new)
+    if check and not np.allclose(np.diag(olp_new_new), 1):
+        raise ValueError("Overlap of the new basis functions must be normalized.")
+    # project molecular orbitals of all frames onto the new basis, see orbstools.quasi.project
+    olp_new_new_inv = power_symmetric(olp_new_new, -1, check=check)
+    coeff_new_mo = np.matmul(olp_new_new_inv.dot(olp_new_ab), coeff_ab_mo)
+    olp_coeff = np.matmul(olp_new_new, coeff_new_mo)
+    norms = np.sum(coeff_new_mo * olp_coeff, axis=1)
+    # molecular orbitals without a projection onto the new basis do not contribute
+    normalizer = np.zeros(norms.shape)
+    normalizer[norms > 0] = norms[norms > 0] ** (-0.5)
+    coeff_new_mo *= normalizer[:, None, :]
+    olp_coeff *= normalizer[:, None, :]
+    return _batch_populations(coeff_new_mo, olp_coeff, occupations, num_atoms, new_atom_indices)
+
+
+def lowdin_populations_batch(
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, check=True
+):
+    r"""Return the Lowdin populations of many sets of molecular orbitals in the same basis set.
+
+    The overlap of the atomic basis functions is factorized once for all frames. Since the
+    symmetrically orthogonalized basis functions are orthonormal, the molecular orbitals of all
+    frames are transformed into this basis with one batched product with :math:`S^{1/2}`.
+
+    Parameters
+    ----------
+    coeff_ab_mo : {np.ndarray(F, K, M), np.ndarray(K, M)}
+        Transformation matrices from the atomic basis to molecular orbitals of each frame, or one
+        transformation matrix shared by all frames.
+        Data type must be float.
+    occupations : {np.ndarray(F, M), np.ndarray(M,)}
+        Occupation numbers of each molecular orbital of each frame, or occupation numbers shared by
+        all frames.
+        Data type must be integers or floats.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions.
+        Data type must be floats.
+    num_atoms : int
+        Number of atoms.
+        Must be an integer.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+        Data type must be integers.
+
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `mulliken_populations`.
+
+    Returns
+    -------
+    population : np.ndarray(F, A)
+        Number of electrons associated with each atom in each frame.
+        `A` is the number of atoms.
+
+    See Also
+    --------
+    orbstools.mulliken.lowdin_populations
+
+    """
+    coeff_ab_mo, occupations = _check_batch_input(coeff_ab_mo, occupations, olp_ab_ab, check)
+    _check_atom_indices(ab_atom_indices, olp_ab_ab.shape[0], num_atoms)
+    # coefficients of the molecular orbitals in the orthonormal basis, i.e. S^(1/2) C, since the
+    # orthonormal basis functions are given by S^(-1/2) (see orbstools.quasi.project)
+    coeff_oab_mo = np.matmul(factorize(olp_ab_ab, check=check).power(0.5), coeff_ab_mo)
+    norms = np.sum(coeff_oab_mo ** 2, axis=1)
+    # molecular orbitals without a projection onto the orthonormal basis do not contribute
+    normalizer = np.zeros(norms.shape)
+    normalizer[norms > 0] = norms[norms > 0] ** (-0.5)
+    coeff_oab_mo *= normalizer[:, None, :]
+    # overlap of the orthonormal basis functions is the identity
+    return _batch_populations(coeff_oab_mo, coeff_oab_mo, occupations, num_atoms, ab_atom_indices)
+
+
+def _check_batch_input(coeff_ab_mo, occupations, olp_ab_ab, check=True):
+    """Check the inputs of the batched population analysis.
+
+    Returns
+    -------
+    coeff_ab_mo : np.ndarray(F, K, M)
+        Transformation matrices with a leading frame axis (of size 1 if shared by all frames).
+    occupations : np.ndarray(F, M)
+        Occupation numbers with a leading frame axis (of size 1 if shared by all frames).
+
+    """
+    if not (
+        isinstance(coeff_ab_mo, np.ndarray)
+        and coeff_ab_mo.ndim in [2, 3]
+        and coeff_ab_mo.dtype == float
+    ):
+        raise TypeError(
+            "Transformation matrices from atomic basis functions to molecular orbitals must be a "
+            "two- or three-dimensional numpy array of floats."
+        )
+    if not (
+        isinstance(occupations, np.ndarray)
+        and occupations.ndim in [1, 2]
+        and occupations.dtype in [float, int]
+    ):
+        raise TypeError(
+            "Molecular orbital occupation numbers must be a one- or two-dimensional numpy array of "
+            "floats or ints."
+        )
+    if not (isinstance(olp_ab_ab, np.ndarray) and olp_ab_ab.ndim == 2 and olp_ab_ab.dtype == float):
+        raise TypeError(
+            "Overlap of the atomic basis functions must be a two-dimensional numpy array of floats."
+        )
+    if coeff_ab_mo.ndim == 2:
+        coeff_ab_mo = coeff_ab_mo[None, :, :]
+    if occupations.ndim == 1:
+        occupations = occupations[None, :]
+    if 1 not in [coeff_ab_mo.shape[0], occupations.shape[0]] and (
+        coeff_ab_mo.shape[0] != occupations.shape[0]
+    ):
+        raise ValueError(
+            "Number of frames in the transformation matrices and occupations are not equal."
+        )
+
+    if not olp_ab_ab.shape[0] == olp_ab_ab.shape[1]:
+        raise ValueError("Overlap matrix is not square.")
+    if not coeff_ab_mo.shape[1] == olp_ab_ab.shape[0]:
+        raise ValueError(
+            "Number of atomic orbitals in the transformation matrix and overlap matrix are not "
+            "equal."
+        )
+    if not coeff_ab_mo.shape[2] == occupations.shape[1]:
+        raise ValueError(
+            "Number of molecular orbitals in the transformation matrix and occupations are not "
+            "equal."
+        )
+    if check and not np.allclose(olp_ab_ab, olp_ab_ab.T):
+        raise ValueError("Overlap of the atomic basis functions must be symmetric.")
+    if check and not np.allclose(np.diag(olp_ab_ab), 1):
+        raise ValueError("Overlap of the atomic basis functions must be normalized.")
+
+    if not np.all(occupations >= 0):
+        raise ValueError("Occupation numbers must be greater than or equal to 0.")
+    if np.any(occupations > 2):
+        print("WARNING: Atleast one occupation number exceeds 2.")
+    return coeff_ab_mo, occupations
+
+
+def _check_atom_indices(atom_indices, num_basis, num_atoms):
+    """Check the indices of the atoms to which each basis function belongs."""
+    if not isinstance(num_atoms, int):
+        raise TypeError("Number of atoms must be an integer.")
+    if not (
+        isinstance(atom_indices, np.ndarray)
+        and atom_indices.ndim == 1
+        and atom_indices.dtype == int
+    ):
+        raise TypeError(
+            "Atom indices of each basis function must be a one-dimensional numpy array of "
+            "integers with size equal to the number of basis functions."
+        )
+    if atom_indices.size != num_basis:
+        raise ValueError("Number of atom indices must be equal to the number of basis functions.")
+    if not (np.all(atom_indices >= 0) and np.all(atom_indices < num_atoms)):
+        raise ValueError(
+            "Atom indices of each basis function must be greater than or equal to zero and "
+            " less than the number of atoms"
+        )
+
+
+def _batch_populations(coeff, olp_coeff, occupations, num_atoms, atom_indices):
+    """Return the Mulliken populations of the frames from the coefficients and their overlaps.
+
+    Parameters
+    ----------
+    coeff : np.ndarray(F, K, M)
+        Transformation matrices from the basis functions to molecular orbitals.
+    olp_coeff : np.ndarray(F, K, M)
+        Product of the overlap of the basis functions and the transformation matrices.
+    occupations : np.ndarray(F, M)
+        Occupation numbers of the molecular orbitals.
+    num_atoms : int
+        Number of atoms.
+    atom_indices : np.ndarray(K,)
+        Index of the atom to which each basis function belongs.
+
+    Returns
+    -------
+    population : np.ndarray(F, A)
+        Number of electrons associated with each atom in each frame.
+
+    """
+    # population of each basis function in each frame
+    basis_pops = np.matmul(coeff * olp_coeff, occupations[:, :, None])[:, :, 0]
+    # sum the populations of the basis functions of each atom in each frame, by offsetting the
+    # atom indices of each frame, see `mulliken_populations`
+    num_frames = basis_pops.shape[0]
+    frame_indices = atom_indices[None, :] + num_atoms * np.arange(num_frames)[:, None]
+    output = np.bincount(
+        frame_indices.ravel(), weights=basis_pops.ravel(), minlength=num_frames * num_atoms
+    ).reshape(num_frames, num_atoms)
+    if not np.all(np.abs(np.sum(occupations, axis=1) - np.sum(output, axis=1)) < 1e-6):
+        print("WARNING: Population does not match up with the number of electrons.")
+    return output
@@ -1,8 +1,18 @@
 """Tools for matrix decomposition and power."""
+from collections import OrderedDict
+import hashlib
+
 import numpy as np
 
 
-def eigh(matrix, threshold=1e-9):
+# NOTE: factorizations of the most recently used symmetric matrices that are requested with
+# `factorize(..., cache=True)`, keyed by their content. The total size of the stored arrays is
+# limited, so that the factorizations of large matrices are not kept alive.
+_FACTORIZATIONS = OrderedDict()
+_FACTORIZATIONS_MAXBYTES = 2 ** 27
+
+
+def eigh(matrix, threshold=1e-9, check=True):
     """Return the eigenvalues and eigenvectors of a Hermitian matrix.
 
     Eigenvalues whose absolute values are less than the threshold are discarded as well as the
@@ -14,6 +24,9 @@ def eigh(matrix, threshold=1e-9):
         Square Hermitian matrix.
     threshold : {1e-9, float}
         Eigenvalues (and corresponding eigenvectors) below this threshold are discarded.
+    check : {True, bool}
+        Check that the matrix is Hermitian.
+        Use False to skip this O(N^2) check for a matrix that is known to be Hermitian.
 
     Returns
     -------
@@ -29,7 +42,7 @@ def eigh(matrix, threshold=1e-9):
         If `threshold` is not an integer or a float.
     ValueError
         If `matrix` is not a square matrix.
-        If `matrix` is not Hermitian.
+        If `matrix` is not Hermitian (and `check` is True).
         If `threshold` is negative.
 
     Warns
@@ -46,7 +59,7 @@ def eigh(matrix, threshold=1e-9):
         raise TypeError("Given matrix must be a two-dimensional numpy array.")
     if matrix.shape[0] != matrix.shape[1]:
         raise ValueError("Given matrix must be square.")
-    if not np.allclose(matrix.conjugate().T, matrix):
+    if check and not np.allclose(matrix.conjugate().T, matrix):
         raise ValueError("Given matrix must be Hermitian.")
     if not isinstance(threshold, (int, float)):
         raise TypeError("Given threshold must be an integer or a float.")
@@ -130,7 +143,146 @@ def svd(matrix, threshold=1e-9):
     return u, sigma, vdagger
 
 
-def power_symmetric(matrix, k, threshold=1e-9):
+class SymmetricFactorization(object):
+    """Eigendecomposition of a symmetric matrix that is reused to compute its powers.
+
+    Attributes
+    ----------
+    eigval : np.ndarray(K,)
+        Eigenvalues (above the threshold) sorted in decreasing order.
+        Array is read-only.
+    eigvec : np.ndarray(N, K)
+        Matrix where the columns are the corresponding eigenvectors to the eigval.
+        Array is read-only.
+    max_powers : int
+        Maximum number of powers that are kept. The least recently used power is discarded.
+
+    """
+
+    max_powers = 2
+
+    def __init__(self, matrix, threshold=1e-9, check=True):
+        """Decompose the given symmetric matrix.
+
+        Parameters
+        ----------
+        matrix : np.ndarray(N, N)
+            Symmetric matrix.
+        threshold : {1e-9, float}
+            Eigenvalues (and corresponding eigenvectors) below this threshold are discarded.
+        check : {True, bool}
+            Check that the matrix is symmetric. See `eigh`.
+
+        """
+        self.eigval, self.eigvec = eigh(matrix, threshold=threshold, check=check)
+        self.eigval.flags.writeable = False
+        self.eigvec.flags.writeable = False
+        self._powers = OrderedDict()
+
+    @property
+    def nbytes(self):
+        """Return the number of bytes of the eigendecomposition and the kept powers."""
+        return (
+            self.eigval.nbytes
+            + self.eigvec.nbytes
+            + sum(matrix_power.nbytes for matrix_power in self._powers.values())
+        )
+
+    def power(self, k):
+        """Return the kth power of the matrix.
+
+        The most recently used powers are kept and returned as read-only arrays. Since the
+        eigenvalues below the threshold are discarded, negative powers are pseudo-inverses, e.g.
+        `power(-1)` gives the projection onto the space spanned by the basis functions of an
+        overlap matrix.
+
+        Parameters
+        ----------
+        k : {int, float}
+            Power of the matrix.
+
+        Returns
+        -------
+        matrix_power : np.ndarray(N, N)
+            Matrix raised to the kth power.
+
+        Raises
+        ------
+        ValueError
+            If the `k` is a fraction and matrix has negative eigenvalues.
+
+        """
+        if k in self._powers:
+            # mark as most recently used
+            self._powers[k] = self._powers.pop(k)
+            return self._powers[k]
+        if k % 1 != 0 and np.any(self.eigval < 0):
+            raise ValueError(
+                "Given matrix has negative eigenvalues. Fractional powers of negative "
+                "eigenvalues are not supported."
+            )
+        matrix_power = (self.eigvec * (self.eigval ** k)).dot(self.eigvec.T)
+        matrix_power.flags.writeable = False
+        self._powers[k] = matrix_power
+        while len(self._powers) > self.max_powers:
+            self._powers.popitem(last=False)
+        return matrix_power
+
+
+def factorize(matrix, threshold=1e-9, check=True, cache=False):
+    """Return the eigendecomposition of the given symmetric matrix.
+
+    If `cache` is True, the factorizations of the most recently used matrices are kept, so that a
+    matrix with the same content (and threshold) is not decomposed again. The kept factorizations
+    are limited to a total of `_FACTORIZATIONS_MAXBYTES` bytes, and a factorization that is larger
+    than this limit is not kept.
+
+    Parameters
+    ----------
+    matrix : np.ndarray(N, N)
+        Symmetric matrix.
+    threshold : {1e-9, float}
+        Eigenvalues (and corresponding eigenvectors) below this threshold are discarded.
+    check : {True, bool}
+        Check that the matrix is symmetric. See `eigh`.
+    cache : {False, bool}
+        Reuse and store the factorization of the matrix.
+
+    Returns
+    -------
+    factorization : SymmetricFactorization
+        Eigendecomposition of the matrix.
+
+    Raises
+    ------
+    TypeError
+        If `matrix` is not a two-dimensional numpy array.
+    ValueError
+        If `matrix` is not symmetric (and `check` is True).
+
+    """
+    if not cache:
+        return SymmetricFactorization(matrix, threshold=threshold, check=check)
+    if not (isinstance(matrix, np.ndarray) and matrix.ndim == 2):
+        raise TypeError("Given matrix must be a two-dimensional numpy array.")
+
+    sha = hashlib.sha1(np.ascontiguousarray(matrix).tobytes())
+    key = (matrix.shape, matrix.dtype.str, threshold, sha.hexdigest())
+    if key in _FACTORIZATIONS:
+        if check and not np.allclose(matrix.conjugate().T, matrix):
+            raise ValueError("Given matrix must be Hermitian.")
+        # mark as most recently used
+        factorization = _FACTORIZATIONS.pop(key)
+    else:
+        factorization = SymmetricFactorization(matrix, threshold=threshold, check=check)
+    _FACTORIZATIONS[key] = factorization
+    # NOTE: the size of the factorizations is updated, since their powers are added after storing
+    while sum(item.nbytes for item in _FACTORIZATIONS.values()) > _FACTORIZATIONS_MAXBYTES:
+        _FACTORIZATIONS.popitem(last=False)
+    return factorization
+
+
+def power_symmetric(matrix, k, threshold=1e-9, check=True, cache=False):
     """Return the kth power of the given symmetric matrix.
 
     Parameters
@@ -142,6 +294,11 @@ def power_symmetric(matrix, k, threshold=1e-9):
     threshold : {1e-9, float}
         In the eigenvalue decomposition, the eigenvalues (and corresponding eigenvectors) that are
         less than the threshold are discarded.
+    check : {True, bool}
+        Check that the matrix is symmetric. See `eigh`.
+    cache : {False, bool}
+        Reuse the eigendecomposition of the matrix from earlier calls with the same matrix. See
+        `factorize`.
 
     Returns
     -------
@@ -154,10 +311,5 @@ def power_symmetric(matrix, k, threshold=1e-9):
         If the `k` is a fraction and matrix has negative eigenvalues.
 
     """
-    eigval, eigvec = eigh(matrix, threshold=threshold)
-    if k % 1 != 0 and np.any(eigval < 0):
-        raise ValueError(
-            "Given matrix has negative eigenvalues. Fractional powers of negative eigenvalues are "
-            "not supported."
-        )
-    return (eigvec * (eigval ** k)).dot(eigvec.T)
+    factorization = factorize(matrix, threshold=threshold, check=check, cache=cache)
+    return factorization.power(k).copy()
@@ -4,7 +4,12 @@ from chemtools.orbstools import orthogonalization as orth
 
 
 def _check_input(
-    olp_ab_ab=None, olp_aao_ab=None, olp_aao_aao=None, coeff_ab_mo=None, indices_span=None
+    olp_ab_ab=None,
+    olp_aao_ab=None,
+    olp_aao_aao=None,
+    coeff_ab_mo=None,
+    indices_span=None,
+    check=True,
 ):
     """Check the inputs.
 
@@ -33,6 +38,10 @@ def _check_input(
         Molecular orbitals that will be spanned exactly by the quasi basis functions.
         Each entry is a boolean, where molecular orbitals that are exactly described have value
         `True`.
+    check : {True, bool}
+        Check the normalization, symmetry and positive semidefiniteness of the overlap matrices and
+        the normalization of the molecular orbitals.
+        Use False to skip these O(K^3) checks for inputs that are already verified.
 
     Raises
     ------
@@ -70,11 +79,11 @@ def _check_input(
             raise TypeError(
                 "Given overlap matrix for atomic basis is not a two-dimensional square numpy array."
             )
-        if not np.allclose(np.diag(olp_ab_ab), np.ones(olp_ab_ab.shape[0])):
+        if check and not np.allclose(np.diag(olp_ab_ab), np.ones(olp_ab_ab.shape[0])):
             raise ValueError("Given overlap matrix for atomic basis is not normalized.")
-        if not np.allclose(olp_ab_ab, olp_ab_ab.T):
+        if check and not np.allclose(olp_ab_ab, olp_ab_ab.T):
             raise ValueError("Given overlap matrix for atomic basis is not symmetric.")
-        if not np.all(orth.eigh(olp_ab_ab)[0] >= 0):
+        if check and not np.all(orth.factorize(olp_ab_ab, check=False).eigval >= 0):
             raise ValueError("Given overlap matrix for atomic basis is not positive semidefinite.")
 
     if olp_aao_ab is not None:
@@ -93,11 +102,11 @@ def _check_input(
             raise TypeError(
                 "Given overlap matrix for AAO is not a two dimensional square numpy array."
             )
-        if not np.allclose(np.diag(olp_aao_aao), np.ones(olp_aao_aao.shape[0])):
+        if check and not np.allclose(np.diag(olp_aao_aao), np.ones(olp_aao_aao.shape[0])):
             raise ValueError("Given overlap matrix for AAO is not normalized.")
-        if not np.allclose(olp_aao_aao, olp_aao_aao.T):
+        if check and not np.allclose(olp_aao_aao, olp_aao_aao.T):
             raise ValueError("Given overlap matrix for AAO is not symmetric.")
-        if not np.all(orth.eigh(olp_aao_aao)[0] >= 0):
+        if check and not np.all(orth.factorize(olp_aao_aao, check=False, cache=True).eigval >= 0):
             raise ValueError("Given overlap matrix for AAO is not positive semidefinite.")
 
     if (
@@ -138,9 +147,10 @@ def _check_input(
             "`olp_ab_ab`."
         )
 
-    if coeff_ab_mo is not None and olp_ab_ab is not None:
-        olp_mo_mo = coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)
-        if not np.allclose(np.diag(olp_mo_mo), np.ones(olp_mo_mo.shape[0])):
+    if check and coeff_ab_mo is not None and olp_ab_ab is not None:
+        # NOTE: only the diagonal of the overlap of the molecular orbitals is built
+        norm_mo = np.sum(coeff_ab_mo * olp_ab_ab.dot(coeff_ab_mo), axis=0)
+        if not np.allclose(norm_mo, np.ones(norm_mo.size)):
             raise ValueError(
                 "The overlap of the molecular orbitals, calculated from `coeff_ab_mo` and "
                 "`olp_ab_ab` is not normalized."
@@ -162,7 +172,7 @@ def _check_input(
             )
 
 
-def project(olp_one_one, olp_one_two):
+def project(olp_one_one, olp_one_two, check=True):
     r"""Project one basis set onto another basis set.
 
     .. math::
@@ -180,6 +190,9 @@ def project(olp_one_one, olp_one_two):
         Overlap of the basis functions in set 1 with basis functions from set 1.
     olp_one_two : np.ndarray(N, M)
         Overlap of the basis functions in set 1 with basis functions from set 2.
+    check : {True, bool}
+        Check that `olp_one_one` is symmetric and that the projections are linearly independent.
+        Use False to skip these checks for inputs that are already verified.
 
     Returns
     -------
@@ -201,7 +214,7 @@ def project(olp_one_one, olp_one_two):
             "Number of rows/columns of `olp_one_one` must be equal to the number of rows in "
             "`olp_one_two`."
         )
-    olp_one_one_inv = orth.power_symmetric(olp_one_one, -1)
+    olp_one_one_inv = orth.factorize(olp_one_one, check=check).power(-1)
     coeff_one_proj = olp_one_one_inv.dot(olp_one_two)
     # Remove zero columns
     coeff_one_proj = coeff_one_proj[:, np.any(coeff_one_proj, axis=0)]
@@ -210,6 +223,8 @@ def project(olp_one_one, olp_one_two):
     normalizer = np.diag(olp_proj_proj) ** (-0.5)
     coeff_one_proj *= normalizer
     # Check linear dependence
+    if not check:
+        return coeff_one_proj
     rank = np.linalg.matrix_rank(coeff_one_proj)
     if rank < coeff_one_proj.shape[1]:
         print(
@@ -221,7 +236,7 @@ def project(olp_one_one, olp_one_two):
     return coeff_one_proj
 
 
-def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
+def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None, check=True):
     r"""Return transformation matrix from atomic basis functions to minimal molecular orbitals.
 
     Parameters
@@ -236,6 +251,8 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
     dim_mmo : {int, None}
         Total dimension of the MMO space.
         Default is the dimension of the reference basis function space.
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `_check_input`.
 
     Returns
     -------
@@ -260,9 +277,43 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
         234107.
 
     """
-    _check_input(coeff_ab_mo=coeff_ab_mo, olp_aao_ab=olp_aao_ab, indices_span=indices_span)
+    _check_input(
+        coeff_ab_mo=coeff_ab_mo, olp_aao_ab=olp_aao_ab, indices_span=indices_span, check=check
+    )
     olp_aao_mo = olp_aao_ab.dot(coeff_ab_mo)
+    coeff_virmo_virmmo = _virtual_mmo(olp_aao_mo, indices_span, dim_mmo)
+    # Express MMO wrt atomic basis functions
+    return _transform_mmo(coeff_ab_mo, indices_span, coeff_virmo_virmmo)
+
+
+def _virtual_mmo(olp_aao_mo, indices_span, dim_mmo=None):
+    """Return transformation matrix from virtual molecular orbitals to virtual MMO's.
+
+    Parameters
+    ----------
+    olp_aao_mo : np.ndarray(L, M)
+        Overlap between reference basis functions (rows) and molecular orbitals (columns).
+    indices_span : np.ndarray(M)
+        Boolean indices for the molecular orbitals that will be spanned by the generated MMO's.
+    dim_mmo : {int, None}
+        Total dimension of the MMO space.
+        Default is the dimension of the reference basis function space.
 
+    Returns
+    -------
+    coeff_virmo_virmmo : np.ndarray
+        Transformation matrix from molecular orbitals that are not spanned (rows) to virtual MMO's
+        (columns). Only the MMO's that are added to the spanned molecular orbitals are included.
+
+    Raises
+    ------
+    TypeError
+        If `dim_mmo` is not an integer (or None).
+    ValueError
+        If the dimension of the MMO space is larger than the number of molecular orbitals.
+        If the dimension of the MMO space is smaller than the space that needs to be spanned.
+
+    """
     num_aao, num_mo = olp_aao_mo.shape
     if dim_mmo is None:
         dim_mmo = num_aao
@@ -278,34 +329,85 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
             "Dimension of MMO space, {0}, is smaller than the space you want to span, {1}."
             "".format(dim_mmo, np.sum(indices_span))
         )
+    num_to_add = dim_mmo - np.sum(indices_span)
 
-    # Set local variables
-    dim_span = np.sum(indices_span)
-    num_to_add = dim_mmo - dim_span
+    # find overlap between aao and virtuals
+    olp_aao_virmo = olp_aao_mo[:, ~indices_span]
+    # from the right singular vector of olp_aao_virmo
+    # NOTE: the reduced SVD of the (L, M_vir) matrix costs O(L^2 M_vir) and only the right singular
+    # vectors with the largest (num_to_add) singular values are kept
+    vdagger = orth.svd(olp_aao_virmo)[2]
+    return vdagger[:num_to_add].T
 
-    # Create occupied MMO
-    coeff_occmo_occmmo = np.identity(dim_span)
 
-    # Create virtual MMO
-    #  find overlap between aao and virtuals
-    olp_aao_virmo = olp_aao_mo[:, ~indices_span]
-    #  from the right singular vector of olp_aao_virmo
-    coeff_virmo_virmmo = orth.svd(olp_aao_virmo)[2].T
-    #  select vectors with largest (num_to_add) singular values
-    coeff_virmo_virmmo = coeff_virmo_virmmo[:, :num_to_add]
-
-    # Combine the occupied and virtual MMO's
-    coeff_mo_occmmo = np.zeros((indices_span.size, coeff_occmo_occmmo.shape[1]))
-    coeff_mo_occmmo[indices_span] = coeff_occmo_occmmo
-    coeff_mo_virmmo = np.zeros((indices_span.size, coeff_virmo_virmmo.shape[1]))
-    coeff_mo_virmmo[~indices_span] = coeff_virmo_virmmo
-    coeff_mo_mmo = np.hstack((coeff_mo_occmmo, coeff_mo_virmmo))
+def _transform_mmo(matrix_mo, indices_span, coeff_virmo_virmmo):
+    """Return the given matrix with its molecular orbital columns transformed to MMO's.
 
-    # Express MMO wrt atomic basis functions
-    return coeff_ab_mo.dot(coeff_mo_mmo)
+    The spanned molecular orbitals are the first MMO's, so only the columns of the virtual molecular
+    orbitals are multiplied, i.e. the (M, dim_mmo) transformation matrix is never built.
+
+    Parameters
+    ----------
+    matrix_mo : np.ndarray(N, M)
+        Matrix whose columns correspond to the molecular orbitals, e.g. the transformation matrix
+        from the atomic basis functions to molecular orbitals.
+    indices_span : np.ndarray(M)
+        Boolean indices for the molecular orbitals that are spanned by the MMO's.
+    coeff_virmo_virmmo : np.ndarray
+        Transformation matrix from virtual molecular orbitals to virtual MMO's.
+
+    Returns
+    -------
+    matrix_mmo : np.ndarray(N, dim_mmo)
+        Matrix whose columns correspond to the MMO's.
+
+    """
+    return np.hstack(
+        (matrix_mo[:, indices_span], matrix_mo[:, ~indices_span].dot(coeff_virmo_virmmo))
+    )
+
+
+def _quasi_orbitals(olp_ab_ab, olp_aao_mo, olp_ref_mo, coeff_ab_mo, indices_span, dim, check):
+    """Return transformation matrix from atomic basis functions to the AAO's projected onto MMO's.
+
+    Parameters
+    ----------
+    olp_ab_ab : np.ndarray(K, K)
+        Overlaps of the atomic basis functions.
+    olp_aao_mo : np.ndarray(L, M)
+        Overlaps of the reference basis functions (aao) with the molecular orbitals.
+    olp_ref_mo : np.ndarray(L, M)
+        Overlaps of the basis functions used to build the MMO's with the molecular orbitals.
+    coeff_ab_mo : np.ndarray(K, M)
+        Transformation matrix from the atomic basis functions to molecular orbitals.
+    indices_span : np.ndarray(M)
+        Molecular orbitals that will be spanned exactly.
+    dim : {int, None}
+        Number of quasi atomic orbitals.
+    check : bool
+        Check the numerical properties of the MMO's in the projection.
+
+    Returns
+    -------
+    coeff_ab_quasi : np.ndarray
+        Transformation matrix from atomic basis functions to the quasi atomic orbitals.
 
+    """
+    coeff_virmo_virmmo = _virtual_mmo(olp_ref_mo, indices_span, dim_mmo=dim)
+    coeff_ab_mmo = _transform_mmo(coeff_ab_mo, indices_span, coeff_virmo_virmmo)
+    # NOTE: overlaps with the AAO's are obtained from the (L, M) overlaps with the molecular
+    # orbitals rather than from the (L, K) overlaps with the atomic basis functions
+    olp_mmo_aao = _transform_mmo(olp_aao_mo, indices_span, coeff_virmo_virmmo).T
+    olp_mmo_mmo = coeff_ab_mmo.T.dot(olp_ab_ab.dot(coeff_ab_mmo))
+    coeff_mmo_proj = project(olp_mmo_mmo, olp_mmo_aao, check=check)
+    # Normalize
+    olp_proj_proj = coeff_mmo_proj.T.dot(olp_mmo_mmo).dot(coeff_mmo_proj)
+    coeff_mmo_proj *= np.diag(olp_proj_proj) ** (-0.5)
+
+    return coeff_ab_mmo.dot(coeff_mmo_proj)
 
-def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None):
+
+def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None, check=True):
     r"""Return transformation matrix from atomic basis functions to QUAMBO's.
 
     Parameters
@@ -333,6 +435,8 @@ def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None):
     dim : {int, None}
         Number of QUAMBO basis functions.
         Default is the number of reference basis functions.
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `_check_input`.
 
     Returns
     -------
@@ -364,21 +468,13 @@ def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None):
         olp_aao_ab=olp_aao_ab,
         coeff_ab_mo=coeff_ab_mo,
         indices_span=indices_span,
+        check=check,
     )
-    # Find MMO for QUAMBOs
-    coeff_ab_mmo = make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=dim)
-    # Get transformation
-    olp_mmo_mmo = coeff_ab_mmo.T.dot(olp_ab_ab).dot(coeff_ab_mmo)
-    olp_mmo_aao = (olp_aao_ab.dot(coeff_ab_mmo)).T
-    coeff_mmo_proj = project(olp_mmo_mmo, olp_mmo_aao)
-    # Normalize
-    olp_proj_proj = coeff_mmo_proj.T.dot(olp_mmo_mmo).dot(coeff_mmo_proj)
-    coeff_mmo_proj *= np.diag(olp_proj_proj) ** (-0.5)
-
-    return coeff_ab_mmo.dot(coeff_mmo_proj)
+    olp_aao_mo = olp_aao_ab.dot(coeff_ab_mo)
+    return _quasi_orbitals(olp_ab_ab, olp_aao_mo, olp_aao_mo, coeff_ab_mo, indices_span, dim, check)
 
 
-def quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None):
+def quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None, check=True):
     r"""Return transformation matrix from atomic basis functions to QUAO's.
 
     Parameters
@@ -412,6 +508,8 @@ def quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None
     dim : {int, None}
         Number of QUAMBO basis functions.
         Default is the number of reference basis functions.
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `_check_input`.
 
     Returns
     -------
@@ -443,20 +541,68 @@ def quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None
         olp_aao_aao=olp_aao_aao,
         coeff_ab_mo=coeff_ab_mo,
         indices_span=indices_span,
+        check=check,
+    )
+    olp_aao_mo = olp_aao_ab.dot(coeff_ab_mo)
+    # Orthogonalize AAOs (MMO for QUAOs are obtained using the orthogonalized AAOs)
+    olp_oaao_mo = orth.factorize(olp_aao_aao, check=check, cache=True).power(-0.5).dot(olp_aao_mo)
+    return _quasi_orbitals(
+        olp_ab_ab, olp_aao_mo, olp_oaao_mo, coeff_ab_mo, indices_span, dim, check
     )
-    # Orthogonalize AAOs
-    olp_oaao_ab = orth.power_symmetric(olp_aao_aao, -0.5).dot(olp_aao_ab)
 
-    # Get MMOs using the orthogonalized AAOs (MMO for QUAOs)
-    coeff_ab_mmo = make_mmo(olp_oaao_ab, coeff_ab_mo, indices_span, dim_mmo=dim)
 
-    # Find transformation for QUAOs
-    olp_mmo_mmo = coeff_ab_mmo.T.dot(olp_ab_ab).dot(coeff_ab_mmo)
-    olp_mmo_aao = (olp_aao_ab.dot(coeff_ab_mmo)).T
-    coeff_mmo_proj = project(olp_mmo_mmo, olp_mmo_aao)
+def quambo_quao(
+    olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None, check=True
+):
+    r"""Return transformation matrices from atomic basis functions to QUAMBO's and QUAO's.
 
-    # Normalize
-    olp_proj_proj = coeff_mmo_proj.T.dot(olp_mmo_mmo).dot(coeff_mmo_proj)
-    coeff_mmo_proj *= np.diag(olp_proj_proj) ** (-0.5)
+    The inputs are checked once, and the overlaps of the reference basis functions with the
+    molecular orbitals are computed once and reused for both sets of quasi atomic orbitals.
 
-    return coeff_ab_mmo.dot(coeff_mmo_proj)
+    Parameters
+    ----------
+    olp_ab_ab : np.ndarray(K, K)
+        Overlaps of the atomic basis functions.
+    olp_aao_ab : np.ndarray(L, K)
+        Overlaps of the reference basis functions (aao) with the atomic basis functions.
+    olp_aao_aao : np.ndarray(L, L)
+        Overlaps of the reference basis functions (aao).
+    coeff_ab_mo : np.ndarray(K, M)
+        Transformation matrix from the atomic basis functions to molecular orbitals.
+    indices_span : np.ndarray(M)
+        Molecular orbitals that will be spanned exactly by the QUAMBO's and QUAO's.
+    dim : {int, None}
+        Number of QUAMBO (and QUAO) basis functions.
+        Default is the number of reference basis functions.
+    check : {True, bool}
+        Check the numerical properties of the inputs. See `_check_input`.
+
+    Returns
+    -------
+    coeff_ab_quambo : np.ndarray
+        Transformation matrix from atomic basis functions to QUAMBO's.
+    coeff_ab_quao : np.ndarray
+        Transformation matrix from atomic basis functions to QUAO's.
+
+    See Also
+    --------
+    orbstools.quasi.quambo, orbstools.quasi.quao
+
+    """
+    _check_input(
+        olp_ab_ab=olp_ab_ab,
+        olp_aao_ab=olp_aao_ab,
+        olp_aao_aao=olp_aao_aao,
+        coeff_ab_mo=coeff_ab_mo,
+        indices_span=indices_span,
+        check=check,
+    )
+    olp_aao_mo = olp_aao_ab.dot(coeff_ab_mo)
+    olp_oaao_mo = orth.factorize(olp_aao_aao, check=check, cache=True).power(-0.5).dot(olp_aao_mo)
+    coeff_ab_quambo = _quasi_orbitals(
+        olp_ab_ab, olp_aao_mo, olp_aao_mo, coeff_ab_mo, indices_span, dim, check
+    )
+    coeff_ab_quao = _quasi_orbitals(
+        olp_ab_ab, olp_aao_mo, olp_oaao_mo, coeff_ab_mo, indices_span, dim, check
+    )
+    return coeff_ab_quambo, coeff_ab_quao
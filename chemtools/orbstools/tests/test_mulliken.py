@@ -6,13 +6,17 @@ except ImportError:
 
 from chemtools.orbstools.mulliken import (
     lowdin_populations,
+    lowdin_populations_batch,
     mulliken_populations,
+    mulliken_populations_batch,
     mulliken_populations_newbasis,
+    mulliken_populations_newbasis_batch,
 )
 from chemtools.orbstools.orthogonalization import power_symmetric
 from chemtools.orbstools.quasi import project
 import numpy as np
 from numpy.testing import assert_raises
+from scipy.sparse import csr_matrix
 
 
 def test_mulliken_populations_input():
@@ -385,6 +389,78 @@ def test_mulliken_populations():
     )
 
 
+def test_mulliken_populations_atom_weights():
+    """Test orbstools.mulliken.mulliken_populations with different forms of atom weights."""
+    with path("chemtools.data", "naclo4_coeff_ab_mo.npy") as fname:
+        coeff_ab_mo = np.load(str(fname))
+    with path("chemtools.data", "naclo4_olp_ab_ab.npy") as fname:
+        olp_ab_ab = np.load(str(fname))
+    with path("chemtools.data", "naclo4_occupations.npy") as fname:
+        occupations = np.load(str(fname))
+    with path("chemtools.data", "naclo4_ab_atom_indices.npy") as fname:
+        ab_atom_indices = np.load(str(fname))
+    # Mulliken weights as a (A, K, K) array
+    atom_weights = np.zeros((6, 124, 124))
+    ab_atom_indices_separated = ab_atom_indices[None, :] == np.arange(6)[:, None]
+    atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, :, None]
+    atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, None, :]
+    expected = np.sum(
+        (olp_ab_ab * (coeff_ab_mo * occupations).dot(coeff_ab_mo.T).T)[None] * atom_weights,
+        axis=(1, 2),
+    )
+    assert np.allclose(
+        mulliken_populations(coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices), expected
+    )
+    assert np.allclose(
+        mulliken_populations(
+            coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices, atom_weights=atom_weights
+        ),
+        expected,
+    )
+    # weights of each atom given by a generator & as sparse matrices
+    assert np.allclose(
+        mulliken_populations(
+            coeff_ab_mo,
+            occupations,
+            olp_ab_ab,
+            6,
+            ab_atom_indices,
+            atom_weights=(weights for weights in atom_weights),
+        ),
+        expected,
+    )
+    assert np.allclose(
+        mulliken_populations(
+            coeff_ab_mo,
+            occupations,
+            olp_ab_ab,
+            6,
+            ab_atom_indices,
+            atom_weights=[csr_matrix(weights) for weights in atom_weights],
+        ),
+        expected,
+    )
+    # wrong number of atoms, shape, type & normalization
+    for weights in [
+        atom_weights[:5],
+        list(atom_weights) + [atom_weights[0]],
+        [weights[:, :-1] for weights in atom_weights],
+        [weights.tolist() for weights in atom_weights],
+        [2 * weights for weights in atom_weights],
+        5,
+    ]:
+        assert_raises(
+            (TypeError, ValueError),
+            mulliken_populations,
+            coeff_ab_mo,
+            occupations,
+            olp_ab_ab,
+            6,
+            ab_atom_indices,
+            atom_weights=iter(weights) if isinstance(weights, list) else weights,
+        )
+
+
 def test_mulliken_populations_newbasis():
     """Test orbstools.mulliken.mulliken_populations_newabasis."""
     with path("chemtools.data", "naclo4_coeff_ab_mo.npy") as fname:
@@ -438,3 +514,68 @@ def test_lowdin_populations():
         ),
         lowdin_populations(coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices),
     )
+
+
+def test_populations_batch():
+    """Test orbstools.mulliken batched population analysis against single frame analysis."""
+    with path("chemtools.data", "naclo4_coeff_ab_mo.npy") as fname:
+        coeff_ab_mo = np.load(str(fname))
+    with path("chemtools.data", "naclo4_olp_ab_ab.npy") as fname:
+        olp_ab_ab = np.load(str(fname))
+    with path("chemtools.data", "naclo4_occupations.npy") as fname:
+        occupations = np.load(str(fname))
+    with path("chemtools.data", "naclo4_ab_atom_indices.npy") as fname:
+        ab_atom_indices = np.load(str(fname))
+    # frames with rotated occupied orbitals & with different occupations
+    occupied = occupations > 0
+    coeffs, occs = [], []
+    for _ in range(3):
+        unitary = np.linalg.svd(np.random.rand(np.sum(occupied), np.sum(occupied)))[0]
+        coeff = coeff_ab_mo.copy()
+        coeff[:, occupied] = coeff[:, occupied].dot(unitary)
+        coeffs.append(coeff)
+        occ = occupations.astype(float)
+        occ[occupied] *= np.random.uniform(0.5, 1.0, np.sum(occupied))
+        occs.append(occ)
+    coeffs, occs = np.array(coeffs), np.array(occs)
+
+    for batch_func, func, args in [
+        (mulliken_populations_batch, mulliken_populations, (6, ab_atom_indices)),
+        (lowdin_populations_batch, lowdin_populations, (6, ab_atom_indices)),
+        (
+            mulliken_populations_newbasis_batch,
+            mulliken_populations_newbasis,
+            (6, np.identity(124), ab_atom_indices),
+        ),
+    ]:
+        # stack of coefficients & occupations
+        expected = np.array(
+            [func(coeff, occ, olp_ab_ab, *args) for coeff, occ in zip(coeffs, occs)]
+        )
+        assert np.allclose(batch_func(coeffs, occs, olp_ab_ab, *args), expected)
+        # skip the checks of the numerical properties of the inputs
+        assert np.allclose(batch_func(coeffs, occs, olp_ab_ab, *args, check=False), expected)
+        assert np.allclose(
+            [func(coeff, occ, olp_ab_ab, *args, check=False) for coeff, occ in zip(coeffs, occs)],
+            expected,
+        )
+        # shared coefficients or shared occupations
+        expected = np.array([func(coeff_ab_mo, occ, olp_ab_ab, *args) for occ in occs])
+        assert np.allclose(batch_func(coeff_ab_mo, occs, olp_ab_ab, *args), expected)
+        expected = np.array([func(coeff, occupations, olp_ab_ab, *args) for coeff in coeffs])
+        assert np.allclose(batch_func(coeffs, occupations, olp_ab_ab, *args), expected)
+        assert_raises(ValueError, batch_func, coeffs, occs[:2], olp_ab_ab, *args)
+        assert_raises(TypeError, batch_func, coeffs.tolist(), occs, olp_ab_ab, *args)
+        assert_raises(ValueError, batch_func, coeffs, -occs, olp_ab_ab, *args)
+    assert_raises(
+        ValueError, mulliken_populations_batch, coeffs, occs, olp_ab_ab, 5, ab_atom_indices
+    )
+    assert_raises(
+        ValueError, mulliken_populations_batch, 2 * coeffs, occs, olp_ab_ab, 6, ab_atom_indices
+    )
+    mulliken_populations_batch(2 * coeffs, occs, olp_ab_ab, 6, ab_atom_indices, check=False)
+    coeff = 2 * coeff_ab_mo
+    assert_raises(
+        ValueError, mulliken_populations, coeff, occupations, olp_ab_ab, 6, ab_atom_indices
+    )
+    mulliken_populations(coeff, occupations, olp_ab_ab, 6, ab_atom_indices, check=False)
@@ -10,6 +10,12 @@ def test_eigh():
     assert_raises(TypeError, orth.eigh, np.random.rand(3, 3, 3))
     assert_raises(ValueError, orth.eigh, np.random.rand(3, 5))
     assert_raises(ValueError, orth.eigh, np.random.rand(3, 3))
+    # skip the check that the matrix is Hermitian (only the lower triangle is used)
+    matrix = np.random.rand(3, 3)
+    assert np.allclose(
+        orth.eigh(matrix, threshold=0, check=False)[0],
+        orth.eigh(np.tril(matrix) + np.tril(matrix, -1).T, threshold=0)[0],
+    )
     matrix = np.random.rand(3, 3)
     assert_raises(TypeError, orth.eigh, matrix + matrix.T, threshold=None)
     matrix = np.random.rand(3, 3)
@@ -78,3 +84,52 @@ def test_power_symmetric():
     matrix = np.random.rand(100, 100)
     matrix = matrix + matrix.T
     assert_raises(ValueError, orth.power_symmetric, matrix, 0.5)
+
+
+def test_factorize():
+    """Test orbstools.orthogonalization.factorize."""
+    assert_raises(TypeError, orth.factorize, np.random.rand(3, 3).tolist(), cache=True)
+    assert_raises(ValueError, orth.factorize, np.random.rand(3, 3))
+    assert_raises(ValueError, orth.factorize, np.random.rand(3, 3), cache=True)
+    matrix = np.random.rand(5, 5)
+    matrix = matrix.dot(matrix.T)
+    factorization = orth.factorize(matrix)
+    eigval, eigvec = factorization.eigval, factorization.eigvec
+    assert np.allclose((eigvec * eigval).dot(eigvec.T), matrix)
+    assert not eigval.flags.writeable
+    assert not eigvec.flags.writeable
+    # most recently used powers are kept
+    assert np.allclose(factorization.power(-1).dot(matrix), np.identity(5))
+    assert factorization.power(-0.5) is factorization.power(-0.5)
+    assert not factorization.power(-0.5).flags.writeable
+    assert np.allclose(orth.power_symmetric(matrix, -0.5), factorization.power(-0.5))
+    assert orth.power_symmetric(matrix, -0.5, cache=True).flags.writeable
+    matrix_power = factorization.power(2)
+    for k in range(3, 3 + factorization.max_powers):
+        factorization.power(k)
+    assert factorization.power(2) is not matrix_power
+    assert np.allclose(factorization.power(2), matrix_power)
+    # factorizations are stored only on request
+    assert orth.factorize(matrix) is not orth.factorize(matrix)
+    factorization = orth.factorize(matrix, cache=True)
+    assert orth.factorize(matrix.copy(), cache=True) is factorization
+    assert orth.factorize(matrix, threshold=1e-6, cache=True) is not factorization
+    assert orth.factorize(matrix + 1, cache=True) is not factorization
+    # stored factorizations are limited by their total size
+    maxbytes = orth._FACTORIZATIONS_MAXBYTES
+    orth._FACTORIZATIONS_MAXBYTES = 2 * factorization.nbytes
+    try:
+        for _ in range(3):
+            orth.factorize(np.identity(5) * np.random.uniform(1, 2), cache=True)
+        assert orth.factorize(matrix, cache=True) is not factorization
+        large = np.identity(20)
+        assert orth.factorize(large, cache=True) is not orth.factorize(large, cache=True)
+    finally:
+        orth._FACTORIZATIONS_MAXBYTES = maxbytes
+    # stored factorization of a non-symmetric matrix is checked
+    matrix = np.random.rand(3, 3)
+    orth.factorize(matrix, check=False, cache=True)
+    assert_raises(ValueError, orth.factorize, matrix, cache=True)
+    # fractional powers of negative eigenvalues
+    matrix = np.diag([1.0, -1.0])
+    assert_raises(ValueError, orth.factorize(matrix).power, 0.5)
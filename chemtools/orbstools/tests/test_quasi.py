@@ -5,7 +5,7 @@ except ImportError:
     from importlib.resources import path
 
 from chemtools.orbstools.mulliken import mulliken_populations
-from chemtools.orbstools.quasi import _check_input, make_mmo, project, quambo, quao
+from chemtools.orbstools.quasi import _check_input, make_mmo, project, quambo, quambo_quao, quao
 import numpy as np
 from numpy.testing import assert_raises
 
@@ -301,3 +301,35 @@ def test_quao():
     assert np.allclose(
         partial_pop, np.array([0.967, 2.498, -0.819, -0.914, -0.914, -0.819]), atol=1e-3
     )
+
+
+def test_quambo_quao():
+    """Test orbstools.quasi.quambo_quao against orbstools.quasi.quambo and orbstools.quasi.quao."""
+    with path("chemtools.data", "naclo4_coeff_ab_mo.npy") as fname:
+        coeff_ab_mo = np.load(str(fname))
+    with path("chemtools.data", "naclo4_olp_ab_ab.npy") as fname:
+        olp_ab_ab = np.load(str(fname))
+    with path("chemtools.data", "naclo4_olp_aao_ab.npy") as fname:
+        olp_aao_ab = np.load(str(fname))
+    with path("chemtools.data", "naclo4_olp_aao_aao.npy") as fname:
+        olp_aao_aao = np.load(str(fname))
+    with path("chemtools.data", "naclo4_occupations.npy") as fname:
+        occupations = np.load(str(fname))
+    indices_span = occupations > 0
+
+    coeff_ab_quambo = quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span)
+    coeff_ab_quao = quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span)
+    results = quambo_quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span)
+    assert np.allclose(results[0], coeff_ab_quambo)
+    assert np.allclose(results[1], coeff_ab_quao)
+    # skip the checks of the numerical properties of the inputs
+    results = quambo_quao(
+        olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, check=False
+    )
+    assert np.allclose(results[0], coeff_ab_quambo)
+    assert np.allclose(results[1], coeff_ab_quao)
+    assert np.allclose(
+        quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, check=False), coeff_ab_quambo
+    )
+    assert_raises(ValueError, quambo, olp_ab_ab, olp_aao_ab, 2 * coeff_ab_mo, indices_span)
+    quambo(olp_ab_ab, olp_aao_ab, 2 * coeff_ab_mo, indices_span, check=False)
@@ -25,3 +25,4 @@
 
 from chemtools.outputs.vmd import *
 from chemtools.outputs.plot import *
+from chemtools.outputs.isosurface import *
@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Iso-Surface Module."""
+
+
+import json
+import base64
+
+import numpy as np
+
+
+__all__ = ['IsoSurface']
+
+
+class IsoSurface(object):
+    r"""Triangulated iso-surface of a scalar field evaluated on a cubic grid.
+
+    The iso-surface is extracted with the marching tetrahedra variant of the marching cubes
+    algorithm: every cell of the cubic grid is split into six tetrahedra sharing the cell
+    diagonal, and each tetrahedron crossed by the iso-surface contributes one or two triangles.
+    This needs no ambiguity resolution and gives a closed surface (wherever the iso-surface does
+    not leave the grid). Only cells crossed by the iso-surface are processed, and all of them
+    are processed at once. The vertices on the edges shared by neighbouring tetrahedra are
+    merged, and the faces are oriented so that their normals point towards decreasing values
+    of the scalar field (i.e. outwards for electron density iso-surfaces).
+    """
+
+    def __init__(self, vertices, faces, normals=None, values=None):
+        r"""Initialize class.
+
+        Parameters
+        ----------
+        vertices : np.ndarray, shape=(N, 3)
+            Cartesian coordinates of the vertices.
+        faces : np.ndarray, shape=(M, 3)
+            Indices of the three vertices of each triangle.
+        normals : np.ndarray, shape=(N, 3), optional
+            Unit normal vectors at the vertices. If None, the area-weighted average of the
+            normals of the triangles sharing each vertex is used.
+        values : np.ndarray, shape=(N,), optional
+            Scalar property at the vertices used for coloring the iso-surface.
+
+        """
+        if vertices.ndim != 2 or vertices.shape[1] != 3:
+            raise ValueError('Argument vertices should be a 2D array with 3 columns! '
+                             'Given {0}'.format(vertices.shape))
+        if faces.ndim != 2 or faces.shape[1] != 3:
+            raise ValueError('Argument faces should be a 2D array with 3 columns! '
+                             'Given {0}'.format(faces.shape))
+        if faces.size != 0 and (np.min(faces) < 0 or np.max(faces) >= vertices.shape[0]):
+            raise ValueError('Argument faces should contain indices of the vertices!')
+        if normals is None:
+            normals = self._compute_normals(vertices, faces)
+        elif normals.shape != vertices.shape:
+            raise ValueError('Argument normals should have {0} shape! '
+                             'Given {1}'.format(vertices.shape, normals.shape))
+        if values is not None and values.shape != (vertices.shape[0],):
+            raise ValueError('Argument values should have ({0},) shape! '
+                             'Given {1}'.format(vertices.shape[0], values.shape))
+        self._vertices = vertices
+        self._faces = faces
+        self._normals = normals
+        self._values = values
+
+    @classmethod
+    def from_grid(cls, grid, data, isosurf, color=None):
+        r"""Extract the iso-surface of a scalar field evaluated on a cubic grid.
+
+        Parameters
+        ----------
+        grid : UniformGrid
+            Instance of `UniformGrid` on which the scalar field is evaluated.
+        data : np.ndarray, shape=(npoints,)
+            Scalar field evaluated on the grid points.
+        isosurf : float
+            Value of the iso-surface.
+        color : np.ndarray, shape=(npoints,), optional
+            Second scalar field evaluated on the grid points, which is linearly interpolated
+            to the vertices for coloring the iso-surface, e.g. signed density for reduced
+            density gradient iso-surfaces.
+
+        """
+        if not (hasattr(grid, 'shape') and hasattr(grid, 'axes') and hasattr(grid, 'origin')):
+            raise ValueError('Argument grid should be an instance of UniformGrid!')
+        if data.shape != (grid.npoints,):
+            raise ValueError('Argument data should have ({0},) shape! '
+                             'Given {1}'.format(grid.npoints, data.shape))
+        if color is not None and color.shape != (grid.npoints,):
+            raise ValueError('Argument color should have ({0},) shape! '
+                             'Given {1}'.format(grid.npoints, color.shape))
+        # indices of the two grid points of the tetrahedron edges crossed by the iso-surface
+        above = data > isosurf
+        edge_a, edge_b = cls._compute_crossed_edges(grid.shape, above)
+        # merge vertices lying on the same grid edge, or on the same grid point when the
+        # scalar field at the lower end of the edge equals the iso-surface value
+        keys = np.minimum(edge_a, edge_b) * grid.npoints + np.maximum(edge_a, edge_b)
+        lower = np.where(above[edge_a], edge_b, edge_a)
+        keys = np.where(data[lower] == isosurf, -1 - lower, keys)
+        keys, first, faces = np.unique(keys.ravel(), return_index=True, return_inverse=True)
+        faces = faces.reshape(-1, 3)
+        # remove degenerate triangles (with merged vertices) & unused vertices
+        keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & \
+               (faces[:, 0] != faces[:, 2])
+        used, faces = np.unique(faces[keep].ravel(), return_inverse=True)
+        faces = faces.reshape(-1, 3)
+        index_a, index_b = edge_a.ravel()[first[used]], edge_b.ravel()[first[used]]
+        edge_a, edge_b = edge_a[keep], edge_b[keep]
+        # linear interpolation of vertex position (and color) along the edges
+        frac = (isosurf - data[index_a]) / (data[index_b] - data[index_a])
+        coord_a, coord_b = cls._compute_coordinates(grid, index_a, index_b)
+        vertices = coord_a + frac[:, np.newaxis] * (coord_b - coord_a)
+        values = None
+        if color is not None:
+            values = color[index_a] + frac * (color[index_b] - color[index_a])
+        # orient faces so that their normals point towards decreasing data values
+        if faces.shape[0] != 0:
+            crd_a, crd_b = cls._compute_coordinates(grid, edge_a[:, 0], edge_b[:, 0])
+            ascent = np.where(above[edge_b[:, 0]][:, np.newaxis], crd_b - crd_a, crd_a - crd_b)
+            corners = vertices[faces]
+            normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+            flip = np.einsum('ij,ij->i', normal, ascent) > 0.
+            faces[flip] = faces[flip][:, ::-1]
+        return cls(vertices, faces, values=values)
+
+    @property
+    def vertices(self):
+        """Cartesian coordinates of the vertices."""
+        return self._vertices
+
+    @property
+    def faces(self):
+        """Indices of the three vertices of each triangle."""
+        return self._faces
+
+    @property
+    def normals(self):
+        """Unit normal vectors at the vertices."""
+        return self._normals
+
+    @property
+    def values(self):
+        """Scalar property at the vertices used for coloring, or None if not colored."""
+        return self._values
+
+    @property
+    def nvertices(self):
+        """Number of vertices."""
+        return self._vertices.shape[0]
+
+    @property
+    def nfaces(self):
+        """Number of triangles."""
+        return self._faces.shape[0]
+
+    @property
+    def area(self):
+        """Area of the iso-surface."""
+        corners = self._vertices[self._faces]
+        normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        return 0.5 * np.sum(np.linalg.norm(normal, axis=1))
+
+    def __add__(self, other):
+        """Combine two iso-surfaces into one, e.g. positive and negative orbital lobes."""
+        if not isinstance(other, IsoSurface):
+            return NotImplemented
+        values = None
+        if self._values is not None and other.values is not None:
+            values = np.concatenate((self._values, other.values))
+        return IsoSurface(np.vstack((self._vertices, other.vertices)),
+                          np.vstack((self._faces, other.faces + self.nvertices)),
+                          np.vstack((self._normals, other.normals)), values)
+
+    def compute_colors(self, scalemin=None, scalemax=None):
+        r"""Return the RGB colors of the vertices using a blue-green-red color scale.
+
+        Similar to the 'BGR' color scale of VMD, values <= scalemin are blue, values half-way
+        between scalemin and scalemax are green, and values >= scalemax are red.
+
+        Parameters
+        ----------
+        scalemin : float, optional
+            Smallest value to color. If None, the minimum of the values is used.
+        scalemax : float, optional
+            Largest value to color. If None, the maximum of the values is used.
+
+        Returns
+        -------
+        colors : np.ndarray, shape=(N, 3)
+            The red, green and blue components (between 0 and 1) of the vertex colors.
+
+        """
+        if self._values is None:
+            raise ValueError('Iso-surface has no values for coloring!')
+        if scalemin is None:
+            scalemin = np.min(self._values) if self._values.size != 0 else 0.
+        if scalemax is None:
+            scalemax = np.max(self._values) if self._values.size != 0 else 0.
+        if scalemax < scalemin:
+            raise ValueError('Argument scalemax={0} should be >= scalemin={1}!'.format(
+                scalemax, scalemin))
+        scale = np.clip(self._values - scalemin, 0., None)
+        if scalemax > scalemin:
+            scale = np.clip(scale / (scalemax - scalemin), 0., 1.)
+        red = np.clip(2. * scale - 1., 0., 1.)
+        blue = np.clip(1. - 2. * scale, 0., 1.)
+        return np.array([red, 1. - red - blue, blue]).T
+
+    def generate_mesh(self, fname, scalemin=None, scalemax=None):
+        r"""Write the iso-surface into a mesh file.
+
+        The vertices, normals, and (if the iso-surface has values) the vertex colors obtained
+        with :meth:`compute_colors` are written.
+
+        Parameters
+        ----------
+        fname : str
+            Mesh file name with \*.ply (binary Stanford triangle format), \*.obj (Wavefront)
+            or \*.gltf (glTF 2.0 with embedded binary buffer) extension.
+        scalemin : float, optional
+            Smallest value to color on the iso-surface.
+        scalemax : float, optional
+            Largest value to color on the iso-surface.
+
+        """
+        colors = None
+        if self._values is not None:
+            colors = self.compute_colors(scalemin, scalemax)
+        if fname.endswith('.ply'):
+            self._write_ply(fname, colors)
+        elif fname.endswith('.obj'):
+            self._write_obj(fname, colors)
+        elif fname.endswith('.gltf'):
+            self._write_gltf(fname, colors)
+        else:
+            raise ValueError('Argument fname should have *.ply, *.obj or *.gltf extension! '
+                             'Given fname={0}'.format(fname))
+
+    def _write_ply(self, fname, colors):
+        """Write binary little-endian PLY file."""
+        dtype = [('vertex', '<f4', (3,)), ('normal', '<f4', (3,))]
+        header = ['ply', 'format binary_little_endian 1.0', 'comment Created with CHEMTOOLS',
+                  'element vertex {0}'.format(self.nvertices),
+                  'property float x', 'property float y', 'property float z',
+                  'property float nx', 'property float ny', 'property float nz']
+        if colors is not None:
+            dtype.append(('color', 'u1', (3,)))
+            header.extend(['property uchar red', 'property uchar green', 'property uchar blue'])
+        header.extend(['element face {0}'.format(self.nfaces),
+                       'property list uchar int vertex_indices', 'end_header'])
+        vertices = np.empty(self.nvertices, dtype=dtype)
+        vertices['vertex'] = self._vertices
+        vertices['normal'] = self._normals
+        if colors is not None:
+            vertices['color'] = np.round(255. * colors)
+        faces = np.empty(self.nfaces, dtype=[('count', 'u1'), ('index', '<i4', (3,))])
+        faces['count'] = 3
+        faces['index'] = self._faces
+        with open(fname, 'wb') as f:
+            f.write(('\n'.join(header) + '\n').encode('ascii'))
+            f.write(vertices.tobytes())
+            f.write(faces.tobytes())
+
+    def _write_obj(self, fname, colors):
+        """Write Wavefront OBJ file (vertex colors are appended to vertex coordinates)."""
+        vertices = self._vertices
+        if colors is not None:
+            vertices = np.hstack((vertices, colors))
+        with open(fname, 'w') as f:
+            f.write('# Created with CHEMTOOLS\n')
+            np.savetxt(f, vertices, fmt='v' + ' %.6f' * vertices.shape[1])
+            np.savetxt(f, self._normals, fmt='vn %.6f %.6f %.6f')
+            faces = np.repeat(self._faces + 1, 2, axis=1)
+            np.savetxt(f, faces, fmt='f %d//%d %d//%d %d//%d')
+
+    def _write_gltf(self, fname, colors):
+        """Write glTF 2.0 file with the binary buffer embedded as base64 data URI."""
+        if self.nfaces == 0:
+            raise ValueError('Cannot write an empty iso-surface into glTF file!')
+        arrays = [self._faces.astype('<u4'), self._vertices.astype('<f4'),
+                  self._normals.astype('<f4')]
+        attributes = {'POSITION': 1, 'NORMAL': 2}
+        if colors is not None:
+            arrays.append(colors.astype('<f4'))
+            attributes['COLOR_0'] = 3
+        views, accessors, offset = [], [], 0
+        for index, array in enumerate(arrays):
+            views.append({'buffer': 0, 'byteOffset': offset, 'byteLength': array.nbytes,
+                          'target': 34963 if index == 0 else 34962})
+            offset += array.nbytes
+            if index == 0:
+                accessors.append({'bufferView': 0, 'componentType': 5125,
+                                  'count': array.size, 'type': 'SCALAR'})
+            else:
+                accessors.append({'bufferView': index, 'componentType': 5126,
+                                  'count': array.shape[0], 'type': 'VEC3'})
+        accessors[1]['min'] = np.min(self._vertices, axis=0).tolist()
+        accessors[1]['max'] = np.max(self._vertices, axis=0).tolist()
+        data = b''.join(array.tobytes() for array in arrays)
+        uri = 'data:application/octet-stream;base64,' + base64.b64encode(data).decode('ascii')
+        gltf = {'asset': {'version': '2.0', 'generator': 'CHEMTOOLS'},
+                'scene': 0, 'scenes': [{'nodes': [0]}], 'nodes': [{'mesh': 0}],
+                'materials': [{'doubleSided': True}],
+                'meshes': [{'primitives': [{'attributes': attributes, 'indices': 0,
+                                            'material': 0, 'mode': 4}]}],
+                'buffers': [{'byteLength': len(data), 'uri': uri}],
+                'bufferViews': views, 'accessors': accessors}
+        with open(fname, 'w') as f:
+            json.dump(gltf, f)
+
+    @staticmethod
+    def _compute_crossed_edges(shape, above):
+        """Return the grid point indices of the tetrahedron edges crossed by the iso-surface.
+
+        Parameters
+        ----------
+        shape : np.ndarray, shape=(3,)
+            Number of grid points along each axis.
+        above : np.ndarray, shape=(npoints,)
+            Boolean array specifying whether the scalar field is above the iso-surface value.
+
+        Returns
+        -------
+        edge_a, edge_b : np.ndarray, shape=(M, 3)
+            Indices of the two grid points of the three edges of each triangle, where the
+            first edge of each triangle has one end above and one end below the iso-surface.
+
+        """
+        nx, ny, nz = [int(n) for n in shape]
+        cube = above.reshape(nx, ny, nz)
+        # cells with corners on both sides of the iso-surface
+        count = np.zeros((nx - 1, ny - 1, nz - 1), dtype=np.uint8)
+        for i, j, k in _CELL_CORNERS:
+            count += cube[i:nx - 1 + i, j:ny - 1 + j, k:nz - 1 + k]
+        cells = np.nonzero((count > 0) & (count < 8))
+        cells = (cells[0] * ny + cells[1]) * nz + cells[2]
+        # grid point indices of the tetrahedra corners & tetrahedra cases
+        offsets = np.dot(_CELL_CORNERS, [ny * nz, nz, 1])
+        corners = (cells[:, np.newaxis, np.newaxis] + offsets[_CELL_TETRAHEDRA]).reshape(-1, 4)
+        cases = np.dot(above[corners], [1, 2, 4, 8])
+        # triangles of each tetrahedron
+        tetra, slot = np.nonzero(_TETRAHEDRON_TRIANGLES[cases, :, 0, 0] >= 0)
+        edges = _TETRAHEDRON_TRIANGLES[cases[tetra], slot]
+        edge_a = corners[tetra[:, np.newaxis], edges[:, :, 0]]
+        edge_b = corners[tetra[:, np.newaxis], edges[:, :, 1]]
+        return edge_a, edge_b
+
+    @staticmethod
+    def _compute_coordinates(grid, index_a, index_b):
+        """Return Cartesian coordinates of two sets of grid points given their indices."""
+        shape = tuple(int(n) for n in grid.shape)
+        coord_a = np.dot(np.array(np.unravel_index(index_a, shape)).T, grid.axes) + grid.origin
+        coord_b = np.dot(np.array(np.unravel_index(index_b, shape)).T, grid.axes) + grid.origin
+        return coord_a, coord_b
+
+    @staticmethod
+    def _compute_normals(vertices, faces):
+        """Return area-weighted average of triangle normals at the vertices."""
+        normals = np.zeros(vertices.shape)
+        if faces.size == 0:
+            return normals
+        corners = vertices[faces]
+        normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        for index in range(3):
+            normals[:, index] = np.bincount(faces.ravel(), np.repeat(normal[:, index], 3),
+                                            minlength=vertices.shape[0])
+        norm = np.linalg.norm(normals, axis=1)
+        norm[norm == 0.] = 1.
+        return normals / norm[:, np.newaxis]
+
+
+def _make_tetrahedron_triangles():
+    """Return the table of triangles (as pairs of tetrahedron corners) for all 16 cases.
+
+    The case of a tetrahedron is given by the sum of 2**i for the corners i above the
+    iso-surface. Missing triangles are denoted by -1, and the first corner of the first edge
+    of every triangle is the corner lying on the other side of the iso-surface than the rest.
+    """
+    table = -np.ones((16, 2, 3, 2), dtype=int)
+    for case in range(16):
+        inside = [corner for corner in range(4) if case >> corner & 1]
+        outside = [corner for corner in range(4) if not case >> corner & 1]
+        if len(inside) in [1, 3]:
+            # one triangle separating the lone corner from the rest
+            lone = inside[0] if len(inside) == 1 else outside[0]
+            table[case, 0] = [[lone, corner] for corner in range(4) if corner != lone]
+        elif len(inside) == 2:
+            # quadrilateral split into two triangles
+            (a, b), (c, d) = inside, outside
+            table[case, 0] = [[a, c], [a, d], [b, d]]
+            table[case, 1] = [[a, c], [b, d], [b, c]]
+    return table
+
+
+# offsets of the 8 corners of a cell, with corner index 4 * i + 2 * j + k
+_CELL_CORNERS = np.array([[i, j, k] for i in range(2) for j in range(2) for k in range(2)])
+# six tetrahedra of a cell sharing the diagonal between corners 0 & 7
+_CELL_TETRAHEDRA = np.array([[0, 4, 6, 7], [0, 4, 5, 7], [0, 2, 6, 7],
+                             [0, 2, 3, 7], [0, 1, 5, 7], [0, 1, 3, 7]])
+_TETRAHEDRON_TRIANGLES = _make_tetrahedron_triangles()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.outputs.isosurface."""
+
+
+import json
+import shutil
+import tempfile
+import numpy as np
+
+from contextlib import contextmanager
+from numpy.testing import assert_raises, assert_equal, assert_allclose
+from chemtools.utils.cube import UniformGrid
+from chemtools.outputs.isosurface import IsoSurface
+
+
+@contextmanager
+def tmpdir(name):
+    """Create temporary directory that gets deleted after accessing it."""
+    dn = tempfile.mkdtemp(name)
+    try:
+        yield dn
+    finally:
+        shutil.rmtree(dn)
+
+
+def make_sphere(spacing=0.1, radius=1.0):
+    """Return cubic grid, gaussian evaluated on the grid, and its value at the given radius."""
+    npoints = int(np.ceil(2. * (radius + 0.5) / spacing)) + 1
+    origin = -0.5 * (npoints - 1) * spacing * np.ones(3)
+    coordinates = np.zeros((1, 3))
+    grid = UniformGrid(np.array([1]), np.array([1.]), coordinates, origin,
+                       np.diag([spacing] * 3), np.array([npoints] * 3))
+    data = np.exp(-np.sum(grid.points**2, axis=1))
+    return grid, data, np.exp(-radius**2)
+
+
+def test_isosurface_sphere():
+    grid, data, isosurf = make_sphere()
+    surface = IsoSurface.from_grid(grid, data, isosurf, color=grid.points[:, 0])
+    assert surface.values.shape == (surface.nvertices,)
+    assert surface.faces.shape == (surface.nfaces, 3)
+    # vertices on sphere of radius 1.0 & area close to 4pi
+    assert_allclose(np.linalg.norm(surface.vertices, axis=1), 1.0, atol=5.e-3)
+    assert_allclose(surface.area, 4 * np.pi, rtol=1.e-2)
+    # normals point outwards (towards decreasing density)
+    assert_allclose(np.linalg.norm(surface.normals, axis=1), 1.0)
+    assert np.all(np.sum(surface.normals * surface.vertices, axis=1) > 0.9)
+    corners = surface.vertices[surface.faces]
+    normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    assert np.all(np.sum(normal * np.mean(corners, axis=1), axis=1) >= 0.)
+    # closed surface: each edge is shared by two triangles & Euler characteristic is 2
+    edges = np.sort(np.vstack([surface.faces[:, [0, 1]], surface.faces[:, [1, 2]],
+                               surface.faces[:, [2, 0]]]), axis=1)
+    edges, counts = np.unique(edges[:, 0] * surface.nvertices + edges[:, 1], return_counts=True)
+    assert np.all(counts == 2)
+    assert_equal(surface.nvertices - edges.size + surface.nfaces, 2)
+    # linear color field is interpolated exactly
+    assert_allclose(surface.values, surface.vertices[:, 0], atol=1.e-10)
+    # colors on blue-green-red scale
+    colors = surface.compute_colors(-1., 1.)
+    assert_allclose(np.sum(colors, axis=1), 1.0)
+    assert_allclose(colors[np.argmin(surface.values)], [0., 0., 1.], atol=1.e-2)
+    assert_allclose(colors[np.argmax(surface.values)], [1., 0., 0.], atol=1.e-2)
+    # iso-surface outside of the data range
+    surface = IsoSurface.from_grid(grid, data, 2.0)
+    assert_equal([surface.nvertices, surface.nfaces], [0, 0])
+
+
+def test_isosurface_combine():
+    grid, data, isosurf = make_sphere(spacing=0.2)
+    sphere1 = IsoSurface.from_grid(grid, data, isosurf, color=np.ones(grid.npoints))
+    sphere2 = IsoSurface.from_grid(grid, data, np.exp(-0.25), color=-np.ones(grid.npoints))
+    surface = sphere1 + sphere2
+    assert_equal(surface.nvertices, sphere1.nvertices + sphere2.nvertices)
+    assert_equal(surface.faces[sphere1.nfaces:], sphere2.faces + sphere1.nvertices)
+    assert_allclose(surface.area, sphere1.area + sphere2.area)
+    assert_equal(surface.values, np.concatenate((sphere1.values, sphere2.values)))
+
+
+def test_isosurface_generate_mesh():
+    grid, data, isosurf = make_sphere(spacing=0.2)
+    surface = IsoSurface.from_grid(grid, data, isosurf, color=grid.points[:, 2])
+    with tmpdir('chemtools.outputs.test.test_isosurface.test_generate_mesh') as dn:
+        # ply
+        surface.generate_mesh(dn + '/sphere.ply', scalemin=-1., scalemax=1.)
+        with open(dn + '/sphere.ply', 'rb') as f:
+            content = f.read()
+        header, body = content.split(b'end_header\n')
+        assert 'element vertex {0}\n'.format(surface.nvertices).encode('ascii') in header
+        assert 'element face {0}\n'.format(surface.nfaces).encode('ascii') in header
+        assert b'property uchar red\n' in header
+        assert_equal(len(body), surface.nvertices * 27 + surface.nfaces * 13)
+        # obj
+        surface.generate_mesh(dn + '/sphere.obj')
+        with open(dn + '/sphere.obj', 'r') as f:
+            lines = [line.split() for line in f.readlines()[1:]]
+        assert_equal(len(lines), 2 * surface.nvertices + surface.nfaces)
+        vertices = np.array([line[1:] for line in lines[:surface.nvertices]], float)
+        assert_allclose(vertices[:, :3], surface.vertices, atol=1.e-6)
+        assert_equal(lines[-1][0], 'f')
+        # gltf
+        surface.generate_mesh(dn + '/sphere.gltf')
+        with open(dn + '/sphere.gltf', 'r') as f:
+            gltf = json.load(f)
+        attributes = gltf['meshes'][0]['primitives'][0]['attributes']
+        assert_equal(sorted(attributes.keys()), ['COLOR_0', 'NORMAL', 'POSITION'])
+        assert_equal(gltf['accessors'][0]['count'], 3 * surface.nfaces)
+        assert_equal(gltf['buffers'][0]['byteLength'],
+                     12 * surface.nfaces + 36 * surface.nvertices)
+        # check raises
+        assert_raises(ValueError, surface.generate_mesh, dn + '/sphere.stl')
+        assert_raises(ValueError, IsoSurface(np.zeros((0, 3)), np.zeros((0, 3), int)
+                                             ).generate_mesh, dn + '/empty.gltf')
+
+
+def test_isosurface_raises():
+    grid, data, isosurf = make_sphere(spacing=0.2)
+    assert_raises(ValueError, IsoSurface.from_grid, grid.points, data, isosurf)
+    assert_raises(ValueError, IsoSurface.from_grid, grid, data[1:], isosurf)
+    assert_raises(ValueError, IsoSurface.from_grid, grid, data, isosurf, color=data[1:])
+    vertices, faces = np.eye(3), np.array([[0, 1, 2]])
+    assert_raises(ValueError, IsoSurface, vertices[:, :2], faces)
+    assert_raises(ValueError, IsoSurface, vertices, faces[:, :2])
+    assert_raises(ValueError, IsoSurface, vertices, faces + 1)
+    assert_raises(ValueError, IsoSurface, vertices, faces, normals=vertices[:2])
+    assert_raises(ValueError, IsoSurface, vertices, faces, values=np.ones(2))
+    surface = IsoSurface(vertices, faces)
+    assert_raises(ValueError, surface.compute_colors)
+    surface = IsoSurface(vertices, faces, values=np.ones(3))
+    assert_raises(ValueError, surface.compute_colors, 1., 0.)
@@ -492,3 +492,35 @@ def test_print_vmd_script_vector_field():
                  'draw color 0\n'
                  'draw arrow {1 2 3} {1.0 0.0 0.0} 0.08 0.15 0.7\n'
                  '#\n')
+
+
+def test_print_vmd_script_paths():
+    paths = [np.array([[0., 0., 0.], [1., 0., 0.], [1., 2., 0.]]), np.array([[0., 0., 1.]])]
+    with tmpdir('chemtools.utils.test.test_base.test_print_vmd_script_paths') as dn:
+        fname = '%s/%s' % (dn, 'test.vmd')
+        vmd.print_vmd_script_paths(fname, 'test.xyz', paths, radius=0.05, color=1)
+        with open(fname, 'r') as content_file:
+            assert content_file.read() == \
+                (header +
+                 '# load new molecule\n'
+                 'mol new test.xyz type {xyz} first 0 last -1 step 1 filebonds 1 autobonds 1 '
+                 'waitfor all\n'
+                 '#\n'
+                 '# representation of the atoms\n'
+                 'mol representation CPK 1.000000 0.300000 118.000000 131.000000\n'
+                 'mol delrep 0 top\n'
+                 'mol color Element\n'
+                 'mol selection {{all}}\n'
+                 'mol material Opaque\n'
+                 'mol addrep top\n'
+                 '#\n'
+                 '# Draw paths\n'
+                 'draw material Opaque\n'
+                 'draw color 1\n'
+                 'draw cylinder {0.000000 0.000000 0.000000} {0.529177 0.000000 0.000000} '
+                 'radius 0.05 resolution 6\n'
+                 'draw cylinder {0.529177 0.000000 0.000000} {0.529177 1.058354 0.000000} '
+                 'radius 0.05 resolution 6\n'
+                 '#\n')
+        assert_raises(TypeError, vmd.print_vmd_script_paths, fname, 'test.xyz', paths, color=2000)
+        assert_raises(TypeError, vmd.print_vmd_script_paths, fname, 'test.xyz', [np.ones(3)])
@@ -29,7 +29,8 @@ import os
 import numpy as np
 
 __all__ = ['print_vmd_script_nci', 'print_vmd_script_isosurface',
-           'print_vmd_script_multiple_cube', 'print_vmd_script_vector_field']
+           'print_vmd_script_multiple_cube', 'print_vmd_script_vector_field',
+           'print_vmd_script_paths']
 
 
 def _vmd_script_start():
@@ -391,6 +392,52 @@ def _vmd_script_vector_field(centers, unit_vecs, weights, weight_threshold=1e-1,
     return output
 
 
+def _vmd_script_paths(paths, radius=0.03, material='Opaque', color=16):
+    """Generate part of the VMD script that draws paths (e.g. bond paths) as cylinders.
+
+    Parameters
+    ----------
+    paths : sequence of np.ndarray(M, 3)
+        Coordinates (in bohr) of the consecutive points of each path. The coordinates are
+        converted to angstrom which is used by VMD.
+    radius : float
+        Radius of the cylinders (in angstrom)
+        Default is 0.03
+    material : str
+        The material setting of the cylinders
+        Default is 'Opaque'
+    color : int
+        Color of the cylinders
+        Integer between 0 and 1057. See VMD program or manual for details.
+        Default color is Black.
+
+    Returns
+    -------
+    VMD script for drawing paths
+
+    Raises
+    ------
+    TypeError
+        If a path is not a numpy array with 3 columns
+        If color is not supported
+    """
+    if not (isinstance(color, int) and 0 <= color < 1057):
+        raise TypeError('Unsupported color, {0}'.format(color))
+    output = ('# Draw paths\n'
+              'draw material {0}\n'
+              'draw color {1}\n'.format(material, color))
+    for path in paths:
+        if not (isinstance(path, np.ndarray) and path.ndim == 2 and path.shape[1] == 3):
+            raise TypeError('Each path must be a two-dimensional numpy array with 3 columns')
+        # convert bohr to angstrom
+        path = path * 0.52917721067
+        for (x1, y1, z1), (x2, y2, z2) in zip(path[:-1], path[1:]):
+            output += ('draw cylinder {{{0:.6f} {1:.6f} {2:.6f}}} {{{3:.6f} {4:.6f} {5:.6f}}} '
+                       'radius {6} resolution 6\n'.format(x1, y1, z1, x2, y2, z2, radius))
+    output += '#\n'
+    return output
+
+
 def print_vmd_script_nci(scriptfile, densfile, rdgfile, isosurf=0.5, denscut=0.05):
     r"""Generate VMD (Visual Molecular Dynamics) script for visualizing NCI isosurfaces.
 
@@ -632,3 +679,30 @@ def print_vmd_script_vector_field(scriptfile, xyz, vector_centers, vector_direct
     output += _vmd_script_vector_field(vector_centers, unit_vecs, weights)
     with open(scriptfile, 'w') as f:
         f.write(output)
+
+
+def print_vmd_script_paths(scriptfile, molfile, paths, radius=0.03, color=16,
+                           representation='CPK'):
+    """Generate VMD (Visual Molecular Dynamics) script for visualizing paths, e.g. bond paths.
+
+    Parameters
+    ----------
+    scriptfile : str
+        Name of VMD script file to generate.
+    molfile : str
+        Name of the xyz or cube file of the molecule.
+    paths : sequence of np.ndarray(M, 3)
+        Coordinates (in bohr) of the consecutive points of each path, e.g. `GradientPaths`
+        instance.
+    radius : float, optional
+        Radius of the cylinders (in angstrom) representing the paths.
+    color : int, optional
+        Color of the paths. Integer between 0 and 1057. See VMD program or manual for details.
+    representation : str, optional
+        Representation of the atoms. Choose either 'CPK' or 'Line'.
+    """
+    output = _vmd_script_start()
+    output += _vmd_script_molecule(representation, molfile)
+    output += _vmd_script_paths(paths, radius=radius, color=color)
+    with open(scriptfile, 'w') as f:
+        f.write(output)
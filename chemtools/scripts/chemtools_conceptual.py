@@ -106,6 +106,13 @@ def parse_args_local(subparser):
         type=float,
         help='iso-surface value of local property to visualize. '
         '[default=%(default)s]')
+    subparser.add_argument(
+        '--block',
+        default=10000,
+        type=int,
+        help='number of grid points on which the densities and the local property are '
+        'evaluated at once. Larger blocks are faster, but need more memory. '
+        '[default=%(default)s]')
     # parser.add_argument('--color', default='b', type=str,
     #                     help='color of reduced density gradient vs. signed density scatter plot.'
     #                     '[default=%(default)s]')
@@ -120,38 +127,31 @@ def main_conceptual_global(args):
 
 
 def main_conceptual_local(args):
-    """Build LocalConceptualDFT class and dump a cube file of local descriptor."""
-    # load the first molecule
-    mol = Molecule.from_file(args.file_wfn[0])
+    """Evaluate local descriptor on cubic grid block by block and stream it into a cube file."""
+    # load each molecule once
+    molecules = [Molecule.from_file(fname) for fname in args.file_wfn]
 
-    # make cubic grid
+    # make cubic grid (its points are generated block by block)
     if args.cube.endswith('.cube'):
         # load cube file
         cube = UniformGrid.from_cube(args.cube)
     elif len(args.cube.split(',')) == 2:
         # make a cubic grid
         spacing, threshold = [float(item) for item in args.cube.split(',')]
-        cube = UniformGrid.from_molecule(mol, spacing, threshold)
+        cube = UniformGrid.from_molecule(molecules[0], spacing, threshold)
     else:
         raise ValueError('Argument cube={0} is not recognized!'.format(
             args.cube))
 
-    # build global tool
-    model = LocalConceptualDFT.from_file(args.file_wfn, args.model,
-                                         cube.points)
-    # check whether local property exists
-    if not hasattr(model, args.prop):
-        raise ValueError('The {0} local conceptual DFT class does not contain '
-                         '{1} attribute.'.format(args.model, args.prop))
-    if callable(getattr(model, args.prop)):
-        raise ValueError(
-            'The {0} argument is a method, please provide an attribute of '
-            '{1} local conceptual DFT.'.format(args.prop, args.model))
+    # build lazy local tool on the cubic grid (only the first grid point is evaluated upfront)
+    model = LocalConceptualDFT.from_molecule(molecules, args.model, cube, block_size=args.block)
+    # evaluate densities & local property on each block of grid points
+    blocks = (value for _, value in model.iter_blocks(args.property))
 
     # name of files
     cubefile = '{0}.cube'.format(args.output_name)
     vmdfile = '{0}.vmd'.format(args.output_name)
-    # dump cube file of local property
-    cube.generate_cube(cubefile, getattr(model, args.prop))
+    # dump cube file of local property, streaming the blocks
+    cube.generate_cube(cubefile, blocks)
     # generate VMD scripts for visualizing iso-surface with VMD
     print_vmd_script_isosurface(vmdfile, cubefile, isosurf=args.isosurface)
@@ -27,7 +27,7 @@
 
 import logging
 
-from chemtools import Molecule, UniformGrid, print_vmd_script_isosurface
+from chemtools import Molecule, UniformGrid, IsoSurface, print_vmd_script_isosurface
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
@@ -50,6 +50,11 @@ please refer to ChemTools website.
 Note: The output.vmd script requires output_esp.cube & output_dens.cube to visualize ESP
       on electron density iso-surface using VMD software (they files should be all in the
       same directory).
+
+Alternatively, with --mesh option, the electron density iso-surface colored by ESP is
+written into a single output.ply, output.obj or output.gltf mesh file (instead of the
+cube files and VMD script), which can be opened by most 3D viewers. In this case, ESP
+is only evaluated on the vertices of the iso-surface.
 """
 
 
@@ -112,6 +117,15 @@ def parse_args_esp(subparser):
         help='maximum value of ESP to color on the electron density iso-surface. '
              '[default=%(default)s]')
 
+    subparser.add_argument(
+        '--mesh',
+        default=None,
+        choices=['ply', 'obj', 'gltf'],
+        type=str,
+        help='format of mesh file containing electron density iso-surface colored by ESP. '
+             'If given, mesh file is generated instead of cube files and VMD script. '
+             '[default=%(default)s]')
+
 
 def main_esp(args):
     """Generate VMD script and cube files for visualizing ESP on electron density iso-surface."""
@@ -129,6 +143,15 @@ def main_esp(args):
     else:
         raise ValueError('Argument cube={0} is not recognized!'.format(args.cube))
 
+    # dump mesh file for visualization
+    if args.mesh is not None:
+        surface = IsoSurface.from_grid(cube, mol.compute_density(cube.points), args.isosurface)
+        surface = IsoSurface(surface.vertices, surface.faces, surface.normals,
+                             mol.compute_esp(surface.vertices))
+        surface.generate_mesh(args.output + '.' + args.mesh,
+                              scalemin=args.scalemin, scalemax=args.scalemax)
+        return
+
     # dump cube files & script for visualization
     espname = args.output + '_esp.cube'
     rhoname = args.output + '_rho.cube'
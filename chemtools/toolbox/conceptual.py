@@ -32,14 +32,17 @@ import logging
 
 from chemtools.wrappers.molecule import Molecule
 from chemtools.wrappers.grid import MolecularGrid
+from chemtools.utils.cube import UniformGrid
 from chemtools.toolbox.utils import check_arg_molecule, get_matching_attr
 from chemtools.toolbox.utils import get_dict_energy, get_dict_density, get_dict_population
+from chemtools.toolbox.utils import get_func_density
 from chemtools.conceptual.linear import LinearGlobalTool, LinearLocalTool, LinearCondensedTool
 from chemtools.conceptual.quadratic import QuadraticGlobalTool, QuadraticLocalTool
 from chemtools.conceptual.quadratic import QuadraticCondensedTool
 from chemtools.conceptual.exponential import ExponentialGlobalTool
 from chemtools.conceptual.rational import RationalGlobalTool
 from chemtools.conceptual.general import GeneralGlobalTool
+from chemtools.conceptual.lazy import LazyLocalTool
 try:
     from pathlib2 import Path
 except ImportError:
@@ -69,21 +72,7 @@ class BaseConceptualDFT(object):
             Atomic number of atomic centers.
 
         """
-        # check model
-        if model.lower() not in dict_models.keys():
-            raise ValueError("Model={0} is not available!".format(model.lower()))
-        self._model = model.lower()
-
-        # check shape of coordinates
-        if coordinates is not None and (coordinates.ndim != 2 or coordinates.shape[1] != 3):
-            raise ValueError("Argument coordinate should be a 2D-array with 3 columns! "
-                             "Given coordinates.shape={0}".format(coordinates.shape))
-        # check number of atoms given by numbers and coordinates match
-        if numbers is not None and coordinates is not None and len(numbers) != len(coordinates):
-            raise ValueError("Numbers & coordinates should represent same number of atoms! "
-                             "{0}!={1}".format(len(numbers), len(coordinates)))
-        self._coordinates = coordinates
-        self._numbers = numbers
+        self._set_attributes(dict_models, model, coordinates, numbers)
 
         if self._model == "general":
             # self._tool = select_tool[model](*args, **kwargs)
@@ -100,6 +89,24 @@ class BaseConceptualDFT(object):
         # print screen information
         self._log_init()
 
+    def _set_attributes(self, dict_models, model, coordinates, numbers):
+        """Check & set energy model, coordinates and numbers of atomic centers."""
+        # check model
+        if model.lower() not in dict_models.keys():
+            raise ValueError("Model={0} is not available!".format(model.lower()))
+        self._model = model.lower()
+
+        # check shape of coordinates
+        if coordinates is not None and (coordinates.ndim != 2 or coordinates.shape[1] != 3):
+            raise ValueError("Argument coordinate should be a 2D-array with 3 columns! "
+                             "Given coordinates.shape={0}".format(coordinates.shape))
+        # check number of atoms given by numbers and coordinates match
+        if numbers is not None and coordinates is not None and len(numbers) != len(coordinates):
+            raise ValueError("Numbers & coordinates should represent same number of atoms! "
+                             "{0}!={1}".format(len(numbers), len(coordinates)))
+        self._coordinates = coordinates
+        self._numbers = numbers
+
     def __getattr__(self, attr):
         """Return class attribute."""
         value = getattr(self._tool, attr, "error")
@@ -265,6 +272,9 @@ class LocalConceptualDFT(BaseConceptualDFT):
           the geometries and atomic numbers of all molecules need to be the same.
     """
 
+    # available models for local tools
+    _models = {"linear": LinearLocalTool, "quadratic": QuadraticLocalTool}
+
     def __init__(self, dict_density, model="quadratic", coordinates=None, numbers=None):
         r"""
         Initialize class.
@@ -284,8 +294,6 @@ class LocalConceptualDFT(BaseConceptualDFT):
             Atomic number of atomic centers.
 
         """
-        # available models for local tools
-        dict_models = {"linear": LinearLocalTool, "quadratic": QuadraticLocalTool}
         # check density array shape
         for index, value in enumerate(dict_density.values()):
             if index == 0:
@@ -293,21 +301,20 @@ class LocalConceptualDFT(BaseConceptualDFT):
             elif value.shape != shape:
                 raise ValueError("Argument dict_density should have density arrays (values) "
                                  "with the same shape! {0} != {1}".format(value.shape, shape))
-        super(LocalConceptualDFT, self).__init__(dict_density, dict_models, model,
+        super(LocalConceptualDFT, self).__init__(dict_density, self._models, model,
                                                  coordinates, numbers)
 
     def __repr__(self):
         """Print table of available class attributes and methods."""
-        # get list of available attributes and methods
-        avs = dir(self._tool) + dir(self)
-        # get sorted list of public attributes
-        attrs = [atr for atr in avs if not callable(getattr(self, atr)) and not atr.startswith("_")]
-        attrs.sort()
-        # remove n0, because it is both an attr of self._tool and self (duplicate)
-        # attrs.remove("n0")
-        # get sorted list of public methods
-        methods = [atr for atr in avs if callable(getattr(self, atr)) and not atr.startswith("_")]
-        methods.sort()
+        # get classes of available attributes and methods; the descriptors of a lazy tool are
+        # given by its local tool class, and they are not evaluated here
+        tool = self._tool.tool if isinstance(self._tool, LazyLocalTool) else type(self._tool)
+        classes = [tool, type(self)]
+        avs = set([atr for cls in classes for atr in dir(cls) if not atr.startswith("_")])
+        # get sorted list of public methods & attributes
+        methods = sorted([atr for atr in avs
+                          if any([callable(getattr(cls, atr, None)) for cls in classes])])
+        attrs = sorted([atr for atr in avs if atr not in methods])
         content = "Attributes of {0} local model:\n{1}\n".format(self._model, "-" * 50)
         content += "\n".join(attrs)
         content += "\n\nMethods of {0} local model:\n{1}\n".format(self._model, "-" * 50)
@@ -315,7 +322,7 @@ class LocalConceptualDFT(BaseConceptualDFT):
         return content
 
     @classmethod
-    def from_file(cls, fname, model, points):
+    def from_file(cls, fname, model, points, block_size=None, memory=None):
         r"""
         Initialize class from calculation output file(s).
 
@@ -327,15 +334,20 @@ class LocalConceptualDFT(BaseConceptualDFT):
         model : str
             Energy model used to calculate local reactivity descriptors.
             Available models are "linear" and "quadratic".
-        points : np.array
+        points : np.array or UniformGrid
             Coordinates of points on which the local properties are evaluated given as a 2D
-            array with 3 columns.
+            array with 3 columns, or a grid.
+        block_size : int, optional
+            If given, densities are evaluated lazily on blocks of points with this size,
+            see `from_molecule`.
+        memory : int, optional
+            Maximum number of bytes of memoized local descriptors when `block_size` is given.
         """
         molecules = cls.load_file(fname)
-        return cls.from_molecule(molecules, model, points)
+        return cls.from_molecule(molecules, model, points, block_size, memory)
 
     @classmethod
-    def from_molecule(cls, molecule, model, points):
+    def from_molecule(cls, molecule, model, points, block_size=None, memory=None):
         r"""
         Initialize class from `Molecule` object(s).
 
@@ -346,9 +358,17 @@ class LocalConceptualDFT(BaseConceptualDFT):
         model : str
             Energy model used to calculate local reactivity descriptors.
             Available models are "linear" and "quadratic".
-        points : np.array
+        points : np.array or UniformGrid
             Coordinates of points on which the local properties are evaluated given as a 2D
-            array with 3 columns.
+            array with 3 columns, or a grid. When `block_size` is given, the points of the grid
+            are generated block by block, so their coordinates are never stored.
+        block_size : int, optional
+            If given, the densities are not computed upfront. Instead, each requested local
+            descriptor is evaluated on blocks of points with this size and memoized, see
+            :class:`LazyLocalTool`.
+        memory : int, optional
+            Maximum number of bytes of memoized local descriptors when `block_size` is given.
+            If None, all computed descriptors are kept.
         """
         # check molecule
         molecule = check_arg_molecule(molecule)
@@ -358,9 +378,26 @@ class LocalConceptualDFT(BaseConceptualDFT):
         #     points, numbers, coords = grid.points, grid.numbers, grid.centers
         numbers = get_matching_attr(molecule, "numbers", 1.e-8)
         coords = get_matching_attr(molecule, "coordinates", 1.e-4)
+        if block_size is not None:
+            return cls._from_func_density(get_func_density(molecule), model, points,
+                                          coords, numbers, block_size, memory)
+        if isinstance(points, UniformGrid):
+            points = points.points
         dict_dens = get_dict_density(molecule, points)
         return cls(dict_dens, model, coords, numbers)
 
+    @classmethod
+    def _from_func_density(cls, func_density, model, points, coordinates, numbers,
+                           block_size=10000, memory=None):
+        """Return instance with local tool evaluating densities lazily on blocks of points."""
+        instance = cls.__new__(cls)
+        # check model, coordinates & numbers like the constructor
+        instance._set_attributes(cls._models, model, coordinates, numbers)
+        instance._tool = LazyLocalTool(func_density, points, cls._models[instance.model],
+                                       block_size=block_size, memory=memory)
+        instance._log_init()
+        return instance
+
 
 class CondensedConceptualDFT(BaseConceptualDFT):
     r"""
@@ -432,9 +469,14 @@ class CondensedConceptualDFT(BaseConceptualDFT):
             Choose between "FMR" (fragment of molecular response) or "RMF"
             (response of molecular fragment).
         scheme : str, optional
-            Partitioning scheme. Options: "h", "hi", "mbis".
+            Partitioning scheme. Options: "h", "hi", "mbis", "qtaim".
         kwargs : dict, optional
             Extra keyword arguments required for partitioning, like 'grid' and 'proatomdb'.
+            For scheme="qtaim", the grid should be an instance of `UniformGrid`.
+            Pro-atom databases and converged atomic weights are reused from the on-disk cache
+            given by 'cache' (a `DiskCache` or its directory; False disables caching), and
+            with approach="RMF" the partitionings run in 'nprocs' processes, see
+            `get_dict_population`.
         """
         molecules = cls.load_file(fname)
         return cls.from_molecule(molecules, model, approach, scheme, **kwargs)
@@ -455,14 +497,23 @@ class CondensedConceptualDFT(BaseConceptualDFT):
             Choose between "FMR" (fragment of molecular response) or "RMF"
             (response of molecular fragment).
         scheme : str, optional
-            Partitioning scheme. Options: "h", "hi", "mbis".
+            Partitioning scheme. Options: "h", "hi", "mbis", "qtaim".
         kwargs : dict, optional
             Extra keyword arguments required for partitioning, like 'grid' and 'proatomdb'.
+            For scheme="qtaim", the grid should be an instance of `UniformGrid`.
+            Pro-atom databases and converged atomic weights are reused from the on-disk cache
+            given by 'cache' (a `DiskCache` or its directory; False disables caching), and
+            with approach="RMF" the partitionings run in 'nprocs' processes, see
+            `get_dict_population`.
         """
         # check molecule
         molecule = check_arg_molecule(molecule)
         # check type of grid
-        if "grid" in kwargs.keys() and not isinstance(kwargs["grid"], MolecularGrid):
+        if scheme.lower() == "qtaim":
+            if "grid" in kwargs.keys() and not isinstance(kwargs["grid"], UniformGrid):
+                raise ValueError("Only 'UniformGrid' is supported for condensing with "
+                                 "scheme='qtaim'!")
+        elif "grid" in kwargs.keys() and not isinstance(kwargs["grid"], MolecularGrid):
             raise ValueError("Currently, only 'MolecularGrid' is supported for condensing!")
         # get atomic number & coordinates
         numbers = get_matching_attr(molecule, "numbers", 1.e-8)
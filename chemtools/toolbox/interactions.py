@@ -24,19 +24,24 @@
 """Module for (non)bonding interaction analysis of Quantum Chemistry Output Files."""
 
 
+from itertools import islice
+from multiprocessing import Pool
+
 import numpy as np
 
 from chemtools.wrappers.molecule import Molecule
 from chemtools.denstools.densbased import DensGradTool
 from chemtools.utils.utils import doc_inherit
 from chemtools.utils.cube import UniformGrid
+from chemtools.topology.basins import BasinPartition
 from chemtools.outputs.plot import plot_scatter
 from chemtools.outputs.vmd import print_vmd_script_nci, print_vmd_script_isosurface
+from chemtools.outputs.isosurface import IsoSurface
 
 from numpy.ma import masked_less
 
 
-__all__ = ['NCI', 'ELF', 'LOL']
+__all__ = ['NCI', 'AveragedNCI', 'ELF', 'LOL']
 
 
 class BaseInteraction(object):
@@ -81,6 +86,16 @@ class BaseInteraction(object):
         """
         pass
 
+    @staticmethod
+    def _check_transform(trans, trans_k, trans_a):
+        """Check the type and parameters of transformation of the ratio."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _compute_ratio(dens, grad, ked):
+        """Return ratio given density, gradient & kinetic energy density."""
+        raise NotImplementedError
+
     @staticmethod
     def _check_grid(molecule, grid):
         if grid is None:
@@ -90,6 +105,39 @@ class BaseInteraction(object):
 
         return grid
 
+    @classmethod
+    def _from_blocks(cls, molecule, grid, spin, index, trans, trans_k, trans_a, denscut,
+                     block_size):
+        """Return instance computed from a single MGGA pass over blocks of grid points.
+
+        The density, gradient & kinetic energy density of each block are computed by
+        `compute_megga`, and the ratio and its transformation are written into the block of
+        the output array. So, only the transformed values are stored.
+        """
+        cls._check_transform(trans, trans_k, trans_a)
+        if not (isinstance(block_size, int) and block_size > 0):
+            raise ValueError('Argument block_size should be a positive integer! '
+                             'block_size={0}'.format(block_size))
+        value = np.empty(grid.points.shape[0])
+        for start in range(0, value.shape[0], block_size):
+            block = value[start:start + block_size]
+            dens, grad, _, ked = molecule.compute_megga(grid.points[start:start + block_size],
+                                                        spin=spin, index=index)
+            ratio = cls._compute_ratio(dens, grad, ked)
+            block[:] = np.ma.filled(cls._transform(ratio, trans.lower(), trans_k, trans_a), 0.)
+            block[dens < denscut] = 0.
+        # make instance without keeping the density, gradient, kinetic energy density & ratio
+        instance = cls.__new__(cls)
+        instance._set_value(grid, value)
+        return instance
+
+    def _set_value(self, grid, value):
+        """Set grid & transformed values, when the density tool & ratio are not stored."""
+        self._grid = grid
+        self._denstool = None
+        self._ratio = None
+        self._value = value
+
     @staticmethod
     def _transform(ratio, trans, trans_k, trans_a):
         if trans == 'rational':
@@ -241,12 +289,7 @@ class NCI(BaseInteraction):
         """
         if not isinstance(self._grid, UniformGrid):
             raise ValueError("Only possible if argument grid is a cubic grid.")
-        # similar to NCIPlot program, reduced density gradient of points with
-        # density > cutoff will be set to 100.0 before generating cube file to
-        # display reduced density gradient iso-surface subject to the constraint
-        # of low density, i.e. density < denscut.
-        cutrdg = np.array(self._rdgrad, copy=True)
-        cutrdg[abs(self._density) > denscut] = 100.0
+        cutrdg = self._compute_cut_rdgrad(denscut)
 
         # similar to NCIPlot program, sign(hessian second eigenvalue)*density is
         # multiplied by 100.0 before generating cube file used for coloring the
@@ -266,6 +309,220 @@ class NCI(BaseInteraction):
         # write VMD scripts
         print_vmd_script_nci(vmdfile, densfile, rdgfile, isosurf, denscut * 100.0)
 
+    def generate_mesh(self, fname, isosurf=0.50, denscut=0.05):
+        r"""Generate mesh file of reduced density gradient iso-surface to visualize NCI.
+
+        The reduced density gradient iso-surface is extracted directly from the cubic grid,
+        and colored by signed density (or density, if signed density is not available) on a
+        blue-green-red scale from -denscut to denscut, similar to :meth:`generate_scripts`.
+
+        Parameters
+        ----------
+        fname : str
+            Name of generated mesh file with \*.ply, \*.obj or \*.gltf extension.
+        isosurf : float, optional
+            Value of reduced density gradient (RDG) iso-surface.
+        denscut : float, optional
+            Density cutoff used for displaying reduced density gradient iso-surface
+            subject to the constraint of low density, i.e. density < denscut.
+
+        """
+        if not isinstance(self._grid, UniformGrid):
+            raise ValueError("Only possible if argument grid is a cubic grid.")
+        cutrdg = self._compute_cut_rdgrad(denscut)
+        if self._signed_density is not None:
+            dens = np.ma.filled(self._signed_density, 0.)
+        else:
+            dens = self._density
+        surface = IsoSurface.from_grid(self._grid, cutrdg, isosurf, color=dens)
+        surface.generate_mesh(fname, scalemin=-denscut, scalemax=denscut)
+
+    def _compute_cut_rdgrad(self, denscut):
+        """Return reduced density gradient set to 100.0 for points with density > denscut."""
+        # similar to NCIPlot program, reduced density gradient of points with
+        # density > cutoff will be set to 100.0 before generating cube file to
+        # display reduced density gradient iso-surface subject to the constraint
+        # of low density, i.e. density < denscut.
+        cutrdg = np.array(np.ma.filled(self._rdgrad, 100.0), copy=True)
+        cutrdg[abs(self._density) > denscut] = 100.0
+        return cutrdg
+
+
+class AveragedNCI(NCI):
+    r"""Averaged Non-Covalent Interactions (aNCI) Class.
+
+    The density, reduced density gradient and Hessian of density are averaged over a series of
+    frames (e.g. snapshots of a molecular dynamics trajectory) evaluated on a shared cubic grid.
+    The mean and variance are accumulated frame by frame, so the memory usage does not depend
+    on the number of frames, and only the averaged cube files are generated.
+    """
+
+    def __init__(self, density, rdgradient, grid, hessian=None, dens_var=None, rdg_var=None,
+                 nframes=1):
+        """Initialize class using averaged density, reduced density gradient & `UniformGrid`.
+
+        Parameters
+        ----------
+        density : np.array
+            Averaged density evaluated on grid points of `cube`.
+        rdgradient : np.array
+            Averaged reduced density gradient evaluated on grid points of `cube`.
+        grid : instance of `UniformGrid`
+            Cubic grid shared by all frames.
+        hessian : np.array, optional
+            Averaged Hessian of density evaluated on grid points of `cube`. This is a array with
+            shape (n, 6) where n is the number of grid points of `cube`.
+        dens_var : np.array, optional
+            Variance of density over frames evaluated on grid points of `cube`.
+            If None, the variance is set to zero.
+        rdg_var : np.array, optional
+            Variance of reduced density gradient over frames evaluated on grid points of `cube`.
+            If None, the variance is set to zero.
+        nframes : int, optional
+            Number of averaged frames.
+        """
+        super(AveragedNCI, self).__init__(density, rdgradient, grid, hessian=hessian)
+        if dens_var is None:
+            dens_var = np.zeros(density.shape)
+        if rdg_var is None:
+            rdg_var = np.zeros(rdgradient.shape)
+        if dens_var.shape != density.shape:
+            raise ValueError('Shape of dens_var argument {0} does not match expected {1} '
+                             'shape.'.format(dens_var.shape, density.shape))
+        if rdg_var.shape != rdgradient.shape:
+            raise ValueError('Shape of rdg_var argument {0} does not match expected {1} '
+                             'shape.'.format(rdg_var.shape, rdgradient.shape))
+        if not nframes >= 1:
+            raise ValueError('Argument nframes should be a positive integer! '
+                             'nframes={0}'.format(nframes))
+        self._dens_var = dens_var
+        self._rdg_var = rdg_var
+        self._nframes = nframes
+
+    @classmethod
+    def from_frames(cls, frames, grid, spin='ab', index=None, nprocs=1):
+        """Initialize class from a sequence of frames evaluated on a shared cubic grid.
+
+        Parameters
+        ----------
+        frames : iterable of str or `Molecule`
+            Frames given as paths to wave-function files, or as instances of `Molecule` (or any
+            object with `compute_density`, `compute_gradient` & `compute_hessian` methods).
+            This can be a generator, as the frames are consumed one at a time.
+        grid : instance of `UniformGrid`
+            Cubic grid shared by all frames used for calculating and visualizing the aNCI.
+        spin : str, optional
+            The type of occupied spin orbitals; options are 'a', 'b' & 'ab'.
+        index : int or Sequence of int, optional
+            Sequence of integers representing the index of spin orbitals.
+            If None, all occupied spin orbitals are included.
+        nprocs : int, optional
+            Number of processes used for evaluating the frames. If larger than one, frames are
+            evaluated in a process pool, so they should be picklable (e.g. file names).
+        """
+        if not isinstance(grid, UniformGrid):
+            raise ValueError('Argument grid should be a UniformGrid shared by all frames!')
+        if not nprocs >= 1:
+            raise ValueError('Argument nprocs should be a positive integer! '
+                             'nprocs={0}'.format(nprocs))
+        # evaluate frames lazily (in a process pool, if requested)
+        pool = None
+        if nprocs == 1:
+            results = (_compute_nci_frame(frame, grid.points, spin, index) for frame in frames)
+        else:
+            pool = Pool(nprocs, _init_nci_worker, (grid.points, spin, index))
+            results = _imap_bounded(pool, _compute_nci_worker, frames, nprocs)
+        try:
+            # first frame initializes the mean & variance
+            try:
+                mean_dens, mean_rdg, mean_hess = next(results)
+            except StopIteration:
+                raise ValueError('Argument frames should contain at least one frame!')
+            var_dens, var_rdg = np.zeros(mean_dens.shape), np.zeros(mean_rdg.shape)
+            nframes = 1
+            # accumulate running mean & variance of density and reduced density gradient
+            for dens, rdgrad, hess in results:
+                nframes += 1
+                _update_mean_variance(mean_dens, var_dens, dens, nframes)
+                _update_mean_variance(mean_rdg, var_rdg, rdgrad, nframes)
+                hess -= mean_hess
+                hess /= nframes
+                mean_hess += hess
+        finally:
+            if pool is not None:
+                pool.terminate()
+        # convert sum of squared deviations to (population) variance
+        var_dens /= nframes
+        var_rdg /= nframes
+        return cls(mean_dens, mean_rdg, grid, mean_hess, var_dens, var_rdg, nframes)
+
+    @property
+    def density_variance(self):
+        r"""Variance of electron density over frames."""
+        return self._dens_var
+
+    @property
+    def rdgradient_variance(self):
+        r"""Variance of reduced density gradient over frames."""
+        return self._rdg_var
+
+    @property
+    def nframes(self):
+        r"""Number of averaged frames."""
+        return self._nframes
+
+
+# arguments shared by all frames evaluated in an aNCI worker process
+_NCI_WORKER_ARGS = {}
+
+
+def _init_nci_worker(points, spin, index):
+    """Store the grid points & orbital selection shared by all frames in a worker process."""
+    _NCI_WORKER_ARGS.update(points=points, spin=spin, index=index)
+
+
+def _compute_nci_worker(frame):
+    """Return density, reduced density gradient & Hessian of a frame in a worker process."""
+    return _compute_nci_frame(frame, **_NCI_WORKER_ARGS)
+
+
+def _imap_bounded(pool, func, iterable, size):
+    """Yield func of items evaluated in the pool, with at most size items in flight.
+
+    The items are read from iterable in chunks of size, so the pool never consumes a
+    generator ahead of the reducer, and at most size results are held at once.
+    """
+    iterable = iter(iterable)
+    chunk = list(islice(iterable, size))
+    while chunk:
+        for result in pool.imap(func, chunk):
+            yield result
+        chunk = list(islice(iterable, size))
+
+
+def _compute_nci_frame(frame, points, spin, index):
+    """Return density, reduced density gradient & Hessian of a frame evaluated on points."""
+    if not hasattr(frame, 'compute_density'):
+        frame = Molecule.from_file(frame)
+    dens = frame.compute_density(points, spin=spin, index=index)
+    grad = frame.compute_gradient(points, spin=spin, index=index)
+    hess = frame.compute_hessian(points, spin=spin, index=index)
+    # similar to NCIPlot program, points with vanishing density get a large reduced gradient
+    rdgrad = np.ma.filled(DensGradTool(dens, grad).reduced_density_gradient, 100.0)
+    return dens, rdgrad, hess
+
+
+def _update_mean_variance(mean, sumsq, value, count):
+    """Update mean & sum of squared deviations in-place with Welford's algorithm.
+
+    The value array is overwritten, as it is only a temporary of the current frame.
+    """
+    delta = value - mean
+    mean += delta / count
+    value -= mean
+    delta *= value
+    sumsq += delta
+
 
 class ELF(BaseInteraction):
     r"""Electron Localization Function (ELF) introduced by Becke and Edgecombe.
@@ -326,24 +583,36 @@ class ELF(BaseInteraction):
             raise ValueError('Argument grad should be a 2d-array!')
         if grad.shape[0] != dens.shape[0]:
             raise ValueError('Argument dens & grad should have the same length!')
-        if trans.lower() not in ['rational', 'hyperbolic']:
-            raise ValueError('Argument trans should be either "rational" or "hyperbolic".')
-        if not trans_k > 0:
-            raise ValueError('Argument trans_k should be positive! trans_k={0}'.format(trans_k))
-        if not trans_a > 0:
-            raise ValueError('Argument trans_a should be positive! trans_a={0}'.format(trans_a))
+        self._check_transform(trans, trans_k, trans_a)
         self._grid = grid
         self._denstool = DensGradTool(dens, grad)
         # compute elf ratio
-        self._ratio = ked - self._denstool.ked_weizsacker
-        self._ratio /= masked_less(self._denstool.ked_thomas_fermi, 1.0e-30)
+        self._ratio = self._compute_ratio(dens, grad, ked)
         # compute elf value & set low density points to zero
         self._value = self._transform(self._ratio, trans.lower(), trans_k, trans_a)
         self._value[self._denstool.density < denscut] = 0.
 
+    @staticmethod
+    def _check_transform(trans, trans_k, trans_a):
+        """Check the type and parameters of ELF transformation."""
+        if trans.lower() not in ['rational', 'hyperbolic']:
+            raise ValueError('Argument trans should be either "rational" or "hyperbolic".')
+        if not trans_k > 0:
+            raise ValueError('Argument trans_k should be positive! trans_k={0}'.format(trans_k))
+        if not trans_a > 0:
+            raise ValueError('Argument trans_a should be positive! trans_a={0}'.format(trans_a))
+
+    @staticmethod
+    def _compute_ratio(dens, grad, ked):
+        """Return ELF ratio given density, gradient & kinetic energy density."""
+        denstool = DensGradTool(dens, grad)
+        ratio = ked - denstool.ked_weizsacker
+        ratio /= masked_less(denstool.ked_thomas_fermi, 1.0e-30)
+        return ratio
+
     @classmethod
     def from_molecule(cls, molecule, spin='ab', index=None, grid=None, trans='rational',
-                      trans_k=2, trans_a=1, denscut=0.0005):
+                      trans_k=2, trans_a=1, denscut=0.0005, block_size=None):
         """Initialize class from molecule.
 
         Parameters
@@ -365,10 +634,17 @@ class ELF(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. ELF value of points with density < denscut is set to zero.
+        block_size : int, optional
+            Number of grid points evaluated at once. If given, the density, gradient & kinetic
+            energy density are computed with a single MGGA pass over blocks of grid points,
+            and only the ELF values are stored (the ratio is not available).
 
         """
         # generate cubic grid or check grid
         grid = BaseInteraction._check_grid(molecule, grid)
+        if block_size is not None:
+            return cls._from_blocks(molecule, grid, spin, index, trans, trans_k, trans_a,
+                                    denscut, block_size)
         # compute density, gradient & kinetic energy density on grid
         dens = molecule.compute_density(grid.points, spin=spin, index=index)
         grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
@@ -377,7 +653,7 @@ class ELF(BaseInteraction):
 
     @classmethod
     def from_file(cls, fname, spin='ab', index=None, grid=None, trans='rational',
-                  trans_k=2, trans_a=1, denscut=0.0005):
+                  trans_k=2, trans_a=1, denscut=0.0005, block_size=None):
         """Initialize class from wave-function file.
 
         Parameters
@@ -399,14 +675,22 @@ class ELF(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. ELF value of points with density < denscut is set to zero.
+        block_size : int, optional
+            Number of grid points evaluated at once. If given, the density, gradient & kinetic
+            energy density are computed with a single MGGA pass over blocks of grid points,
+            and only the ELF values are stored (the ratio is not available).
 
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut)
+        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut,
+                                 block_size)
 
     @property
     def ratio(self):
-        r"""The ELF ratio evaluated on grid points."""
+        r"""The ELF ratio evaluated on grid points.
+
+        This is None, if the ELF values are computed block-wise.
+        """
         return self._ratio
 
     @property
@@ -414,6 +698,23 @@ class ELF(BaseInteraction):
         r"""The :math:`\text{ELF}(\mathbf{r})` evaluated on grid points."""
         return self._value
 
+    def compute_basins(self, threshold=0.):
+        """Return partitioning of the cubic grid into ELF basins.
+
+        The basin populations (e.g. of core, bonding & lone-pair basins) are obtained by
+        integrating the electron density over the basins with ``BasinPartition.integrate``.
+
+        Parameters
+        ----------
+        threshold : float, optional
+            Grid points with ELF value <= threshold (e.g. points with density < denscut) are
+            not assigned to any basin.
+
+        """
+        if not isinstance(self._grid, UniformGrid):
+            raise ValueError('Only possible if argument grid is a cubic grid.')
+        return BasinPartition(self._grid, np.ma.filled(self.value, 0.), threshold)
+
     def generate_scripts(self, fname, isosurf=0.8):
         """Generate VMD scripts & cube file to visualize ELF iso-surface.
 
@@ -428,14 +729,30 @@ class ELF(BaseInteraction):
         """
         if not isinstance(self._grid, UniformGrid):
             raise ValueError('Only possible if argument grid is a cubic grid.')
-        if self._denstool.density.shape[0] != self._grid.points.shape[0]:
-            raise ValueError('Number of grid points should match number of dens values!')
+        if self._value.shape[0] != self._grid.points.shape[0]:
+            raise ValueError('Number of grid points should match number of ELF values!')
         # dump ELF cube file & generate vmd script
         vmdname = fname + '.vmd'
         cubname = fname + '-elf.cube'
         self._grid.generate_cube(cubname, self.value)
         print_vmd_script_isosurface(vmdname, cubname, isosurf=isosurf, representation='Line')
 
+    def generate_mesh(self, fname, isosurf=0.8):
+        r"""Generate mesh file of ELF iso-surface.
+
+        Parameters
+        ----------
+        fname : str
+            Name of generated mesh file with \*.ply, \*.obj or \*.gltf extension.
+        isosurf : float, optional
+            Value of ELF iso-surface.
+
+        """
+        if not isinstance(self._grid, UniformGrid):
+            raise ValueError('Only possible if argument grid is a cubic grid.')
+        surface = IsoSurface.from_grid(self._grid, np.ma.filled(self.value, 0.), isosurf)
+        surface.generate_mesh(fname)
+
 
 class LOL(BaseInteraction):
     r"""Localized Orbital Locator (LOL) introduced by Becke and Schmider.
@@ -497,6 +814,18 @@ class LOL(BaseInteraction):
             raise ValueError('Argument grad should be a 2d-array!')
         if grad.shape[0] != dens.shape[0]:
             raise ValueError('Argument dens & grad should have the same length!')
+        self._check_transform(trans, trans_k, trans_a)
+        self._denstool = DensGradTool(dens, grad)
+        self._grid = grid
+        # compute elf ratio
+        self._ratio = self._compute_ratio(dens, grad, ked)
+        # compute elf value & set low density points to zero
+        self._value = self._transform(self._ratio, trans.lower(), trans_k, trans_a)
+        self._value[self._denstool.density < denscut] = 0
+
+    @staticmethod
+    def _check_transform(trans, trans_k, trans_a):
+        """Check the type and parameters of LOL transformation."""
         if trans.lower() not in ['inverse_rational', 'inverse_hyperbolic']:
             raise ValueError('Argument trans should be either "inverse_rational" or '
                              '"inverse_hyperbolic".')
@@ -504,17 +833,15 @@ class LOL(BaseInteraction):
             raise ValueError('Argument trans_k should be positive! trans_k={0}'.format(trans_k))
         if not trans_a > 0:
             raise ValueError('Argument trans_a should be positive! trans_a={0}'.format(trans_a))
-        self._denstool = DensGradTool(dens, grad)
-        self._grid = grid
-        # compute elf ratio
-        self._ratio = self._denstool.ked_thomas_fermi / masked_less(ked, 1.0e-30)
-        # compute elf value & set low density points to zero
-        self._value = self._transform(self._ratio, trans.lower(), trans_k, trans_a)
-        self._value[self._denstool.density < denscut] = 0
+
+    @staticmethod
+    def _compute_ratio(dens, grad, ked):
+        """Return LOL ratio given density, gradient & kinetic energy density."""
+        return DensGradTool(dens, grad).ked_thomas_fermi / masked_less(ked, 1.0e-30)
 
     @classmethod
     def from_molecule(cls, molecule, spin='ab', index=None, grid=None, trans='inverse_rational',
-                      trans_k=1, trans_a=1, denscut=0.0005):
+                      trans_k=1, trans_a=1, denscut=0.0005, block_size=None):
         """Initialize class from molecule.
 
         Parameters
@@ -537,10 +864,17 @@ class LOL(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. LOL value of points with density < denscut is set to zero.
+        block_size : int, optional
+            Number of grid points evaluated at once. If given, the density, gradient & kinetic
+            energy density are computed with a single MGGA pass over blocks of grid points,
+            and only the LOL values are stored (the ratio is not available).
 
         """
         # generate cubic grid or check grid
         grid = BaseInteraction._check_grid(molecule, grid)
+        if block_size is not None:
+            return cls._from_blocks(molecule, grid, spin, index, trans, trans_k, trans_a,
+                                    denscut, block_size)
         # compute density, gradient & kinetic energy density on grid
         dens = molecule.compute_density(grid.points, spin=spin, index=index)
         grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
@@ -549,7 +883,7 @@ class LOL(BaseInteraction):
 
     @classmethod
     def from_file(cls, fname, spin='ab', index=None, grid=None, trans='inverse_rational',
-                  trans_k=1, trans_a=1, denscut=0.0005):
+                  trans_k=1, trans_a=1, denscut=0.0005, block_size=None):
         """Initialize class from wave-function file.
 
         Parameters
@@ -572,14 +906,22 @@ class LOL(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. LOL value of points with density < denscut is set to zero.
+        block_size : int, optional
+            Number of grid points evaluated at once. If given, the density, gradient & kinetic
+            energy density are computed with a single MGGA pass over blocks of grid points,
+            and only the LOL values are stored (the ratio is not available).
 
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut)
+        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut,
+                                 block_size)
 
     @property
     def ratio(self):
-        r"""The LOL ratio evaluated on the grid points."""
+        r"""The LOL ratio evaluated on the grid points.
+
+        This is None, if the LOL values are computed block-wise.
+        """
         return self._ratio
 
     @property
@@ -587,6 +929,23 @@ class LOL(BaseInteraction):
         r"""The :math:`\text{LOL}(\mathbf{r})` evaluated on grid points."""
         return self._value
 
+    def compute_basins(self, threshold=0.):
+        """Return partitioning of the cubic grid into LOL basins.
+
+        The basin populations (e.g. of core, bonding & lone-pair basins) are obtained by
+        integrating the electron density over the basins with ``BasinPartition.integrate``.
+
+        Parameters
+        ----------
+        threshold : float, optional
+            Grid points with LOL value <= threshold (e.g. points with density < denscut) are
+            not assigned to any basin.
+
+        """
+        if not isinstance(self._grid, UniformGrid):
+            raise ValueError('Only possible if argument grid is a cubic grid.')
+        return BasinPartition(self._grid, np.ma.filled(self.value, 0.), threshold)
+
     def generate_scripts(self, fname, isosurf=0.5):
         """Generate VMD scripts & cube file to visualize LOL iso-surface.
 
@@ -607,3 +966,19 @@ class LOL(BaseInteraction):
         self._grid.generate_cube(fname_lol, self.value)
         # write VMD script for visualization
         print_vmd_script_isosurface(fname_vmd, fname_lol, isosurf=isosurf, representation='Line')
+
+    def generate_mesh(self, fname, isosurf=0.5):
+        r"""Generate mesh file of LOL iso-surface.
+
+        Parameters
+        ----------
+        fname : str
+            Name of generated mesh file with \*.ply, \*.obj or \*.gltf extension.
+        isosurf : float, optional
+            Value of LOL iso-surface.
+
+        """
+        if not isinstance(self._grid, UniformGrid):
+            raise ValueError('Only possible if argument grid is a cubic grid.')
+        surface = IsoSurface.from_grid(self._grid, np.ma.filled(self.value, 0.), isosurf)
+        surface.generate_mesh(fname)
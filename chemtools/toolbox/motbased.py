@@ -24,9 +24,12 @@
 """Orbital-Based Local Tools."""
 
 
+import numpy as np
+
 from chemtools.utils.utils import doc_inherit
 from chemtools.utils.cube import UniformGrid
 from chemtools.outputs.vmd import print_vmd_script_isosurface
+from chemtools.outputs.isosurface import IsoSurface
 from chemtools.wrappers.molecule import Molecule
 
 
@@ -169,6 +172,58 @@ class MOTBasedTool(object):
            If None, a cubic grid is constructed from molecule with spacing=0.2 & extension=5.0.
 
         """
+        grid, index = self._check_visualization_args(spin, index, grid)
+        for mo_index in index:
+            vmdname = fname + '_mo{0}.vmd'.format(mo_index)
+            cubname = fname + '_mo{0}.cube'.format(mo_index)
+            mo_value = self.compute_orbital_expression(grid.points, spin=spin, index=mo_index)
+            grid.generate_cube(cubname, mo_value)
+            print_vmd_script_isosurface(vmdname, cubname, isosurf=isosurf, negative=True,
+                                        material='BlownGlass')
+
+    def generate_mesh(self, fname, spin='a', index=None, isosurf=0.05, grid=None, fmt='ply'):
+        r"""Generate mesh file(s) of MO iso-surface of given orbitals.
+
+        Each mesh contains the positive and negative iso-surfaces of the orbital, which are
+        colored red and blue, respectively.
+
+        Parameters
+        ----------
+        fname : str
+            A string representing the path to a fname of generated files.
+            The mesh file will be named fname_mo{index}.{fmt}.
+        spin : str, optional
+           The type of occupied spin orbitals. Choose either 'a' or 'b'.
+        index : int, optional
+           Integer representing the index of spin orbital to visualize. Spin orbitals are each
+           indexed from 1 to :attr:`nbasis`. If None, files for visualizing all orbitals are
+           generated.
+        isosurf : float, optional
+            Value of MO iso-surface.
+        grid : UniformGrid, optional
+           Instance of UniformGrid used for computation of the orbitals.
+           If None, a cubic grid is constructed from molecule with spacing=0.2 & extension=5.0.
+        fmt : str, optional
+           Format of mesh file(s). Choose 'ply', 'obj' or 'gltf'.
+
+        """
+        if fmt not in ['ply', 'obj', 'gltf']:
+            raise ValueError('Argument fmt can only be "ply", "obj" or "gltf".')
+        grid, index = self._check_visualization_args(spin, index, grid)
+        for mo_index in index:
+            meshname = fname + '_mo{0}.{1}'.format(mo_index, fmt)
+            mo_value = self.compute_orbital_expression(grid.points, spin=spin, index=mo_index)
+            mo_value = mo_value.ravel()
+            surface = None
+            for sign in [1., -1.]:
+                lobe = IsoSurface.from_grid(grid, sign * mo_value, isosurf)
+                lobe = IsoSurface(lobe.vertices, lobe.faces, lobe.normals,
+                                  np.full(lobe.nvertices, sign))
+                surface = lobe if surface is None else surface + lobe
+            surface.generate_mesh(meshname, scalemin=-1., scalemax=1.)
+
+    def _check_visualization_args(self, spin, index, grid):
+        """Check arguments for visualizing orbitals, and return grid and orbital indices."""
         if spin not in ['a', 'b']:
             raise ValueError('Argument spin can only be "a" or "b".')
         if index is not None and not isinstance(index, int):
@@ -184,11 +239,4 @@ class MOTBasedTool(object):
             index = range(1, self.homo_index[spin_index[spin]] + 1)
         else:
             index = [index]
-
-        for mo_index in index:
-            vmdname = fname + '_mo{0}.vmd'.format(mo_index)
-            cubname = fname + '_mo{0}.cube'.format(mo_index)
-            mo_value = self.compute_orbital_expression(grid.points, spin=spin, index=mo_index)
-            grid.generate_cube(cubname, mo_value)
-            print_vmd_script_isosurface(vmdname, cubname, isosurf=isosurf, negative=True,
-                                        material='BlownGlass')
+        return grid, index
@@ -30,13 +30,20 @@ from numpy.testing import assert_raises, assert_equal, assert_almost_equal
 
 from chemtools.wrappers.molecule import Molecule
 from chemtools.wrappers.grid import MolecularGrid
+from chemtools.utils.cube import UniformGrid
 from chemtools.toolbox.conceptual import CondensedConceptualDFT
+from chemtools.utils.test.test_cache import setup_temporary_cache, teardown_temporary_cache
 try:
     from importlib_resources import path
 except ImportError:
     from importlib.resources import path
 
 
+# keep pro-atom databases & atomic weights cached by the tests out of the user's cache
+setup_module = setup_temporary_cache
+teardown_module = teardown_temporary_cache
+
+
 # def test_condensed_conceptual_raises():
 #     # file for FMO
 #     with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as file:
@@ -599,3 +606,44 @@ def test_condense_from_molecule_fd_rmf_mulliken_h2o_fchk():
 #                         agspec="insane", random_rotate=False, mode="keep")
 #     model = CondensedConceptualDFT.from_molecule(molecule, "quadratic", "RMF", "h", grid=grid)
 #     check_condensed_reactivity(model, "quadratic", expected_0, expected_p, expected_m, 16)
+
+
+def test_condense_from_molecule_fd_qtaim_h2o_fchk():
+    molecule = []
+    with path('chemtools.data', 'h2o_q+0_ub3lyp_ccpvtz.fchk') as file1:
+        molecule.append(Molecule.from_file(file1))
+    with path('chemtools.data', 'h2o_q-1_ub3lyp_ccpvtz.fchk') as file2:
+        molecule.append(Molecule.from_file(file2))
+    with path('chemtools.data', 'h2o_q+1_ub3lyp_ccpvtz.fchk') as file3:
+        molecule.append(Molecule.from_file(file3))
+    grid = UniformGrid.from_molecule(molecule[0], spacing=0.2, extension=5.0)
+    for approach in ["FMR", "RMF"]:
+        model = CondensedConceptualDFT.from_molecule(molecule, "linear", approach, "qtaim",
+                                                     grid=grid)
+        for nelec in [9, 10, 11]:
+            pops = model.population(nelec)
+            assert_almost_equal(np.sum(pops), nelec, decimal=1)
+            # symmetry equivalent hydrogen atoms have the same population
+            assert_almost_equal(pops[1], pops[2], decimal=2)
+            # oxygen is negatively charged in QTAIM
+            assert pops[0] > 8.5
+        assert_almost_equal(np.sum(model.ff_plus), 1., decimal=1)
+        assert_almost_equal(np.sum(model.ff_minus), 1., decimal=1)
+    # check invalid grid type
+    assert_raises(ValueError, CondensedConceptualDFT.from_molecule, molecule, "linear", "FMR",
+                  "qtaim", grid=MolecularGrid.from_molecule(molecule[0], "coarse"))
+
+
+def test_condense_from_molecule_fmo_rmf_h_ch4_fchk_nprocs():
+    # partitioning of N-1, N & N+1 densities in parallel matches serial partitioning
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as fname:
+        mol = Molecule.from_file(fname)
+    model1 = CondensedConceptualDFT.from_molecule(mol, "linear", "RMF", "h", cache=False)
+    model2 = CondensedConceptualDFT.from_molecule(mol, "linear", "RMF", "h", cache=False,
+                                                  nprocs=2)
+    expected = np.array([6.11301651, 0.97175462, 0.97175263, 0.9717521, 0.97174353])
+    check_condensed_reactivity(model1, "linear", expected, None, None, 10)
+    for n_elec in [9., 10., 11.]:
+        assert_almost_equal(model2.population(n_elec), model1.population(n_elec), decimal=10)
+    assert_raises(ValueError, CondensedConceptualDFT.from_molecule, mol, "linear", "RMF", "h",
+                  nprocs=0)
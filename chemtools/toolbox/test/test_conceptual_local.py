@@ -31,6 +31,7 @@ from numpy.testing import assert_raises, assert_equal, assert_almost_equal
 from chemtools.wrappers.molecule import Molecule
 from chemtools.wrappers.grid import MolecularGrid
 from chemtools.toolbox.conceptual import LocalConceptualDFT
+from chemtools.toolbox.utils import get_func_density
 try:
     from importlib_resources import path
 except ImportError:
@@ -145,6 +146,32 @@ def test_local_linear_from_molecule_fmo_ch4_uhf_ccpvdz_fchk():
     check_local_reactivity(model, "linear", grid, 10)
 
 
+def test_local_from_molecule_block_size_ch4_uhf_ccpvdz_fchk():
+    # atomic coordinates and numbers of CH4
+    coord, nums = get_data_ch4()
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as file_path:
+        molecule = Molecule.from_file(file_path)
+    points = np.random.uniform(-3., 3., (53, 3))
+    for energy_model in ["linear", "quadratic"]:
+        eager = LocalConceptualDFT.from_molecule(molecule, energy_model, points)
+        lazy = LocalConceptualDFT.from_molecule(molecule, energy_model, points, block_size=10)
+        assert_equal(lazy.model, energy_model)
+        assert_almost_equal(lazy.coordinates, coord, decimal=4)
+        assert_equal(lazy.numbers, nums)
+        assert_almost_equal(lazy.density(9.5), eager.density(9.5), decimal=8)
+    assert_almost_equal(lazy.dual_descriptor, eager.dual_descriptor, decimal=8)
+    # check printed descriptors are those of the local tool
+    assert_equal(lazy.__repr__(), eager.__repr__())
+    assert "fukui_function" in lazy.__repr__()
+    assert "iter_blocks" not in lazy.__repr__()
+    # check invalid model & coordinates
+    assert_raises(ValueError, LocalConceptualDFT.from_molecule, molecule, "rational", points,
+                  block_size=10)
+    func_density = get_func_density(molecule)
+    assert_raises(ValueError, LocalConceptualDFT._from_func_density, func_density, "linear",
+                  points, coord[:, :2], nums)
+
+
 def test_local_linear_from_file_fmo_ch4_uhf_ccpvdz_wfn():
     # atomic coordinates and numbers of CH4
     coord, nums = get_data_ch4()
@@ -26,6 +26,8 @@
 import numpy as np
 from numpy.testing import assert_allclose, assert_raises
 from chemtools.toolbox.interactions import ELF, LOL
+from chemtools.wrappers.molecule import Molecule
+from chemtools.utils.cube import UniformGrid
 try:
     from importlib_resources import path
 except ImportError:
@@ -66,3 +68,39 @@ def test_lol_h2o_nuclei():
     assert_raises(ValueError, LOL, dens, grad, ked, trans_k=0)
     assert_raises(ValueError, LOL, dens, grad, ked, trans_a=0)
     assert_raises(ValueError, LOL, dens, grad, ked, trans='rational')
+
+
+def test_elf_lol_h2o_block_size():
+    with path('chemtools.data', 'water_b3lyp_sto3g.fchk') as fname:
+        mol = Molecule.from_file(str(fname))
+    cube = UniformGrid.from_molecule(mol, spacing=0.5, extension=1.0)
+    for tool in [ELF, LOL]:
+        ref = tool.from_molecule(mol, grid=cube)
+        for block_size in [1, 7, cube.npoints, cube.npoints + 10]:
+            result = tool.from_molecule(mol, grid=cube, block_size=block_size)
+            assert_allclose(result.value, ref.value, rtol=1.e-8, atol=1.e-8)
+            assert result.ratio is None
+        # check raises
+        assert_raises(ValueError, tool.from_molecule, mol, grid=cube, block_size=0)
+        assert_raises(ValueError, tool.from_molecule, mol, grid=cube, block_size=1.5)
+        assert_raises(ValueError, tool.from_molecule, mol, grid=cube, trans_k=0, block_size=10)
+
+
+def test_elf_h2o_basins():
+    with path('chemtools.data', 'water_b3lyp_sto3g.fchk') as fname:
+        mol = Molecule.from_file(str(fname))
+    cube = UniformGrid.from_molecule(mol, spacing=0.2, extension=3.0)
+    dens = mol.compute_density(cube.points)
+    elf = ELF.from_molecule(mol, grid=cube)
+    basins = elf.compute_basins()
+    assert basins.nbasins > 1
+    # one core basin with ELF attractor close to oxygen nucleus
+    index, dist = basins.compute_nearest_atoms()
+    assert np.sum((mol.numbers[index] == 8) & (dist < 0.2)) == 1
+    # basin populations add up to the number of electrons
+    pops = basins.integrate(dens)
+    assert_allclose(np.sum(pops), 10., atol=0.1)
+    # check raises
+    points = cube.points[:5]
+    elf = ELF(dens[:5], mol.compute_gradient(points), mol.compute_ked(points))
+    assert_raises(ValueError, elf.compute_basins)
@@ -32,7 +32,7 @@ import numpy as np
 from numpy.testing import assert_raises, assert_equal, assert_almost_equal
 
 from chemtools.utils import UniformGrid
-from chemtools.toolbox.interactions import NCI
+from chemtools.toolbox.interactions import NCI, AveragedNCI, _compute_nci_frame
 from chemtools.wrappers.molecule import Molecule
 try:
     from importlib_resources import path
@@ -193,3 +193,71 @@ def test_analyze_nci_assert_errors():
         test = '%s/%s' % (dn, 'test.png')
         desp.generate_plot(test)
         assert os.path.isfile(test) and os.access(test, os.R_OK)
+
+
+def test_averaged_nci_h2o_dimer_fchk():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as file_path:
+        mol = Molecule.from_file(file_path)
+        cube = UniformGrid.from_file(file_path, spacing=2., extension=0.0)
+        # frames given as file names evaluated in a process pool
+        anci = AveragedNCI.from_frames([str(file_path)] * 3, cube, nprocs=2)
+    # frames given as molecule instances from a generator
+    frames = (mol for _ in range(2))
+    desp = AveragedNCI.from_frames(frames, cube)
+    ref = NCI.from_molecule(mol, grid=cube)
+    for nci, nframes in [(anci, 3), (desp, 2)]:
+        assert nci.nframes == nframes
+        assert_almost_equal(nci._density, ref._density, decimal=8)
+        assert_almost_equal(nci._rdgrad, ref._rdgrad, decimal=8)
+        assert_almost_equal(nci.signed_density, ref.signed_density, decimal=8)
+        assert_almost_equal(nci.density_variance, np.zeros(cube.npoints), decimal=8)
+        assert_almost_equal(nci.rdgradient_variance, np.zeros(cube.npoints), decimal=8)
+    # check raises
+    assert_raises(ValueError, AveragedNCI.from_frames, [], cube)
+    assert_raises(ValueError, AveragedNCI.from_frames, [mol], mol.coordinates)
+    assert_raises(ValueError, AveragedNCI.from_frames, [mol], cube, nprocs=0)
+    dens, rdg = ref._density, ref._rdgrad
+    assert_raises(ValueError, AveragedNCI, dens, rdg, cube, dens_var=np.array([0.]))
+    assert_raises(ValueError, AveragedNCI, dens, rdg, cube, rdg_var=np.array([0.]))
+    assert_raises(ValueError, AveragedNCI, dens, rdg, cube, nframes=0)
+
+
+def test_averaged_nci_distinct_frames():
+    fnames = []
+    for fname in ['h2o_dimer_pbe_sto3g.fchk', 'water_b3lyp_sto3g.fchk',
+                  'h2o_q+0_ub3lyp_ccpvtz.fchk']:
+        with path('chemtools.data', fname) as file_path:
+            fnames.append(str(file_path))
+    cube = UniformGrid.from_file(fnames[0], spacing=2., extension=0.0)
+    # reference mean & variance of the stacked per-frame arrays
+    values = [_compute_nci_frame(fname, cube.points, 'ab', None) for fname in fnames]
+    dens, rdg, hess = [np.array(item) for item in zip(*values)]
+    assert not np.allclose(dens[0], dens[1])
+    ref = NCI(np.mean(dens, axis=0), np.mean(rdg, axis=0), cube, np.mean(hess, axis=0))
+    # frames evaluated in a process pool (more frames than processes) & sequentially
+    for nprocs in [1, 2]:
+        anci = AveragedNCI.from_frames(iter(fnames), cube, nprocs=nprocs)
+        assert anci.nframes == 3
+        assert_almost_equal(anci._density, np.mean(dens, axis=0), decimal=8)
+        assert_almost_equal(anci._rdgrad, np.mean(rdg, axis=0), decimal=8)
+        assert_almost_equal(anci.eigvalues, ref.eigvalues, decimal=8)
+        assert_almost_equal(anci.density_variance, np.var(dens, axis=0), decimal=8)
+        assert_almost_equal(anci.rdgradient_variance, np.var(rdg, axis=0), decimal=8)
+
+
+def test_nci_h2o_dimer_generate_mesh():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as file_path:
+        mol = Molecule.from_file(file_path)
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g-dens.cube') as dens_cube1_path:
+        cube = UniformGrid.from_cube(dens_cube1_path)
+    desp = NCI.from_molecule(mol, grid=cube)
+    with tmpdir('chemtools.toolbox.test.test_nci.test_nci_h2o_dimer_generate_mesh') as dn:
+        for fname in ['nci.ply', 'nci.obj', 'nci.gltf']:
+            fname = '%s/%s' % (dn, fname)
+            desp.generate_mesh(fname, isosurf=0.5, denscut=0.05)
+            assert os.path.isfile(fname) and os.access(fname, os.R_OK)
+        # hydrogen bond iso-surface has negative signed density (i.e. colored blue)
+        with open('%s/%s' % (dn, 'nci.obj'), 'r') as f:
+            vertices = np.array([line.split()[1:] for line in f if line.startswith('v ')], float)
+        assert vertices.shape[0] > 0
+        assert np.any(vertices[:, 5] > vertices[:, 3])
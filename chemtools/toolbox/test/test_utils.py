@@ -22,20 +22,34 @@
 # --
 """Test chemtools.toolbox.utils."""
 
+import os
+import shutil
+import tempfile
+
 import numpy as np
 
-from numpy.testing import assert_raises
+from numpy.testing import assert_raises, assert_equal, assert_almost_equal
+
+from horton.scripts.wpart import wpart_schemes
 
 from chemtools import UniformGrid
 from chemtools.wrappers.molecule import Molecule
 from chemtools.toolbox.utils import get_matching_attr, get_molecular_grid
 from chemtools.toolbox.utils import get_dict_energy, get_dict_density, get_dict_population
+from chemtools.toolbox.utils import condense_to_atoms
+from chemtools.utils.cache import DiskCache
+from chemtools.utils.test.test_cache import setup_temporary_cache, teardown_temporary_cache
 try:
     from importlib_resources import path
 except ImportError:
     from importlib.resources import path
 
 
+# keep pro-atom databases & atomic weights cached by the tests out of the user's cache
+setup_module = setup_temporary_cache
+teardown_module = teardown_temporary_cache
+
+
 def test_get_matching_attr_raises():
     # check molecule
     with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as file1:
@@ -145,6 +159,7 @@ def test_get_dict_population_raises():
     assert_raises(ValueError, get_dict_population, molecule, "fm", "h")
     assert_raises(ValueError, get_dict_population, molecule, "rm", "hi")
     assert_raises(ValueError, get_dict_population, molecule, "gibberish", "esp")
+    assert_raises(ValueError, get_dict_population, molecule, "rmf", "h", nprocs=0)
     # check scheme
     with path('chemtools.data', 'h2o_q+0_ub3lyp_ccpvtz.fchk') as file1:
         with path('chemtools.data', 'h2o_q+1_ub3lyp_ccpvtz.fchk') as file2:
@@ -153,3 +168,92 @@ def test_get_dict_population_raises():
                             Molecule.from_file(file2),
                             Molecule.from_file(file3),]
     assert_raises(ValueError, get_dict_population, molecule, "rmf", "gibberish")
+
+
+def test_get_dict_population_cache():
+    with path('chemtools.data', 'h2o_q+0_ub3lyp_ccpvtz.fchk') as fname:
+        molecule = Molecule.from_file(fname)
+    # count the iterations of Hirshfeld-I partitioning
+    niter = []
+    hirshfeld_i = wpart_schemes["hi"]
+
+    class CountedHirshfeldI(hirshfeld_i):
+        def _update_propars(self):
+            niter.append(1)
+            return super(CountedHirshfeldI, self)._update_propars()
+
+    dn = tempfile.mkdtemp('chemtools.test.test_utils')
+    wpart_schemes["hi"] = CountedHirshfeldI
+    try:
+        cache = DiskCache(dn)
+        pops1 = get_dict_population(molecule, "FMR", "hi", cache=cache)
+        assert len(niter) > 0
+        # pro-atom database & converged atomic weights are stored
+        fnames = sorted(os.listdir(dn))
+        assert_equal(sorted(os.path.splitext(fname)[1] for fname in fnames), [".h5", ".npz"])
+        # cached atomic weights are restored without iterating
+        del niter[:]
+        pops2 = get_dict_population(molecule, "FMR", "hi", cache=cache)
+        assert_equal(len(niter), 0)
+        assert_equal(sorted(os.listdir(dn)), fnames)
+        assert_equal(sorted(pops1.keys()), sorted(pops2.keys()))
+        for nelec in pops1:
+            assert_equal(pops1[nelec], pops2[nelec])
+    finally:
+        wpart_schemes["hi"] = hirshfeld_i
+        shutil.rmtree(dn)
+
+
+class FakeAtomicGrid(object):
+    """Atomic grid with integration weights."""
+
+    def __init__(self, weights):
+        self.weights = weights
+
+    def integrate(self, *args):
+        return np.sum(self.weights * np.prod([arg for arg in args if arg is not None], axis=0))
+
+
+class FakePart(object):
+    """Partitioning with atomic grids given as consecutive slices of molecular grid."""
+
+    def __init__(self, weights, slices, at_weights, wcors):
+        self.natom = len(slices)
+        self.weights, self.slices, self.at_weights, self.wcors = weights, slices, at_weights, wcors
+        self.cache = self
+
+    def get_grid(self, index):
+        return FakeAtomicGrid(self.weights[self.slices[index]])
+
+    def load(self, name, index):
+        assert name == "at_weights"
+        return self.at_weights[index]
+
+    def get_wcor(self, index):
+        return self.wcors[index]
+
+    def to_atomic_grid(self, index, data):
+        return data[self.slices[index]]
+
+
+def test_condense_to_atoms_batched():
+    weights = np.random.uniform(0., 1., 20)
+    slices = [slice(0, 8), slice(5, 14), slice(12, 20)]
+    at_weights = [np.random.uniform(0., 1., 8), np.random.uniform(0., 1., 9),
+                  np.random.uniform(0., 1., 8)]
+    wcors = [None, np.random.uniform(0., 1., 9), None]
+    part = FakePart(weights, slices, at_weights, wcors)
+    props = np.random.uniform(-1., 1., (20, 4))
+    # condense each local property separately using integration of atomic grids
+    expected = np.zeros((3, 4))
+    for index in range(3):
+        grid = part.get_grid(index)
+        for prop in range(4):
+            expected[index, prop] = grid.integrate(at_weights[index], wcors[index],
+                                                   part.to_atomic_grid(index, props[:, prop]))
+    assert_almost_equal(condense_to_atoms(props[:, 1], part), expected[:, 1], decimal=10)
+    assert_almost_equal(condense_to_atoms(props, part), expected, decimal=10)
+    result = condense_to_atoms({"a": props[:, 0], 5: props[:, 3]}, part)
+    assert_equal(sorted(result.keys(), key=str), [5, "a"])
+    assert_almost_equal(result["a"], expected[:, 0], decimal=10)
+    assert_almost_equal(result[5], expected[:, 3], decimal=10)
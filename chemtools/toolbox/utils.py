@@ -24,6 +24,9 @@
 """Utility Functions of Toolbox Module."""
 
 
+import os
+from multiprocessing import Pool
+
 import numpy as np
 
 from horton import ProAtomDB
@@ -31,10 +34,15 @@ from horton.scripts.wpart import wpart_schemes
 
 from chemtools.wrappers.grid import MolecularGrid
 from chemtools.wrappers.molecule import Molecule
+from chemtools.utils.cube import UniformGrid
+from chemtools.utils.cache import DiskCache
+from chemtools.topology.basins import AtomicBasinPartition
 
 
 __all__ = ["check_arg_molecule", "get_homo_lumo_data", "get_dict_energy", "get_dict_density",
-           "get_dict_population", "get_matching_attr", "get_molecular_grid"]
+           "get_func_density", "get_dict_population", "get_dict_population_qtaim",
+           "get_matching_attr", "get_molecular_grid", "condense_to_atoms", "get_proatomdb",
+           "do_partitioning"]
 
 
 def check_arg_molecule(molecule):
@@ -149,7 +157,7 @@ def get_molecular_grid(molecule, grid=None):
 
 def condense_to_atoms(local_property, part):
     r"""
-    Return condensed values of the local descriptor partitioned and integrated over atoms.
+    Return condensed values of the local descriptor(s) partitioned and integrated over atoms.
 
     Condense the local descriptor :math:`p_{\text{local}}\left(\mathbf{r}\right)` into
     atomic contributions :math:`\{P_A\}_{A=1}^N_{\text{atoms}}` defined as,
@@ -158,20 +166,37 @@ def condense_to_atoms(local_property, part):
        P_A = \int \omega_A\left(\mathbf{r}\right)
                   p_{\text{local}}\left(\mathbf{r}\right) d\mathbf{r}
 
+    Several local descriptors are condensed at once, by computing the integration weights of
+    each atom once and integrating all descriptors with one matrix-vector product per atom.
+
     Parameters
     ----------
-    local_property : ndarray
-        Local descriptor evaluated on grid.
+    local_property : ndarray or dict
+        Local descriptor evaluated on grid given as an array of shape (npoints,), or several
+        local descriptors given as the columns of an array of shape (npoints, nprops) or as the
+        values of a dictionary.
     part : part instance
         Instance of `HORTON` partitioning calss.
+
+    Returns
+    -------
+    condensed : ndarray or dict
+        Condensed descriptor(s) as an array of shape (natom,) or (natom, nprops), or as a
+        dictionary with the same keys as `local_property`.
     """
-    condensed = np.zeros(part.natom)
+    if isinstance(local_property, dict):
+        keys = list(local_property.keys())
+        condensed = condense_to_atoms(np.column_stack([local_property[key] for key in keys]), part)
+        return dict(zip(keys, condensed.T))
+    condensed = np.zeros((part.natom,) + local_property.shape[1:])
     for index in range(part.natom):
         at_grid = part.get_grid(index)
-        at_weight = part.cache.load("at_weights", index)
+        # integration weights of atom shared by all local descriptors
+        weights = at_grid.weights * part.cache.load("at_weights", index)
         wcor = part.get_wcor(index)
-        local_prop = part.to_atomic_grid(index, local_property)
-        condensed[index] = at_grid.integrate(at_weight, local_prop, wcor)
+        if wcor is not None:
+            weights *= wcor
+        condensed[index] = np.dot(weights, part.to_atomic_grid(index, local_property))
     return condensed
 
 
@@ -222,34 +247,56 @@ def get_dict_density(molecule, points):
        The 2D array containing the cartesian coordinates of points on which density is
        evaluated. It has a shape (n, 3) where n is the number of points.
     """
+    return get_func_density(molecule)(points)
+
+
+def get_func_density(molecule):
+    r"""Return function evaluating dictionary of number of electrons and density values.
+
+    The returned function takes the (n, 3) array of points and returns the same dictionary as
+    `get_dict_density`, so the densities can be evaluated on blocks of points on demand.
+
+    Parameters
+    ----------
+    molecule : Molecule or Sequence of Molecule
+        Instance of Molecule class, or sequence of Molecule class instances.
+        In the case of one molecule, the Frontier Orbital Molecule (FMO) approach is used
+        to get the density of :math:`\rho_{N + 1}(\mathbf{r})` and
+        :math:`\rho_{N - 1}(\mathbf{r})`.
+    """
     if isinstance(molecule, Molecule):
-        # get homo/lumo energy and spin
+        # get homo/lumo spin and index
         _, _, homo_s, lumo_s = get_homo_lumo_data(molecule)
-        # compute homo & lumo density
         spin_to_index = {"a": 0, "b": 1}
-        homo_dens = molecule.compute_density(points, homo_s,
-                                             molecule.homo_index[spin_to_index[homo_s]])
-        lumo_dens = molecule.compute_density(points, lumo_s,
-                                             molecule.lumo_index[spin_to_index[lumo_s]])
-        # store number of electron and density in a dictionary
+        homo_i = molecule.homo_index[spin_to_index[homo_s]]
+        lumo_i = molecule.lumo_index[spin_to_index[lumo_s]]
         nelec = sum(molecule.nelectrons)
-        dens = molecule.compute_density(points, "ab", None)
-        densities = {nelec: dens,
-                     nelec + 1: dens + lumo_dens,
-                     nelec - 1: dens - homo_dens}
+
+        def func_density(points):
+            # compute homo & lumo density
+            homo_dens = molecule.compute_density(points, homo_s, homo_i)
+            lumo_dens = molecule.compute_density(points, lumo_s, lumo_i)
+            # store number of electron and density in a dictionary
+            dens = molecule.compute_density(points, "ab", None)
+            return {nelec: dens, nelec + 1: dens + lumo_dens, nelec - 1: dens - homo_dens}
+
     elif np.all([isinstance(mol, Molecule) for mol in molecule]):
-        # compute and record densities on given points in a dictionary
-        densities = {}
+        # get number of electrons of molecules
+        nelecs = {}
         for mol in molecule:
-            # get number of electrons
             nelec = sum(mol.nelectrons)
-            if nelec in densities.keys():
+            if nelec in nelecs.keys():
                 raise ValueError("Two molecules have {0} electrons!".format(nelec))
-            # store density for a given number of electron
-            densities[nelec] = mol.compute_density(points, "ab", None)
+            nelecs[nelec] = mol
+
+        def func_density(points):
+            # compute and record densities on given points in a dictionary
+            return dict([(nelec, mol.compute_density(points, "ab", None))
+                         for nelec, mol in nelecs.items()])
+
     else:
         raise ValueError("Argument molecule not recognized!")
-    return densities
+    return func_density
 
 
 def get_dict_population(molecule, approach, scheme, **kwargs):
@@ -263,12 +310,27 @@ def get_dict_population(molecule, approach, scheme, **kwargs):
         Choose between "FMR" (fragment of molecular response) or "RMF"
         (response of molecular fragment).
     scheme : str
-        Partitioning scheme.
+        Partitioning scheme. The "qtaim" scheme partitions the density evaluated on a
+        `UniformGrid` into atomic basins, see `get_dict_population_qtaim`.
     kwargs : optional
+        Extra keyword arguments of partitioning, like 'grid' and 'proatomdb'. The 'cache'
+        argument specifies the on-disk cache of pro-atom databases and converged atomic weights
+        as an instance of `DiskCache` or its directory. If None, the default `DiskCache` is
+        used, and if False, nothing is cached. In the "RMF" approach, the 'nprocs' argument
+        specifies the number of processes partitioning the densities in parallel (default 1).
     """
     # check approach
     if approach.lower() not in ["rmf", "fmr"]:
         raise ValueError("Argument approach={0} is not valid.".format(approach))
+    cache = kwargs.pop("cache", None)
+    nprocs = kwargs.pop("nprocs", 1)
+    if not isinstance(nprocs, int) or nprocs <= 0:
+        raise ValueError("Argument nprocs should be a positive integer! "
+                         "Given nprocs={0}".format(nprocs))
+
+    # case of condensing the density using QTAIM atomic basins on a cubic grid
+    if scheme.lower() == "qtaim":
+        return get_dict_population_qtaim(molecule, approach, **kwargs)
 
     # case of populations available in molecule
     if scheme.lower() not in wpart_schemes:
@@ -312,46 +374,249 @@ def get_dict_population(molecule, approach, scheme, **kwargs):
     else:
         raise ValueError("Argument molecule not recognized!")
 
-    # check and generate partitioning class & proatomdb
-    wpart = wpart_schemes[scheme]
+    # check cache
+    if cache is not False and not isinstance(cache, DiskCache):
+        cache = DiskCache(cache)
     # make proatom database
+    key_proatomdb = None
     if scheme.lower() not in ["mbis", "b"]:
         if "proatomdb" not in kwargs.keys():
-            proatomdb = ProAtomDB.from_refatoms(mol0.numbers)
-        kwargs["proatomdb"] = proatomdb
+            kwargs["proatomdb"], key_proatomdb = get_proatomdb(mol0.numbers, cache)
+        else:
+            # atomic weights of a given proatom database are not cached
+            cache = False
+
+    if approach.lower() == "fmr":
+        # check or generate molecular grid
+        grid = get_molecular_grid(molecule, kwargs.pop("grid", None))
+        # compute dictionary of number of electron and density
+        dict_dens = get_dict_density(molecule, grid.points)
+        # compute population of reference molecule
+        part0 = do_partitioning(scheme, mol0, grid, dict_dens.pop(sum(mol0.nelectrons)), cache,
+                                key_proatomdb, **kwargs)
+        dict_pops = dict([(sum(mol0.nelectrons), part0["populations"])])
+        # fragment of molecular response, condensing all densities in one pass over atoms
+        dict_pops.update(condense_to_atoms(dict_dens, part0))
+        return dict_pops
+
+    # response of molecular fragment, partitioning each density independently
+    if same_coordinates:
+        # check or generate molecular grid
+        grid = get_molecular_grid(molecule, kwargs.pop("grid", None))
+        # compute dictionary of number of electron and density
+        dict_dens = get_dict_density(molecule, grid.points)
+        tasks = [(nelec, mol0, grid, dens) for nelec, dens in dict_dens.items()]
+    else:
+        # density of each molecule is evaluated on its own grid by the task
+        dict_mols[sum(mol0.nelectrons)] = mol0
+        grid = kwargs.pop("grid", None)
+        tasks = [(nelec, mol, grid, None) for nelec, mol in dict_mols.items()]
+
+    args = (scheme, cache, key_proatomdb, kwargs)
+    if nprocs == 1:
+        pops = [_compute_population(task, *args) for task in tasks]
+    else:
+        # forked worker processes share the grid points, weights and densities of tasks
+        pool = Pool(min(nprocs, len(tasks)), _init_population_worker, (tasks,) + args)
+        try:
+            pops = pool.map(_compute_population_worker, range(len(tasks)))
+        finally:
+            pool.terminate()
+    # Store number of electron and populations in a dictionary
+    return dict([(task[0], pop) for task, pop in zip(tasks, pops)])
+
+
+def _compute_population(task, scheme, cache, key_proatomdb, kwargs):
+    """Return atomic populations of a (number of electrons, molecule, grid, density) task.
+
+    When density is None, it is evaluated on the grid of the molecule (made if grid is None).
+    """
+    _, molecule, grid, density = task
+    if density is None:
+        grid = get_molecular_grid(molecule, grid)
+        density = molecule.compute_density(grid.points, "ab", None)
+    part = do_partitioning(scheme, molecule, grid, density, cache, key_proatomdb, **kwargs)
+    return part["populations"]
 
-    # check or generate molecular grid
-    grid = get_molecular_grid(molecule, kwargs.pop("grid", None))
-    # compute dictionary of number of electron and density
-    dict_dens = get_dict_density(molecule, grid.points)
 
-    # compute population of reference molecule
-    part0 = wpart(mol0.coordinates, mol0.numbers, mol0.pseudo_numbers, grid,
-                  dict_dens[sum(mol0.nelectrons)], **kwargs)
-    part0.do_all()
-    # record population of reference system
-    dict_pops = dict([(sum(mol0.nelectrons), part0["populations"])])
-    del dict_dens[sum(mol0.nelectrons)]
+# tasks and arguments of worker processes used in parallel partitioning
+_POPULATION_WORKER = {}
 
-    # compute and record populations given grid in a dictionary
-    for nelec, dens in dict_dens.iteritems():
 
+def _init_population_worker(tasks, scheme, cache, key_proatomdb, kwargs):
+    """Store tasks and partitioning arguments in worker process."""
+    _POPULATION_WORKER["tasks"] = tasks
+    _POPULATION_WORKER["args"] = (scheme, cache, key_proatomdb, kwargs)
+
+
+def _compute_population_worker(index):
+    """Return atomic populations of the task with the given index in worker process."""
+    return _compute_population(_POPULATION_WORKER["tasks"][index], *_POPULATION_WORKER["args"])
+
+
+def get_proatomdb(numbers, cache=False):
+    """Return pro-atom database of reference atoms and its cache key.
+
+    Parameters
+    ----------
+    numbers : np.ndarray
+        Atomic numbers of atoms. The database contains the reference atoms of each element.
+    cache : DiskCache or False, optional
+        On-disk cache of pro-atom databases. If False, the database is built and its key is None.
+    """
+    numbers = np.unique(numbers)
+    if cache is False:
+        return ProAtomDB.from_refatoms(numbers), None
+    # pro-atoms of reference atoms on default atomic grid specification
+    key = cache.key("proatomdb", "refatoms", numbers)
+    fname = cache.path(key, ".h5")
+    if os.path.exists(fname):
+        try:
+            proatomdb = ProAtomDB.from_file(fname)
+            # mark as most recently used
+            os.utime(fname, None)
+            return proatomdb, key
+        except (IOError, OSError):
+            # entry removed by another process, or not readable
+            pass
+    proatomdb = ProAtomDB.from_refatoms(numbers)
+    cache.dump_file(key, ".h5", proatomdb.to_file)
+    return proatomdb, key
+
+
+def do_partitioning(scheme, molecule, grid, density, cache=False, key_proatomdb=None, **kwargs):
+    """Return partitioning of density after reusing or caching the converged atomic weights.
+
+    The atomic weights are cached per scheme, geometry, grid and density. When they are found
+    in the cache, the iterations of iterative schemes (like Hirshfeld-I and MBIS) are skipped.
+
+    Parameters
+    ----------
+    scheme : str
+        Partitioning scheme available in `HORTON`.
+    molecule : Molecule
+        Instance of Molecule class.
+    grid : MolecularGrid
+        Molecular grid on which the density is evaluated.
+    density : np.ndarray
+        Density of molecule evaluated on grid points.
+    cache : DiskCache or False, optional
+        On-disk cache of atomic weights. If False, nothing is cached.
+    key_proatomdb : str, optional
+        Cache key of pro-atom database given in kwargs.
+    kwargs : optional
+        Extra keyword arguments of partitioning class.
+    """
+    wpart = wpart_schemes[scheme.lower()]
+    part = wpart(molecule.coordinates, molecule.numbers, molecule.pseudo_numbers, grid, density,
+                 **kwargs)
+    if cache is False:
+        part.do_all()
+        return part
+    options = dict([(name, value) for name, value in kwargs.items() if name != "proatomdb"])
+    key = cache.key("at_weights", scheme.lower(), key_proatomdb, options, molecule.numbers,
+                    molecule.pseudo_numbers, molecule.coordinates, grid.points, grid.weights,
+                    density)
+    data = cache.load(key)
+    if data is not None:
+        # restore converged atomic weights (& convergence info of iterative schemes)
+        for index in range(part.natom):
+            part.cache.dump("at_weights", index, data["at_weights_{0}".format(index)])
+        for name in ["niter", "change", "propars"]:
+            if name in data:
+                part.cache.dump(name, data[name][()])
+    part.do_all()
+    if data is None:
+        data = dict([("at_weights_{0}".format(index), part.cache.load("at_weights", index))
+                     for index in range(part.natom)])
+        for name in ["niter", "change", "propars"]:
+            if name in part.cache:
+                data[name] = np.asarray(part.cache.load(name))
+        cache.dump(key, **data)
+    return part
+
+
+def get_dict_population_qtaim(molecule, approach, grid=None, threshold=None):
+    r"""Return dictionary of number of electrons and corresponding QTAIM atomic populations.
+
+    The electron density is evaluated on a cubic grid and partitioned into atomic basins using
+    `AtomicBasinPartition`.
+
+    Parameters
+    ----------
+    molecule : Molecule or Sequence of Molecule
+        Instance of Molecule class, or sequence of Molecule class instances.
+    approach : str
+        Choose between "FMR" (fragment of molecular response) or "RMF"
+        (response of molecular fragment). In the "FMR" approach, the atomic basins of the
+        reference molecule are used for all densities, while in the "RMF" approach the density
+        of each molecule is partitioned into its own atomic basins.
+    grid : UniformGrid, optional
+        Instance of UniformGrid on which the densities are evaluated. If None, a cubic grid
+        is constructed from reference molecule with spacing=0.2 & extension=5.0. When the
+        geometries of molecules are different, a cubic grid is constructed for each molecule.
+    threshold : float, optional
+        Points with density <= threshold are not assigned to any atom.
+        If None, all points are assigned.
+    """
+    # check approach
+    if approach.lower() not in ["rmf", "fmr"]:
+        raise ValueError("Argument approach={0} is not valid.".format(approach))
+    if grid is not None and not isinstance(grid, UniformGrid):
+        raise ValueError("Argument grid should be a UniformGrid for scheme='qtaim'!")
+    try:
+        # check whether molecules have the same coordinates
+        get_matching_attr(molecule, "coordinates", 1.e-4)
+        same_coordinates = True
+    except ValueError:
         if approach.lower() == "fmr":
+            raise ValueError("When geometries of molecules are different, only approach='RMF' "
+                             "is possible! Given approach={0}".format(approach.upper()))
+        same_coordinates = False
+
+    # find reference molecule
+    if isinstance(molecule, Molecule):
+        mol0 = molecule
+    elif np.all([isinstance(mol, Molecule) for mol in molecule]):
+        # reference molecule is the middle molecule (for 3 molecules)
+        dict_mols = {sum(mol.nelectrons): mol for mol in molecule}
+        mol0 = dict_mols[sorted(dict_mols.keys())[len(dict_mols) // 2]]
+    else:
+        raise ValueError("Argument molecule not recognized!")
+
+    if not same_coordinates:
+        # response of molecular fragment with each molecule on its own cubic grid
+        if grid is not None:
+            raise ValueError("Argument grid cannot be used when geometries of molecules are "
+                             "different for scheme='qtaim'!")
+        dict_pops = {}
+        for nelec, mol in dict_mols.items():
+            cube = UniformGrid.from_molecule(mol, spacing=0.2, extension=5.0)
+            dens = mol.compute_density(cube.points, "ab", None)
+            part = AtomicBasinPartition(cube, dens, mol.coordinates, threshold)
+            dict_pops[nelec] = part.compute_populations()
+        return dict_pops
+
+    # check or generate cubic grid
+    if grid is None:
+        grid = UniformGrid.from_molecule(mol0, spacing=0.2, extension=5.0)
+    else:
+        grid = get_molecular_grid(molecule, grid)
+    # compute dictionary of number of electron and density
+    dict_dens = get_dict_density(molecule, grid.points)
+
+    # partition density of reference molecule into atomic basins
+    nelec0 = sum(mol0.nelectrons)
+    part0 = AtomicBasinPartition(grid, dict_dens[nelec0], mol0.coordinates, threshold)
+    dict_pops = {}
+    for nelec, dens in dict_dens.items():
+        if nelec == nelec0:
+            dict_pops[nelec] = part0.compute_populations()
+        elif approach.lower() == "fmr":
             # fragment of molecular response
-            pops = condense_to_atoms(dens, part0)
-        elif approach.lower() == "rmf":
-            # response of molecular fragment
-            if not same_coordinates:
-                mol = dict_mols[nelec]
-                grid = get_molecular_grid(molecule, None)
-                dens = molecule.compute_density(grid.points, "ab", None)
-            parts = wpart(mol.coordinates, mol.numbers, mol.pseudo_numbers,
-                          grid, dens, **kwargs)
-
-            parts.do_all()
-            pops = parts["populations"]
+            dict_pops[nelec] = part0.integrate_atoms(dens)
         else:
-            raise ValueError("Condensing approach {0} is not recognized!".format(approach))
-        # Store number of electron and populations in a dictionary
-        dict_pops[nelec] = pops
+            # response of molecular fragment
+            part = AtomicBasinPartition(grid, dens, mol0.coordinates, threshold)
+            dict_pops[nelec] = part.compute_populations()
     return dict_pops
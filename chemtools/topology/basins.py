@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""On-Grid Basin Partitioning Module."""
+
+
+import numpy as np
+from scipy.ndimage import label
+
+
+__all__ = ['BasinPartition', 'AtomicBasinPartition']
+
+
+class BasinPartition(object):
+    r"""Partition of a scalar field on a cubic grid into basins of attraction.
+
+    Every grid point is assigned to the basin of the attractor (local maximum) reached by
+    following the on-grid steepest-ascent path. At each step, a point moves to the neighbour
+    :math:`\mathbf{r}_j` (among its 26 nearest neighbours) with the largest positive ascent:
+
+    .. math::
+       \frac{f\left(\mathbf{r}_j\right) - f\left(\mathbf{r}_i\right)}
+            {\lvert \mathbf{r}_j - \mathbf{r}_i \rvert}
+
+    A point without any ascending neighbour is an attractor, and adjacent attractors (which
+    have the same value) are merged into one. The ascent directions are computed for all grid
+    points at once over the 26 neighbour offsets, and the ascent paths are followed by pointer
+    jumping, so the number of passes grows with the logarithm of the longest path.
+    """
+
+    def __init__(self, grid, value, threshold=None):
+        r"""Initialize class.
+
+        Parameters
+        ----------
+        grid : UniformGrid
+            Instance of `UniformGrid` on which the scalar field is evaluated.
+        value : np.ndarray, shape=(npoints,)
+            Scalar field evaluated on the grid points, e.g. ELF or electron density.
+        threshold : float, optional
+            Points with value <= threshold are not assigned to any basin (their basin label
+            is -1). If None, all points are assigned.
+
+        """
+        if not (hasattr(grid, 'shape') and hasattr(grid, 'axes') and hasattr(grid, 'points')):
+            raise ValueError('Argument grid should be an instance of UniformGrid!')
+        if value.shape != (grid.npoints,):
+            raise ValueError('Argument value should have ({0},) shape! '
+                             'Given {1}'.format(grid.npoints, value.shape))
+        self._grid = grid
+        self._value = value
+        # assign each point to the attractor at the end of its steepest-ascent path
+        parent = self._compute_ascent_pointers(grid, value, threshold)
+        self._basins, self._attractors_index = self._label_basins(grid, value, parent,
+                                                                  threshold)
+
+    @property
+    def grid(self):
+        """Cubic grid on which the basins are defined."""
+        return self._grid
+
+    @property
+    def nbasins(self):
+        """Number of basins."""
+        return self._attractors_index.shape[0]
+
+    @property
+    def basins(self):
+        """Basin label of every grid point; -1 for points not assigned to any basin.
+
+        The basins are labeled from 0 in the decreasing order of the value of their attractor.
+        """
+        return self._basins
+
+    @property
+    def attractors(self):
+        """Cartesian coordinates of the basin attractors."""
+        return self._grid.points[self._attractors_index]
+
+    @property
+    def attractors_value(self):
+        """Value of scalar field at the basin attractors."""
+        return self._value[self._attractors_index]
+
+    def integrate(self, data, method='R0'):
+        """Integrate the data over each basin.
+
+        Parameters
+        ----------
+        data : np.ndarray, shape=(npoints,) or (npoints, m)
+            Data evaluated on the grid points.
+        method : str, optional
+            The method for computing the integration weights of the cubic grid.
+            See ``UniformGrid.weights`` for the available options.
+
+        Returns
+        -------
+        np.ndarray, shape=(nbasins,) or (nbasins, m)
+            Integral of data over each basin.
+        """
+        return self._integrate_labels(self._basins, self.nbasins, data, method)
+
+    def compute_volumes(self, method='R0'):
+        """Return volume of each basin.
+
+        Parameters
+        ----------
+        method : str, optional
+            The method for computing the integration weights of the cubic grid.
+            See ``UniformGrid.weights`` for the available options.
+        """
+        return self.integrate(np.ones(self._basins.shape[0]), method=method)
+
+    def compute_nearest_atoms(self, coordinates=None):
+        """Return index of nearest atom to each attractor and the corresponding distance.
+
+        This can be used to classify basins, e.g. ELF core basins have attractors close to
+        the nuclei, while valence basins have attractors far from them.
+
+        Parameters
+        ----------
+        coordinates : np.ndarray, shape=(M, 3), optional
+            Cartesian coordinates of atoms. If None, the coordinates of grid's atoms are used.
+        """
+        if coordinates is None:
+            coordinates = self._grid.coordinates
+        dist = np.linalg.norm(self.attractors[:, None, :] - coordinates[None, :, :], axis=-1)
+        index = np.argmin(dist, axis=1)
+        return index, dist[np.arange(index.shape[0]), index]
+
+    def _integrate_labels(self, labels, nlabels, data, method):
+        """Integrate the data over grid points with the same (non-negative) label."""
+        if data.shape[0] != labels.shape[0]:
+            raise ValueError('Argument data should have the same size as the grid for axis=0. '
+                             '{0}!={1}'.format(data.shape[0], labels.shape[0]))
+        mask = labels >= 0
+        labels = labels[mask]
+        weights = self._grid.weights(method=method)[mask]
+        if data.ndim == 1:
+            return np.bincount(labels, weights=weights * data[mask], minlength=nlabels)
+        result = np.zeros((nlabels,) + data.shape[1:])
+        for index in np.ndindex(*data.shape[1:]):
+            values = data[(mask,) + index]
+            result[(slice(None),) + index] = np.bincount(labels, weights=weights * values,
+                                                         minlength=nlabels)
+        return result
+
+    @staticmethod
+    def _neighbour_offsets():
+        """Return index offsets of the 26 nearest neighbours, with the zero offset first."""
+        offsets = np.array(list(np.ndindex(3, 3, 3))) - 1
+        order = np.argsort(np.sum(np.abs(offsets), axis=1), kind='mergesort')
+        return offsets[order]
+
+    @staticmethod
+    def _compute_ascent_pointers(grid, value, threshold):
+        """Return flat index of the attractor reached from every grid point."""
+        shape = tuple(int(item) for item in grid.shape)
+        value = value.reshape(shape)
+        # find steepest-ascent neighbour of every point (code 0 denotes no ascent) by comparing
+        # shifted slices of values, so points outside of the grid are never an ascent direction
+        offsets = BasinPartition._neighbour_offsets()
+        best = np.zeros(shape, dtype=value.dtype)
+        code = np.zeros(shape, dtype=np.int8)
+        for index, offset in enumerate(offsets[1:], 1):
+            point = tuple(slice(max(0, -o), n - max(0, o)) for o, n in zip(offset, shape))
+            neighbour = tuple(slice(max(0, o), n + min(0, o)) for o, n in zip(offset, shape))
+            ascent = value[neighbour] - value[point]
+            ascent /= np.linalg.norm(np.dot(offset, grid.axes))
+            best_point, code_point = best[point], code[point]
+            mask = ascent > best_point
+            best_point[mask] = ascent[mask]
+            code_point[mask] = index
+            del ascent, mask
+        del best
+        if threshold is not None:
+            code[value <= threshold] = 0
+        # convert neighbour codes to flat index of the neighbour (int32 when it fits)
+        dtype = np.int32 if value.size < 2**31 else np.int64
+        flat_offsets = np.dot(offsets, [shape[1] * shape[2], shape[2], 1])
+        code = code.ravel()
+        parent = np.arange(value.size, dtype=dtype)
+        for index in range(1, len(offsets)):
+            parent[code == index] += flat_offsets[index]
+        del code
+        # follow ascent paths by pointer jumping until every point points to its attractor,
+        # reusing one buffer for the grand parents (clip mode avoids a buffered copy)
+        grand_parent = np.empty_like(parent)
+        while True:
+            np.take(parent, parent, out=grand_parent, mode='clip')
+            if np.array_equal(grand_parent, parent):
+                break
+            parent, grand_parent = grand_parent, parent
+        return parent
+
+    @staticmethod
+    def _label_basins(grid, value, parent, threshold):
+        """Return basin label of every point and flat index of every basin attractor."""
+        shape = tuple(int(item) for item in grid.shape)
+        included = np.ones(value.shape, dtype=bool)
+        if threshold is not None:
+            included = value > threshold
+        # attractors point to themselves; adjacent attractors form one (plateau) attractor
+        roots = np.flatnonzero((parent == np.arange(parent.size)) & included)
+        mask = np.zeros(parent.size, dtype=bool)
+        mask[roots] = True
+        components, ncomponents = label(mask.reshape(shape), structure=np.ones((3, 3, 3)))
+        components = components.ravel()
+        # representative point of each attractor is the (last) point with the largest value
+        order = np.argsort(value[roots], kind='mergesort')
+        rep = np.empty(ncomponents, dtype=int)
+        rep[components[roots[order]] - 1] = roots[order]
+        # label basins in the decreasing order of attractor values
+        rank = np.argsort(-value[rep], kind='mergesort')
+        relabel = np.empty(ncomponents, dtype=int)
+        relabel[rank] = np.arange(ncomponents)
+        basins = np.full(parent.size, -1, dtype=int)
+        basins[included] = relabel[components[parent[included]] - 1]
+        return basins, rep[rank]
+
+
+class AtomicBasinPartition(BasinPartition):
+    r"""Partition of electron density on a cubic grid into atomic basins (QTAIM).
+
+    The basins of the electron density are found with the on-grid steepest-ascent algorithm
+    of :class:`BasinPartition`, and each basin is assigned to the atom closest to its attractor,
+    so that the atomic basin :math:`\Omega_A` is the union of basins of atom :math:`A`. Basins
+    of non-nuclear attractors (and of the plateaus of a vanishing density far from molecule)
+    are merged into the basin of their nearest atom. Any property :math:`p(\mathbf{r})` is then
+    condensed into atomic contributions by,
+
+    .. math::
+       P_A = \int_{\Omega_A} p\left(\mathbf{r}\right) d\mathbf{r}
+
+    which for all atoms is computed at once by a weighted count of the atom label of every grid
+    point.
+    """
+
+    def __init__(self, grid, density, coordinates=None, threshold=None):
+        r"""Initialize class.
+
+        Parameters
+        ----------
+        grid : UniformGrid
+            Instance of `UniformGrid` on which the electron density is evaluated.
+        density : np.ndarray, shape=(npoints,)
+            Electron density evaluated on the grid points.
+        coordinates : np.ndarray, shape=(M, 3), optional
+            Cartesian coordinates of atoms. If None, the coordinates of grid's atoms are used.
+        threshold : float, optional
+            Points with density <= threshold are not assigned to any atom (their atom label
+            is -1). If None, all points are assigned.
+
+        """
+        super(AtomicBasinPartition, self).__init__(grid, density, threshold)
+        if coordinates is None:
+            coordinates = grid.coordinates
+        coordinates = np.asarray(coordinates, dtype=float)
+        if coordinates.ndim != 2 or coordinates.shape[1] != 3 or coordinates.shape[0] == 0:
+            raise ValueError('Argument coordinates should be a 2D array with 3 columns! '
+                             'Given shape={0}'.format(coordinates.shape))
+        self._coordinates = coordinates
+        # assign each basin, and so each grid point, to the atom nearest to its attractor
+        self._basins_atom, _ = self.compute_nearest_atoms(coordinates)
+        self._atoms = np.full(self._basins.shape[0], -1, dtype=int)
+        mask = self._basins >= 0
+        self._atoms[mask] = self._basins_atom[self._basins[mask]]
+
+    @property
+    def coordinates(self):
+        """Cartesian coordinates of atoms."""
+        return self._coordinates
+
+    @property
+    def natoms(self):
+        """Number of atoms."""
+        return self._coordinates.shape[0]
+
+    @property
+    def atoms(self):
+        """Atom label of every grid point; -1 for points not assigned to any atom."""
+        return self._atoms
+
+    @property
+    def basins_atom(self):
+        """Index of the atom each basin is assigned to."""
+        return self._basins_atom
+
+    def integrate_atoms(self, data, method='R0'):
+        """Integrate the data over each atomic basin.
+
+        Parameters
+        ----------
+        data : np.ndarray, shape=(npoints,) or (npoints, m)
+            Data evaluated on the grid points.
+        method : str, optional
+            The method for computing the integration weights of the cubic grid.
+            See ``UniformGrid.weights`` for the available options.
+
+        Returns
+        -------
+        np.ndarray, shape=(natoms,) or (natoms, m)
+            Integral of data over each atomic basin.
+        """
+        return self._integrate_labels(self._atoms, self.natoms, data, method)
+
+    def compute_populations(self, method='R0'):
+        """Return electron population of each atom.
+
+        Parameters
+        ----------
+        method : str, optional
+            The method for computing the integration weights of the cubic grid.
+            See ``UniformGrid.weights`` for the available options.
+        """
+        return self.integrate_atoms(self._value, method=method)
+
+    def compute_charges(self, numbers=None, method='R0'):
+        """Return atomic charges, i.e. nuclear charges minus electron populations.
+
+        Parameters
+        ----------
+        numbers : np.ndarray, shape=(M,), optional
+            Nuclear charges of atoms. If None, the pseudo numbers of grid's atoms are used.
+        method : str, optional
+            The method for computing the integration weights of the cubic grid.
+            See ``UniformGrid.weights`` for the available options.
+        """
+        if numbers is None:
+            numbers = self._grid.pseudo_numbers
+        if len(numbers) != self.natoms:
+            raise ValueError('Argument numbers should have {0} elements! '
+                             'Given {1}'.format(self.natoms, len(numbers)))
+        return numbers - self.compute_populations(method=method)
+
+    def compute_atomic_volumes(self, isovalue=None, method='R0'):
+        """Return volume of each atomic basin.
+
+        Parameters
+        ----------
+        isovalue : float, optional
+            If given, only the part of atomic basins with density > isovalue is included, e.g.
+            isovalue=0.001 gives the volumes enclosed by the 0.001 a.u. density envelope.
+        method : str, optional
+            The method for computing the integration weights of the cubic grid.
+            See ``UniformGrid.weights`` for the available options.
+        """
+        data = np.ones(self._atoms.shape[0])
+        if isovalue is not None:
+            data = (self._value > isovalue).astype(float)
+        return self.integrate_atoms(data, method=method)
@@ -22,9 +22,13 @@
 # --
 r"""This file contains functions for finding the critical points."""
 import warnings
+from functools import partial
+from multiprocessing import Pool
+
 import numpy as np
-from scipy.optimize import root
-from scipy.spatial import KDTree
+from scipy.spatial import cKDTree
+
+from chemtools.topology.paths import GradientPaths, trace_gradient_paths
 
 
 class CriticalPoint(object):
@@ -65,7 +69,8 @@ class Topo(object):
     """Topo class for searching critical points given scalar function."""
 
     def __init__(
-        self, coors, value_func, gradian_func, hess_func, points=None, extra=5
+        self, coors, value_func, gradian_func, hess_func, points=None, extra=5,
+        vectorized=False
     ):
         """Initialize Topo class instance.
 
@@ -85,6 +90,11 @@ class Topo(object):
             will be generated by default.
         extra : int, optional
             Extra space for generating meshgrid. Used in above situation
+        vectorized : bool, optional
+            Whether hess_func accepts np.ndarray(N, 3) points and returns
+            np.ndarray(N, 3, 3) hessians. If False, hess_func is called on one
+            point at a time. The gradian_func always needs to accept
+            np.ndarray(N, 3) points and return np.ndarray(N, 3) gradients.
         """
         if coors.ndim != 2:
             raise ValueError("Input array need to be (N, 3) shape.")
@@ -92,17 +102,57 @@ class Topo(object):
         self.v_f = value_func
         self.g_f = gradian_func
         self.h_f = hess_func
+        self._vectorized = vectorized
         # num of the maximum equals to num of atoms
         if points is None:
             points = self._default_cube(extra)
-        self._kdtree = KDTree(points)
-        self._found_ct = np.zeros((0, 3))
-        self._found_ct_type = np.zeros(0, dtype=int)
+        self._kdtree = cKDTree(points)
+        # found critical pts are stored in arrays with spare capacity, and
+        # indexed by a voxel hash with voxel size equal to the tolerance
+        self._ct_coords = np.zeros((16, 3))
+        self._ct_types = np.zeros(16, dtype=int)
+        self._nfound = 0
+        self._ct_voxels = {}
         self._crit_max = []
         self._crit_bond = []
         self._crit_ring = []
         self._crit_cage = []
 
+    @property
+    def _found_ct(self):
+        """np.ndarray(N, 3): coordinates of the found critical pts."""
+        return self._ct_coords[: self._nfound]
+
+    @property
+    def _found_ct_type(self):
+        """np.ndarray(N,): sum of sign of eigenvalues of the found critical pts."""
+        return self._ct_types[: self._nfound]
+
+    @classmethod
+    def from_molecule(cls, molecule, spin="ab", index=None, points=None, extra=5):
+        """Initialize Topo class instance for the electron density of a molecule.
+
+        Parameters
+        ----------
+        molecule : Molecule
+            An instance of `Molecule` class
+        spin : str, default to "ab"
+            The type of occupied spin orbitals used for computing the density
+        index : sequence, optional
+            Sequence of integers representing the index of spin orbitals
+        points : np.ndarray(M, 3), optional
+            An array of 3 dimension initial guess points
+        extra : int, optional
+            Extra space for generating meshgrid
+        """
+        value_func = partial(_compute_density, molecule, spin=spin, index=index)
+        gradient_func = partial(_compute_gradient, molecule, spin=spin, index=index)
+        hessian_func = partial(_compute_hessian, molecule, spin=spin, index=index)
+        return cls(
+            molecule.coordinates, value_func, gradient_func, hessian_func,
+            points=points, extra=extra, vectorized=True
+        )
+
     def _default_cube(self, extra=5):
         """Generate default cubic meshgrid for calculate critical pts.
 
@@ -124,7 +174,7 @@ class Topo(object):
         y = np.arange(min_xyz[1] - extra, max_xyz[1] + extra, 0.2)
         z = np.arange(min_xyz[2] - extra, max_xyz[2] + extra, 0.2)
         g = np.meshgrid(x, y, z)
-        return np.vstack(np.ravel(i) for i in g).T
+        return np.vstack([np.ravel(i) for i in g]).T
 
     def add_points(self, points):
         """Add a point to exiting initial guess points.
@@ -135,34 +185,26 @@ class Topo(object):
             a numpy 3d array
         """
         new_points = np.vstack((self._kdtree.data, points))
-        self._kdtree = KDTree(new_points)
+        self._kdtree = cKDTree(new_points)
 
-    def _root_find(self, init_guess):
-        """Use scipy root method to compute the root.
+    def get_gradient(self, points):
+        """Compute the gradient of given points.
 
         Parameters
         ----------
-        init_guess : np.ndarray(3,)
-            init guess point
+        points : np.ndarray(N, 3)
+            arbituary number of points
 
         Returns
         -------
-        OptimizeResult
-            property: .success return result of the computation
-                      .x       return the root
+        np.ndarray(N, 3)
+            1st order derivative of given points
         """
-        sol = root(
-            self.g_f,
-            x0=init_guess,
-            jac=self.h_f,
-            tol=1e-15,
-            method="hybr",
-            options={"maxfev": 1000},
-        )
-        return sol
+        g_list = self.g_f(points)
+        return g_list
 
-    def get_gradient(self, points):
-        """Compute the gradient of given points.
+    def get_hessian(self, points):
+        """Compute the hessian of given points.
 
         Parameters
         ----------
@@ -171,11 +213,15 @@ class Topo(object):
 
         Returns
         -------
-        np.ndarray(N, 3)
-            1st order derivative of given points
+        np.ndarray(N, 3, 3)
+            2nd order derivative of given points
         """
-        g_list = self.g_f(points)
-        return g_list
+        if self._vectorized:
+            return self.h_f(points)
+        hessians = np.zeros((len(points), 3, 3))
+        for index, point in enumerate(points):
+            hessians[index] = self.h_f(point)
+        return hessians
 
     @staticmethod
     def _construct_cage(point, length, n_points=4):
@@ -215,28 +261,368 @@ class Topo(object):
             )
         return np.vstack((p1, p2, p3, p4))
 
-    def find_critical_pts(self):
-        """Start the critical point finding main function."""
-        for init_point in self._kdtree.data:
-            length, _ = self._kdtree.query(init_point, 4)
-            tetrahedral = self._construct_cage(init_point, length[-1])
-            g_values = self.get_gradient(tetrahedral)
-            central_g = self.get_gradient(init_point)
-            # initial guess points
-            if np.all(np.linalg.norm(central_g) < np.linalg.norm(g_values, axis=-1)):
-                result = self._root_find(init_point)
-                # converge to critical pt
-                if result.success:
-                    point = result.x
-                    # if critical pt is maxima, skip.
-                    if self._is_coors_pt(point):
-                        continue
-                    ct_pt, ct_type = self._classify_critical_pt(point)
-                    if ct_type != 0 and self.check_not_same_pt(ct_pt, ct_type):
-                        self._add_critical_point(ct_pt, ct_type)
+    def find_critical_pts(self, block_size=10000, gtol=1e-12, max_step=0.5,
+                          maxiter=100, nprocs=1):
+        """Start the critical point finding main function.
+
+        All initial guess points are screened at once, keeping those with a
+        smaller gradient norm than the tetrahedral cage around them. The kept
+        points are refined simultaneously with damped Newton steps, and the
+        converged points are classified and added to the critical points.
+
+        With several processes, the initial guess points are split into
+        spatial domains (leaves of a k-d tree) which are solved in parallel,
+        and the critical points found in all domains are deduplicated. This
+        requires the callables to be available in the worker processes, i.e.
+        either the processes are forked or the callables can be pickled.
+
+        Parameters
+        ----------
+        block_size : int, default to 10000
+            number of initial guess points screened at a time
+        gtol : float, default to 1e-12
+            gradient norm below which a point is converged
+        max_step : float, default to 0.5
+            maximum length of a Newton step
+        maxiter : int, default to 100
+            maximum number of Newton iterations
+        nprocs : int, default to 1
+            number of processes used for solving the spatial domains
+        """
+        if not isinstance(block_size, int) or block_size <= 0:
+            raise ValueError(
+                "Argument block_size should be a positive integer. "
+                "Given block_size={}".format(block_size)
+            )
+        if not isinstance(nprocs, int) or nprocs <= 0:
+            raise ValueError(
+                "Argument nprocs should be a positive integer. "
+                "Given nprocs={}".format(nprocs)
+            )
+        seeds = self._kdtree.data
+        args = (block_size, gtol, max_step, maxiter)
+        if nprocs == 1:
+            results = [self._find_domain_critical_pts(seeds, *args)]
+        else:
+            # more domains than processes to balance the load
+            domains = self._split_domains(seeds, 4 * nprocs)
+            pool = Pool(nprocs, _init_topo_worker, (self,))
+            try:
+                results = pool.map(
+                    _find_domain_critical_pts_worker,
+                    [(seeds[domain],) + args for domain in domains],
+                )
+            finally:
+                pool.terminate()
+        for result in results:
+            for ct_pt, ct_type in result:
+                if ct_type != 0 and self.check_not_same_pt(ct_pt, ct_type):
+                    self._add_critical_point(ct_pt, ct_type)
         if self._satisfy_poincare_hopf() != 1:
             warnings.warn("Poincare Hopf value is not 1", RuntimeWarning)
 
+    def _find_domain_critical_pts(self, seeds, block_size=10000, gtol=1e-12,
+                                  max_step=0.5, maxiter=100):
+        """Find and classify the critical points starting from the given seeds.
+
+        Parameters
+        ----------
+        seeds : np.ndarray(N, 3)
+            initial guess points
+        block_size : int, default to 10000
+            number of initial guess points screened at a time
+        gtol : float, default to 1e-12
+            gradient norm below which a point is converged
+        max_step : float, default to 0.5
+            maximum length of a Newton step
+        maxiter : int, default to 100
+            maximum number of Newton iterations
+
+        Returns
+        -------
+        list of tuple(CriticalPoint, int)
+            CriticalPoint instance of each converged point (excluding atomic
+            positions) and the sum of sign of eigenvalues of the point
+        """
+        init_points = [np.zeros((0, 3))] + [
+            self._screen_seeds(seeds[i: i + block_size])
+            for i in range(0, len(seeds), block_size)
+        ]
+        points, success = self._newton_solve(
+            np.vstack(init_points), gtol, max_step, maxiter
+        )
+        return self._classify_roots(points[success])
+
+    def _classify_roots(self, points):
+        """Classify the converged points excluding atomic positions.
+
+        Parameters
+        ----------
+        points : np.ndarray(N, 3)
+            converged roots of the gradient
+
+        Returns
+        -------
+        list of tuple(CriticalPoint, int)
+            CriticalPoint instance of each point (excluding atomic positions)
+            and the sum of sign of eigenvalues of the point
+        """
+        # if critical pt is maxima, skip.
+        dist = np.linalg.norm(points[:, None] - self.coors[None], axis=-1)
+        points = points[np.all(dist >= 1e-3, axis=-1)]
+        return self._classify_critical_pts(points)
+
+    def find_critical_pts_adaptive(self, bond_cutoff=4.0, max_ring_size=8,
+                                   spacing=0.4, nrefine=3, gtol=1e-12,
+                                   max_step=0.5, maxiter=100):
+        """Find critical points starting from chemically informed seeds.
+
+        The seeds from `chemical_seeds` are refined with damped Newton steps
+        (without screening) and the converged points are classified. If the
+        critical points do not satisfy the Poincare-Hopf relation, seeds are
+        added on a local cubic stencil around the seeds of the previous round
+        which failed to converge (or around all of them, if all converged),
+        with the stencil spacing halved in every round. The initial guess
+        points are replaced by all seeds used.
+
+        Parameters
+        ----------
+        bond_cutoff : float, default to 4.0
+            maximum distance between bonded atoms
+        max_ring_size : int, default to 8
+            maximum number of atoms in a ring
+        spacing : float, default to 0.4
+            spacing of the stencil used in the first refinement round
+        nrefine : int, default to 3
+            maximum number of refinement rounds
+        gtol : float, default to 1e-12
+            gradient norm below which a point is converged
+        max_step : float, default to 0.5
+            maximum length of a Newton step
+        maxiter : int, default to 100
+            maximum number of Newton iterations
+        """
+        seeds = self.chemical_seeds(self.coors, bond_cutoff, max_ring_size)
+        used_seeds = [seeds]
+        for _ in range(nrefine + 1):
+            points, success = self._newton_solve(seeds, gtol, max_step, maxiter)
+            for ct_pt, ct_type in self._classify_roots(points[success]):
+                if ct_type != 0 and self.check_not_same_pt(ct_pt, ct_type):
+                    self._add_critical_point(ct_pt, ct_type)
+            if self._satisfy_poincare_hopf() == 1:
+                break
+            # refine around failed seeds, all seeds, or atoms (if there are no seeds)
+            centers = seeds[~success]
+            if len(centers) == 0:
+                centers = seeds if len(seeds) != 0 else self.coors
+            seeds = (centers[:, None] + spacing * _STENCIL_VECTORS).reshape(-1, 3)
+            used_seeds.append(seeds)
+            spacing /= 2.0
+        else:
+            warnings.warn("Poincare Hopf value is not 1", RuntimeWarning)
+        self._kdtree = cKDTree(np.vstack(used_seeds))
+
+    @staticmethod
+    def chemical_seeds(coors, bond_cutoff=4.0, max_ring_size=8):
+        """Generate initial guess points from the molecular graph.
+
+        Atoms closer than bond_cutoff are bonded. The seeds are the bond
+        midpoints (for bond critical points), the centroids of the smallest
+        rings containing each pair of bonds sharing an atom (for ring critical
+        points), and the centroids of the atoms of each three rings which
+        pairwise share a bond (for cage critical points).
+
+        Parameters
+        ----------
+        coors : np.ndarray(N, 3)
+            Cartesian coordinates of all atoms
+        bond_cutoff : float, default to 4.0
+            maximum distance between bonded atoms
+        max_ring_size : int, default to 8
+            maximum number of atoms in a ring
+
+        Returns
+        -------
+        np.ndarray(K, 3)
+            initial guess points
+        """
+        dist = np.linalg.norm(coors[:, None] - coors[None], axis=-1)
+        bonds = np.array(np.nonzero(np.triu(dist < bond_cutoff, k=1))).T
+        rings = _find_rings(bonds, len(coors), max_ring_size)
+        cages = []
+        for i, ring1 in enumerate(rings):
+            for j, ring2 in enumerate(rings[i + 1:], i + 1):
+                if len(ring1 & ring2) < 2:
+                    continue
+                for ring3 in rings[j + 1:]:
+                    if len(ring1 & ring3) >= 2 and len(ring2 & ring3) >= 2:
+                        cages.append(ring1 | ring2 | ring3)
+        seeds = [np.zeros((0, 3)), 0.5 * (coors[bonds[:, 0]] + coors[bonds[:, 1]])]
+        for group in rings + list(set(cages)):
+            seeds.append(np.mean(coors[sorted(group)], axis=0)[None])
+        return np.vstack(seeds)
+
+    @staticmethod
+    def _split_domains(points, ndomains):
+        """Split points into spatial domains by recursive bisection.
+
+        The domain with the most points is split at the median of the axis
+        with the largest spread, until there are ndomains domains (or no
+        domain can be split).
+
+        Parameters
+        ----------
+        points : np.ndarray(N, 3)
+            coordinates of points
+        ndomains : int
+            number of domains
+
+        Returns
+        -------
+        list of np.ndarray
+            indices of points in each domain
+        """
+        domains = [np.arange(len(points))]
+        while len(domains) < ndomains:
+            largest = int(np.argmax([len(domain) for domain in domains]))
+            domain = domains[largest]
+            if len(domain) < 2:
+                break
+            axis = np.argmax(np.ptp(points[domain], axis=0))
+            order = domain[np.argsort(points[domain, axis], kind="mergesort")]
+            domains[largest: largest + 1] = np.array_split(order, 2)
+        return domains
+
+    def _screen_seeds(self, seeds):
+        """Return seeds with smaller gradient norm than their encaging points.
+
+        Parameters
+        ----------
+        seeds : np.ndarray(N, 3)
+            initial guess points
+
+        Returns
+        -------
+        np.ndarray(M, 3)
+            initial guess points passing the screening
+        """
+        length, _ = self._kdtree.query(seeds, 4)
+        # 4.89898 = sqrt(24), see _construct_cage
+        cage = seeds[:, None] + 4.89898 * length[:, -1, None, None] * _CAGE_VECTORS
+        g_cage = self.get_gradient(cage.reshape(-1, 3)).reshape(-1, 4, 3)
+        g_seeds = self.get_gradient(seeds)
+        mask = np.all(
+            np.linalg.norm(g_seeds, axis=-1)[:, None]
+            < np.linalg.norm(g_cage, axis=-1),
+            axis=-1,
+        )
+        return seeds[mask]
+
+    def _newton_solve(self, points, gtol=1e-12, max_step=0.5, maxiter=100):
+        """Find roots of gradient with damped Newton steps on all points at once.
+
+        Each Newton step is computed from the eigen-decomposition of the
+        hessian (so singular hessians are handled), and restricted to a trust
+        radius. A step is accepted if it decreases the gradient norm, and the
+        trust radius of the point is doubled (up to max_step), otherwise it is
+        rejected and the trust radius is halved. Converged points are retired.
+
+        Parameters
+        ----------
+        points : np.ndarray(N, 3)
+            initial guess points
+        gtol : float, default to 1e-12
+            gradient norm below which a point is converged
+        max_step : float, default to 0.5
+            maximum length of a Newton step
+        maxiter : int, default to 100
+            maximum number of Newton iterations
+
+        Returns
+        -------
+        tuple(np.ndarray(N, 3), np.ndarray(N,))
+            final points and whether each point converged
+        """
+        points = np.array(points, dtype=float)
+        success = np.zeros(len(points), dtype=bool)
+        if len(points) == 0:
+            return points, success
+        grad = self.get_gradient(points)
+        gnorm = np.linalg.norm(grad, axis=-1)
+        radius = np.full(len(points), max_step)
+        active = np.arange(len(points))
+        for _ in range(maxiter):
+            # retire converged & stalled points
+            success[active[gnorm[active] < gtol]] = True
+            active = active[(gnorm[active] >= gtol) & (radius[active] > 1e-12)]
+            if len(active) == 0:
+                break
+            eigvals, eigvecs = np.linalg.eigh(self.get_hessian(points[active]))
+            eigvals = np.where(np.abs(eigvals) < 1e-12, 1e-12, eigvals)
+            coeffs = np.einsum("nij,ni->nj", eigvecs, grad[active]) / eigvals
+            step = -np.einsum("nij,nj->ni", eigvecs, coeffs)
+            norm = np.linalg.norm(step, axis=-1)
+            step *= np.minimum(1.0, radius[active] / norm)[:, None]
+            # accept steps decreasing the gradient norm
+            new_points = points[active] + step
+            new_grad = self.get_gradient(new_points)
+            new_gnorm = np.linalg.norm(new_grad, axis=-1)
+            accept = new_gnorm < gnorm[active]
+            index = active[accept]
+            points[index], grad[index] = new_points[accept], new_grad[accept]
+            gnorm[index] = new_gnorm[accept]
+            radius[index] = np.minimum(2 * radius[index], max_step)
+            radius[active[~accept]] *= 0.5
+            # points whose Newton step is negligible are converged
+            success[index[norm[accept] < 1e-12]] = True
+            radius[index[norm[accept] < 1e-12]] = 0.0
+        else:
+            success[active[gnorm[active] < gtol]] = True
+        return points, success
+
+    def trace_bond_paths(self, eps=1e-3, **kwargs):
+        """Trace the bond paths from bond critical pts to atoms.
+
+        From each bond critical pt, two gradient paths are traced at once
+        (for all bond critical pts) starting at a small displacement along the
+        +/- eigenvector of the positive eigenvalue of the hessian. The bond
+        path is made of the reversed first path, the bond critical pt, and
+        the second path.
+
+        Parameters
+        ----------
+        eps : float, default to 1e-3
+            displacement of the starting points from the bond critical pt
+        kwargs : dict
+            keyword arguments passed to `trace_gradient_paths`, e.g. step,
+            tol, attractor_radius and max_length
+
+        Returns
+        -------
+        tuple(GradientPaths, np.ndarray(N, 2))
+            bond path of each bond critical pt in self._crit_bond, and
+            indices of the atoms connected by each bond path (-1 if a path
+            does not end at an atom)
+        """
+        nbonds = len(self._crit_bond)
+        centers = np.array([pt.point for pt in self._crit_bond]).reshape(-1, 3)
+        # eigenvector of the positive eigenvalue (eigenvalues are in ascending order)
+        vectors = np.array([pt.eigenvectors[:, -1] for pt in self._crit_bond])
+        vectors = vectors.reshape(-1, 3)
+        starts = np.vstack((centers - eps * vectors, centers + eps * vectors))
+        halves, ends = trace_gradient_paths(
+            starts, self.get_gradient, attractors=self.coors, ascent=True, **kwargs
+        )
+        points = []
+        for index in range(nbonds):
+            points.extend(
+                [halves[index][::-1], centers[index: index + 1], halves[nbonds + index]]
+            )
+        sizes = [len(pts) for pts in points]
+        offsets = np.concatenate(([0], np.cumsum(np.sum(np.reshape(sizes, (-1, 3)), axis=1))))
+        points = np.vstack([np.zeros((0, 3))] + points)
+        return GradientPaths(points, offsets.astype(int)), ends.reshape(2, nbonds).T
+
     def _add_critical_point(self, ct_pt, ct_type):
         """Add criticla point to instance.
 
@@ -254,8 +640,15 @@ class Topo(object):
             1: self._crit_ring,
         }
         signature_dict[ct_type].append(ct_pt)
-        self._found_ct = np.vstack((self._found_ct, ct_pt.point))
-        self._found_ct_type = np.append(self._found_ct_type, int(ct_type))
+        # double the capacity of arrays when they are full
+        if self._nfound == len(self._ct_types):
+            self._ct_coords = np.vstack((self._ct_coords, np.zeros(self._ct_coords.shape)))
+            self._ct_types = np.append(self._ct_types, np.zeros(len(self._ct_types), int))
+        self._ct_coords[self._nfound] = ct_pt.point
+        self._ct_types[self._nfound] = int(ct_type)
+        voxel = tuple(np.floor(ct_pt.point / _CT_TOLERANCE).astype(int))
+        self._ct_voxels.setdefault(voxel, []).append(self._nfound)
+        self._nfound += 1
 
     def _is_coors_pt(self, pt, atom_eps=1e-3):
         """Bool: return if the point the same as atomic position."""
@@ -272,6 +665,34 @@ class Topo(object):
         )
         return pre_hopf + len(self.coors)
 
+    def _classify_critical_pts(self, points, eigen_cutoff=1e-4):
+        """Classify the type of given critical points.
+
+        Parameters
+        ----------
+        points : np.ndarray(N, 3)
+            Coordinates of given critical points
+        eigen_cutoff : float, default to 1e-4
+            The engenvalue cutoff incase too small value
+
+        Returns
+        -------
+        list of tuple(CriticalPoint, int)
+            CriticalPoint instance with all property of each crit pt
+            and the sum of sign of eigenvalues of given point
+        """
+        if len(points) == 0:
+            return []
+        eigenvals, eigenvecs = np.linalg.eigh(self.get_hessian(points))
+        signatures = np.sum(np.sign(eigenvals), axis=-1).astype(int)
+        signatures[np.max(np.abs(eigenvals), axis=-1) <= eigen_cutoff] = 0
+        return [
+            (CriticalPoint(point, vals, vecs), signature)
+            for point, vals, vecs, signature in zip(
+                points, eigenvals, eigenvecs, signatures
+            )
+        ]
+
     def _classify_critical_pt(self, point, eigen_cutoff=1e-4):
         """Classify the type of given critical point.
 
@@ -306,14 +727,127 @@ class Topo(object):
         """Bool: check given point is not already included in critical pts."""
         # return True if no existing critical pts.
         # else False
-        dis = np.linalg.norm(pts.point - self._found_ct, axis=-1)
-        pos = np.where(dis < 1e-3)[0]
+        # only critical pts in the same or adjacent voxels can be closer than
+        # the tolerance
+        voxel = np.floor(pts.point / _CT_TOLERANCE).astype(int)
+        pos = [
+            index
+            for offset in _STENCIL_OFFSETS
+            for index in self._ct_voxels.get(tuple(voxel + offset), [])
+        ]
         if len(pos) > 0:
-            if ct_type in self._found_ct_type[pos]:
+            dis = np.linalg.norm(pts.point - self._ct_coords[pos], axis=-1)
+            if ct_type in self._ct_types[pos][dis < _CT_TOLERANCE]:
                 return False
         return True
 
 
+def _compute_density(molecule, points, spin="ab", index=None):
+    """Compute electron density of molecule."""
+    return molecule.compute_density(points, spin, index)
+
+
+def _compute_gradient(molecule, points, spin="ab", index=None):
+    """Compute gradient of electron density of molecule."""
+    return molecule.compute_gradient(points, spin, index)
+
+
+def _compute_hessian(molecule, points, spin="ab", index=None):
+    """Compute hessian of electron density of molecule as (N, 3, 3) array."""
+    hessian = np.zeros((len(points), 3, 3))
+    # upper triangular elements, i.e. xx, xy, xz, yy, yz & zz
+    hessian[:, [0, 0, 0, 1, 1, 2], [0, 1, 2, 1, 2, 2]] = molecule.compute_hessian(
+        points, spin, index
+    )
+    hessian[:, [1, 2, 2], [0, 0, 1]] = hessian[:, [0, 0, 1], [1, 2, 2]]
+    return hessian
+
+
+def _find_rings(bonds, natoms, max_ring_size=8):
+    """Return the smallest ring containing each pair of bonds sharing an atom.
+
+    Parameters
+    ----------
+    bonds : np.ndarray(M, 2)
+        indices of bonded atoms
+    natoms : int
+        number of atoms
+    max_ring_size : int, default to 8
+        maximum number of atoms in a ring
+
+    Returns
+    -------
+    list of frozenset
+        indices of atoms in each ring
+    """
+    neighbors = [set() for _ in range(natoms)]
+    for i, j in bonds:
+        neighbors[i].add(j)
+        neighbors[j].add(i)
+    rings = []
+    for center in range(natoms):
+        for start in neighbors[center]:
+            for end in neighbors[center]:
+                if end <= start:
+                    continue
+                # breadth-first search of the shortest path from start to end avoiding center
+                parents, queue = {start: None, center: None}, [start]
+                for _ in range(max_ring_size - 2):
+                    if end in parents:
+                        break
+                    new_queue = []
+                    for atom in queue:
+                        for neighbor in neighbors[atom] - set(parents):
+                            parents[neighbor] = atom
+                            new_queue.append(neighbor)
+                    queue = new_queue
+                if end not in parents:
+                    continue
+                ring, atom = [center], end
+                while atom is not None:
+                    ring.append(atom)
+                    atom = parents[atom]
+                ring = frozenset(ring)
+                if ring not in rings:
+                    rings.append(ring)
+    return rings
+
+
+# Topo instance of worker processes used in parallel critical point search
+_TOPO_WORKER = {}
+
+
+def _init_topo_worker(topo):
+    """Store Topo instance in worker process."""
+    _TOPO_WORKER["topo"] = topo
+
+
+def _find_domain_critical_pts_worker(args):
+    """Find critical points of a spatial domain in worker process."""
+    return _TOPO_WORKER["topo"]._find_domain_critical_pts(*args)
+
+
+# unit vectors from center to corners of a regular tetrahedron, see _construct_cage
+_CAGE_VECTORS = np.array(
+    [
+        [0.942809, 0.0, -0.333333],
+        [-0.471405, 0.816497, -0.333333],
+        [-0.471405, -0.816497, -0.333333],
+        [0.0, 0.0, 1.0],
+    ]
+)
+# offsets of the cubic stencil of a voxel and its 26 neighbours
+_STENCIL_OFFSETS = np.array(
+    [[i, j, k] for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)]
+)
+# offsets of the 26 neighbours on a cubic stencil, used for refining seeds
+_STENCIL_VECTORS = np.array(
+    [offset for offset in _STENCIL_OFFSETS if np.any(offset != 0)], dtype=float
+)
+# distance below which critical pts of the same type are the same
+_CT_TOLERANCE = 1e-3
+
+
 """
 class TopologyInfo(object):
     __slots__ = [
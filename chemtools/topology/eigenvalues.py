@@ -27,7 +27,7 @@ import warnings
 import numpy as np
 
 
-__all__ = ["EigenValueTool"]
+__all__ = ["EigenValueTool", "compute_hessian_descriptors"]
 
 
 class EigenValueTool(object):
@@ -146,3 +146,95 @@ class EigenValueTool(object):
         if np.any(np.abs(self.eigenvalues) < self._eps):
             warnings.warn("Near catastrophic eigenvalue (close to zero) been found.")
         return np.hstack([self.rank[:, np.newaxis], self.signature[:, np.newaxis]])
+
+
+_DESCRIPTORS = ("ellipticity", "bond_descriptor", "eccentricity", "index", "rank", "signature")
+_COUNTS = ("index", "rank", "signature")
+
+
+def compute_hessian_descriptors(molecule, points, descriptors=None, spin="ab", index=None,
+                                eps=1e-15, block_size=10000):
+    r"""Compute eigenvalue-based descriptors of electron density hessian in one chunked pass.
+
+    The hessian is computed for one block of points at a time, its eigenvalues are
+    computed once, and the positive & negative masks of the eigenvalues are shared by all
+    requested descriptors. So, neither the (n, 3, 3) hessian nor the (n, 3) eigenvalues are
+    stored. The descriptors are the same as the corresponding properties of `EigenValueTool`.
+
+    Parameters
+    ----------
+    molecule : Molecule
+        An instance of `Molecule` class (or any object with a `compute_hessian` method
+        returning the (n, 6) upper triangular elements of the hessian).
+    points : np.ndarray, shape=(n, 3)
+        Cartesian coordinates of points.
+    descriptors : sequence of str, optional
+        Name of descriptors to compute, i.e. "ellipticity", "bond_descriptor",
+        "eccentricity", "index", "rank" & "signature". If None, all of them are computed.
+    spin : str, optional
+        The type of occupied spin orbitals.
+    index : sequence, optional
+        Sequence of integers representing the index of spin orbitals.
+    eps : float, optional
+        The error bound for being a zero eigenvalue.
+    block_size : int, optional
+        Number of points evaluated at once.
+
+    Returns
+    -------
+    dict
+        Dictionary of descriptor name to np.ndarray of shape (n,).
+
+    """
+    if descriptors is None:
+        descriptors = _DESCRIPTORS
+    for name in descriptors:
+        if name not in _DESCRIPTORS:
+            raise ValueError("Argument descriptors should be among {0}! "
+                             "Given {1}".format(_DESCRIPTORS, name))
+    if not (isinstance(block_size, int) and block_size > 0):
+        raise ValueError("Argument block_size should be a positive integer! "
+                         "block_size={0}".format(block_size))
+    npoint = len(points)
+    result = {}
+    for name in descriptors:
+        result[name] = np.empty(npoint, dtype=int if name in _COUNTS else float)
+    # buffers of hessian elements, only upper triangular elements are used by eigvalsh
+    hess = np.zeros((min(block_size, npoint), 6))
+    matrix = np.zeros((min(block_size, npoint), 3, 3))
+    for start in range(0, npoint, block_size):
+        stop = min(start + block_size, npoint)
+        block_hess, block_matrix = hess[:stop - start], matrix[:stop - start]
+        molecule.compute_hessian(points[start:stop], spin=spin, index=index, output=block_hess)
+        block_matrix[:, [0, 0, 0, 1, 1, 2], [0, 1, 2, 1, 2, 2]] = block_hess
+        # eigenvalues are sorted in ascending order
+        eigenvalues = np.linalg.eigvalsh(block_matrix, UPLO="U")
+        for name, value in _block_descriptors(eigenvalues, eps, descriptors).items():
+            result[name][start:stop] = value
+    return result
+
+
+def _block_descriptors(eigenvalues, eps, descriptors):
+    """Return dictionary of descriptors of a block of eigenvalues sorted in ascending order."""
+    pos_mask = eigenvalues > eps
+    neg_mask = eigenvalues < -eps
+    npos, nneg = np.sum(pos_mask, axis=1), np.sum(neg_mask, axis=1)
+    result = {}
+    for name in descriptors:
+        if name == "ellipticity":
+            result[name] = eigenvalues[:, 0] / eigenvalues[:, 1] - 1.
+        elif name == "bond_descriptor":
+            value = np.sum(eigenvalues * pos_mask, axis=1) / npos
+            value /= np.sum(eigenvalues * neg_mask, axis=1) / nneg
+            result[name] = value
+        elif name == "eccentricity":
+            ratio = eigenvalues[:, 2] / eigenvalues[:, 0]
+            ratio[ratio < 0.] = np.nan
+            result[name] = np.sqrt(ratio)
+        elif name == "index":
+            result[name] = nneg
+        elif name == "rank":
+            result[name] = npos + nneg
+        elif name == "signature":
+            result[name] = npos - nneg
+    return result
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Gradient Path Module."""
+
+
+import numpy as np
+
+from chemtools.topology.eigenvalues import EigenValueTool
+
+
+__all__ = ['GradientPaths', 'trace_gradient_paths']
+
+
+class GradientPaths(object):
+    """Polylines of gradient paths stored as one array of points and offsets of each path."""
+
+    def __init__(self, points, offsets):
+        r"""Initialize class.
+
+        Parameters
+        ----------
+        points : np.ndarray, shape=(K, 3)
+            Cartesian coordinates of the points of all paths, one path after another.
+        offsets : np.ndarray, shape=(N + 1,)
+            Index of the first point of each path in points, followed by K. The points of
+            path i are ``points[offsets[i]:offsets[i + 1]]``.
+
+        """
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError('Argument points should be a 2D array with 3 columns! '
+                             'Given {0}'.format(points.shape))
+        if offsets.ndim != 1 or offsets.size == 0 or offsets[0] != 0 or \
+                offsets[-1] != points.shape[0] or np.any(np.diff(offsets) < 0):
+            raise ValueError('Argument offsets should be an increasing 1D array starting with 0 '
+                             'and ending with the number of points!')
+        self._points = points
+        self._offsets = offsets
+
+    @property
+    def points(self):
+        """Cartesian coordinates of the points of all paths."""
+        return self._points
+
+    @property
+    def offsets(self):
+        """Index of the first point of each path, followed by the total number of points."""
+        return self._offsets
+
+    @property
+    def npaths(self):
+        """Number of paths."""
+        return self._offsets.size - 1
+
+    @property
+    def lengths(self):
+        """Length of each path, i.e. sum of the distances between its consecutive points."""
+        segments = np.linalg.norm(np.diff(self._points, axis=0), axis=1)
+        cumsum = np.concatenate(([0.], np.cumsum(segments)))
+        # sum of segments between the first & last point of each path (if any)
+        ends = np.maximum(self._offsets[1:] - 1, self._offsets[:-1])
+        return cumsum[ends] - cumsum[self._offsets[:-1]]
+
+    def __len__(self):
+        """Return number of paths."""
+        return self.npaths
+
+    def __getitem__(self, index):
+        """Return points of a path."""
+        if not -self.npaths <= index < self.npaths:
+            raise IndexError('Path index {0} is out of range!'.format(index))
+        index %= self.npaths
+        return self._points[self._offsets[index]:self._offsets[index + 1]]
+
+    def compute_ellipticity(self, hess_func):
+        r"""Compute ellipticity at the points of all paths.
+
+        Parameters
+        ----------
+        hess_func : callable
+            Function evaluating the hessian of the scalar field, which takes an array of
+            points with shape (N, 3) and returns an array with shape (N, 3, 3).
+
+        Returns
+        -------
+        ellipticity : np.ndarray, shape=(K,)
+            Ellipticity (see `EigenValueTool.ellipticity`) at the points of all paths.
+
+        """
+        eigenvalues = np.linalg.eigvalsh(hess_func(self._points))
+        return EigenValueTool(eigenvalues).ellipticity
+
+
+def trace_gradient_paths(starts, gradient_func, attractors=None, ascent=True, step=0.1,
+                         max_step=0.5, tol=1.e-5, attractor_radius=0.1, gtol=1.e-8,
+                         max_length=20., maxiter=1000):
+    r"""Trace gradient paths from the given starting points simultaneously.
+
+    The paths are parametrized by their arc length :math:`s`, i.e. the points follow
+    :math:`d\mathbf{r} / ds = \pm \nabla f / \lvert \nabla f \rvert`, which is integrated with
+    the Bogacki-Shampine 3(2) embedded Runge-Kutta method. The step size of each path is adapted
+    separately, so that the difference between the 3rd and 2nd order solutions is below tol. A
+    path ends when it gets within attractor_radius of an attractor (which is then appended as
+    the last point), when the gradient norm drops below gtol, or when it gets longer than
+    max_length.
+
+    Parameters
+    ----------
+    starts : np.ndarray, shape=(N, 3)
+        Cartesian coordinates of the starting points.
+    gradient_func : callable
+        Function evaluating the gradient of the scalar field, which takes an array of points
+        with shape (M, 3) and returns an array with shape (M, 3).
+    attractors : np.ndarray, shape=(A, 3), optional
+        Cartesian coordinates of the attractors at which the paths end, e.g. nuclei.
+    ascent : bool, optional
+        Whether to follow the gradient (ascent) or the negative gradient (descent).
+    step : float, optional
+        Initial step size.
+    max_step : float, optional
+        Maximum step size.
+    tol : float, optional
+        Tolerance of the local error of each step.
+    attractor_radius : float, optional
+        Distance to an attractor at which a path ends.
+    gtol : float, optional
+        Gradient norm at which a path ends.
+    max_length : float, optional
+        Maximum length of the paths.
+    maxiter : int, optional
+        Maximum number of (accepted or rejected) steps.
+
+    Returns
+    -------
+    paths : GradientPaths
+        The traced paths.
+    ends : np.ndarray, shape=(N,)
+        Index of the attractor at which each path ends, or -1 if it does not end at one.
+
+    """
+    if starts.ndim != 2 or starts.shape[1] != 3:
+        raise ValueError('Argument starts should be a 2D array with 3 columns! '
+                         'Given {0}'.format(starts.shape))
+    if attractors is None:
+        attractors = np.zeros((0, 3))
+    sign = 1. if ascent else -1.
+
+    def direction(points):
+        """Return unit vector along (negative) gradient & gradient norm."""
+        grad = gradient_func(points)
+        norm = np.linalg.norm(grad, axis=1)
+        return sign * grad / np.maximum(norm, 1.e-300)[:, np.newaxis], norm
+
+    npaths = starts.shape[0]
+    ends = -np.ones(npaths, dtype=int)
+    points = np.array(starts, dtype=float)
+    length = np.zeros(npaths)
+    steps = np.full(npaths, step, dtype=float)
+    # points of the paths stored as path index & coordinates
+    path_index, path_points = [np.arange(npaths)], [points.copy()]
+    active = np.arange(npaths)
+    for _ in range(maxiter):
+        # end paths close to attractors, with vanishing gradient, or too long
+        if attractors.size != 0 and active.size != 0:
+            dist = np.linalg.norm(points[active, np.newaxis] - attractors, axis=2)
+            closest = np.argmin(dist, axis=1)
+            done = dist[np.arange(active.size), closest] < attractor_radius
+            ends[active[done]] = closest[done]
+            path_index.append(active[done])
+            path_points.append(attractors[closest[done]])
+            active = active[~done]
+        if active.size == 0:
+            break
+        x, h = points[active], steps[active][:, np.newaxis]
+        k1, norm = direction(x)
+        stop = (norm < gtol) | (length[active] >= max_length)
+        active, x, h, k1 = active[~stop], x[~stop], h[~stop], k1[~stop]
+        if active.size == 0:
+            break
+        # Bogacki-Shampine 3(2) step
+        k2 = direction(x + 0.5 * h * k1)[0]
+        k3 = direction(x + 0.75 * h * k2)[0]
+        x3 = x + h * (2. / 9. * k1 + 1. / 3. * k2 + 4. / 9. * k3)
+        k4 = direction(x3)[0]
+        x2 = x + h * (7. / 24. * k1 + 0.25 * k2 + 1. / 3. * k3 + 0.125 * k4)
+        error = np.linalg.norm(x3 - x2, axis=1)
+        accept = error <= tol
+        points[active[accept]] = x3[accept]
+        length[active[accept]] += np.linalg.norm(x3[accept] - x[accept], axis=1)
+        path_index.append(active[accept])
+        path_points.append(x3[accept])
+        # adapt step sizes
+        factor = 0.9 * (tol / np.maximum(error, 1.e-300))**(1. / 3.)
+        steps[active] = np.minimum(h[:, 0] * np.clip(factor, 0.2, 2.), max_step)
+    # sort points by path (keeping the order of points within each path)
+    path_index = np.concatenate(path_index)
+    order = np.argsort(path_index, kind='mergesort')
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(path_index, minlength=npaths))))
+    return GradientPaths(np.vstack(path_points)[order], offsets), ends
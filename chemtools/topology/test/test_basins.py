@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.topology.basins module."""
+
+
+import numpy as np
+from numpy.testing import assert_raises, assert_equal, assert_allclose
+
+from chemtools.utils.cube import UniformGrid
+from chemtools.topology.basins import BasinPartition, AtomicBasinPartition
+
+
+def make_grid(coordinates, spacing=0.2, extension=4.0):
+    """Return cubic grid enclosing the given coordinates."""
+    origin = np.min(coordinates, axis=0) - extension
+    shape = np.array(np.ceil((np.ptp(coordinates, axis=0) + 2 * extension) / spacing), int) + 1
+    numbers = np.ones(len(coordinates), int)
+    return UniformGrid(numbers, numbers.astype(float), coordinates, origin,
+                       np.diag([spacing] * 3), shape)
+
+
+def gaussians(points, centers, alphas, coeffs):
+    """Return sum of normalized s-type gaussians evaluated on points."""
+    value = np.zeros(points.shape[0])
+    for center, alpha, coeff in zip(centers, alphas, coeffs):
+        dist = np.sum((points - center)**2, axis=1)
+        value += coeff * (alpha / np.pi)**1.5 * np.exp(-alpha * dist)
+    return value
+
+
+def test_basin_partition_two_gaussians():
+    centers = np.array([[-1.2, 0.1, 0.0], [1.3, 0.0, 0.2]])
+    grid = make_grid(centers)
+    value = gaussians(grid.points, centers, [2.0, 1.5], [1.0, 2.0])
+    part = BasinPartition(grid, value)
+    assert part.nbasins == 2
+    assert part.basins.shape == (grid.npoints,)
+    assert np.all(part.basins >= 0)
+    # attractors are sorted by their value
+    assert np.all(np.diff(part.attractors_value) <= 0.)
+    assert_allclose(part.attractors, centers[[1, 0]], atol=0.15)
+    # basin populations add up to the total integral
+    pops = part.integrate(value)
+    assert_allclose(np.sum(pops), grid.integrate(value), rtol=1.e-10)
+    assert_allclose(pops, [2.0, 1.0], atol=0.05)
+    assert_allclose(np.sum(part.compute_volumes()), np.sum(grid.weights('R0')), rtol=1.e-10)
+    # integrate several properties at once
+    data = np.array([value, 2 * value]).T
+    assert_allclose(part.integrate(data), np.array([pops, 2 * pops]).T, rtol=1.e-10)
+    # nearest atoms
+    index, dist = part.compute_nearest_atoms()
+    assert_equal(index, [1, 0])
+    assert np.all(dist < 0.15)
+
+
+def test_basin_partition_threshold_plateau():
+    centers = np.array([[0.0, 0.0, 0.0]])
+    grid = make_grid(centers, spacing=0.3, extension=3.0)
+    value = gaussians(grid.points, centers, [1.0], [1.0])
+    # flat top & zero background make plateaus which belong to one attractor
+    value[value > 0.15] = 0.15
+    value[value < 1.e-3] = 0.
+    part = BasinPartition(grid, value)
+    assert part.nbasins == 2
+    assert np.all(part.basins >= 0)
+    part = BasinPartition(grid, value, threshold=0.)
+    assert part.nbasins == 1
+    assert_equal(part.basins[value <= 0.], -1)
+    assert_equal(part.basins[value > 0.], 0)
+    assert_allclose(part.integrate(value), [grid.integrate(value)], rtol=1.e-10)
+
+
+def test_basin_partition_raises():
+    centers = np.array([[0.0, 0.0, 0.0]])
+    grid = make_grid(centers, spacing=0.5, extension=1.0)
+    value = gaussians(grid.points, centers, [1.0], [1.0])
+    assert_raises(ValueError, BasinPartition, grid.points, value)
+    assert_raises(ValueError, BasinPartition, grid, value[:-1])
+    part = BasinPartition(grid, value)
+    assert_raises(ValueError, part.integrate, value[:-1])
+
+
+def test_atomic_basin_partition_three_gaussians():
+    centers = np.array([[-1.2, 0.1, 0.0], [1.3, 0.0, 0.2], [0.1, 2.0, -0.1]])
+    grid = make_grid(centers)
+    dens = gaussians(grid.points, centers, [2.0, 1.5, 1.8], [1.0, 2.0, 1.5])
+    part = AtomicBasinPartition(grid, dens)
+    assert part.natoms == 3
+    assert_equal(part.coordinates, centers)
+    assert np.all(part.atoms >= 0)
+    assert_equal(part.atoms, part.basins_atom[part.basins])
+    # atomic populations add up to the total integral
+    pops = part.compute_populations()
+    assert_allclose(np.sum(pops), grid.integrate(dens), rtol=1.e-10)
+    assert_allclose(pops, [1.0, 2.0, 1.5], atol=0.1)
+    assert_allclose(part.compute_charges(), 1. - pops, rtol=1.e-10)
+    assert_allclose(part.compute_charges(np.array([2., 2., 2.])), 2. - pops, rtol=1.e-10)
+    # integrate several properties at once
+    data = np.array([dens, 2 * dens]).T
+    assert_allclose(part.integrate_atoms(data), np.array([pops, 2 * pops]).T, rtol=1.e-10)
+    # atomic volumes
+    volumes = part.compute_atomic_volumes()
+    assert_allclose(np.sum(volumes), np.sum(grid.weights('R0')), rtol=1.e-10)
+    volumes = part.compute_atomic_volumes(isovalue=1.e-3)
+    assert_allclose(np.sum(volumes), grid.integrate((dens > 1.e-3).astype(float)), rtol=1.e-10)
+    assert np.all(volumes > 0.)
+    # atoms without attractor have empty basins
+    coords = np.vstack([centers, [[10., 10., 10.]]])
+    part = AtomicBasinPartition(grid, dens, coords, threshold=1.e-6)
+    assert part.natoms == 4
+    assert_equal(part.atoms[dens <= 1.e-6], -1)
+    pops = part.compute_populations()
+    assert pops[3] == 0.
+    assert_allclose(np.sum(pops), grid.integrate(dens * (dens > 1.e-6)), rtol=1.e-10)
+
+
+def test_atomic_basin_partition_raises():
+    centers = np.array([[0.0, 0.0, 0.0]])
+    grid = make_grid(centers, spacing=0.5, extension=1.0)
+    dens = gaussians(grid.points, centers, [1.0], [1.0])
+    assert_raises(ValueError, AtomicBasinPartition, grid, dens, np.zeros((2, 2)))
+    assert_raises(ValueError, AtomicBasinPartition, grid, dens, np.zeros((0, 3)))
+    part = AtomicBasinPartition(grid, dens)
+    assert_raises(ValueError, part.integrate_atoms, dens[:-1])
+    assert_raises(ValueError, part.compute_charges, np.array([1., 1.]))
@@ -1,5 +1,6 @@
 """Test critical point finder."""
 
+import warnings
 from unittest import TestCase
 
 from chemtools.topology.critical_pts import Topo, CriticalPoint
@@ -33,6 +34,7 @@ class TestCriticalPoints(TestCase):
             for j in range(i + 1, 3):
                 hm[i][j] = (
                     4
+                    * alphas ** 2
                     * (coors[i] - centers[i])
                     * (coors[j] - centers[j])
                     * self.gauss_func(coors, centers, alphas)
@@ -178,3 +180,192 @@ class TestCriticalPoints(TestCase):
         assert len(tp_ins._crit_ring) == 1
         assert len(tp_ins._crit_max) == 0
         assert len(tp_ins._crit_cage) == 0
+
+    def test_find_critical_pts_vectorized(self):
+        """Test batched newton solver with vectorized hessian."""
+        atoms = np.array([[-2, -2, 0], [2, -2, 0], [0, 1, 0]])
+        fun_d, fun_d2 = self.gauss_sum_funcs(atoms, alf=1)
+        tp_ins = Topo(atoms, None, fun_d, fun_d2, extra=1, vectorized=True)
+        tp_ins.find_critical_pts(block_size=1000)
+        assert len(tp_ins._crit_bond) == 3
+        assert len(tp_ins._crit_ring) == 1
+        assert len(tp_ins._crit_max) == 0
+        assert len(tp_ins._crit_cage) == 0
+        assert_allclose(np.linalg.norm(fun_d(tp_ins._found_ct), axis=-1), 0, atol=1e-10)
+        # compare hessian of vectorized and non-vectorized instance
+        pts = np.random.rand(5, 3)
+        tp_ins2 = Topo(atoms, None, fun_d, lambda x: fun_d2(x[None])[0], pts)
+        assert_allclose(tp_ins.get_hessian(pts), tp_ins2.get_hessian(pts))
+        # batched newton solver from points close to the bond critical points
+        pts = np.array([tp_ins._crit_bond[0].point, tp_ins._crit_bond[1].point])
+        result, success = tp_ins2._newton_solve(pts + 0.05)
+        assert np.all(success)
+        assert_allclose(result, pts, atol=1e-8)
+        # check raises
+        self.assertRaises(ValueError, tp_ins.find_critical_pts, block_size=0)
+        self.assertRaises(ValueError, tp_ins.find_critical_pts, block_size=1.5)
+
+    def test_find_critical_pts_parallel(self):
+        """Test critical point search in parallel spatial domains."""
+        atoms = np.array([[-2, -2, 0], [2, -2, 0], [0, 1, 0]])
+
+        class GaussMolecule(object):
+            """Molecule with density given by sum of gaussians on atoms."""
+
+            coordinates = atoms
+
+            def compute_density(mol, points, spin="ab", index=None):
+                return sum(self.gauss_func(points, atom) for atom in atoms)
+
+            def compute_gradient(mol, points, spin="ab", index=None):
+                return sum(self.gauss_deriv(points, atom) for atom in atoms)
+
+            def compute_hessian(mol, points, spin="ab", index=None):
+                hess = np.array([
+                    sum(self.gauss_deriv2(point, atom) for atom in atoms)
+                    for point in points
+                ])
+                return hess[:, [0, 0, 0, 1, 1, 2], [0, 1, 2, 1, 2, 2]]
+
+        mol = GaussMolecule()
+        tp_ins = Topo.from_molecule(mol, extra=1)
+        pts = np.random.rand(4, 3)
+        hess = np.array([sum(self.gauss_deriv2(pt, atom) for atom in atoms) for pt in pts])
+        assert_allclose(tp_ins.get_hessian(pts), hess)
+        assert_allclose(tp_ins.v_f(pts), mol.compute_density(pts))
+        # serial search
+        tp_ins.find_critical_pts()
+        assert len(tp_ins._crit_bond) == 3
+        assert len(tp_ins._crit_ring) == 1
+        # parallel search gives the same critical points
+        tp_ins2 = Topo.from_molecule(mol, extra=1)
+        tp_ins2.find_critical_pts(nprocs=2)
+        assert len(tp_ins2._found_ct) == len(tp_ins._found_ct)
+        order1 = np.lexsort(np.round(tp_ins._found_ct, 6).T)
+        order2 = np.lexsort(np.round(tp_ins2._found_ct, 6).T)
+        assert_allclose(tp_ins2._found_ct[order2], tp_ins._found_ct[order1], atol=1e-8)
+        assert_allclose(tp_ins2._found_ct_type[order2], tp_ins._found_ct_type[order1])
+        # check raises
+        self.assertRaises(ValueError, tp_ins.find_critical_pts, nprocs=0)
+
+    def test_split_domains(self):
+        """Test splitting points into spatial domains."""
+        pts = np.random.rand(100, 3) * np.array([4.0, 2.0, 1.0])
+        domains = Topo._split_domains(pts, 5)
+        assert len(domains) == 5
+        assert_allclose(np.sort(np.concatenate(domains)), np.arange(100))
+        assert all(len(domain) in [12, 13, 25] for domain in domains)
+        # first split along x axis with the largest spread
+        assert np.max(pts[domains[0], 0]) <= np.min(pts[domains[-1], 0])
+        assert len(Topo._split_domains(pts[:1], 4)) == 1
+
+    def gauss_sum_funcs(self, atoms, alf=1.0):
+        """Generate vectorized gradient & hessian of sum of gaussians on atoms."""
+
+        def fun_d(coors):
+            return sum(self.gauss_deriv(coors, atom, alphas=alf) for atom in atoms)
+
+        def fun_d2(coors):
+            hess = np.zeros((len(coors), 3, 3))
+            for atom in atoms:
+                dist = coors - atom
+                hess += (
+                    4 * alf ** 2 * dist[:, :, None] * dist[:, None, :]
+                    - 2 * alf * np.eye(3)
+                ) * self.gauss_func(coors, atom, alphas=alf)[:, None, None]
+            return hess
+
+        return fun_d, fun_d2
+
+    def test_chemical_seeds(self):
+        """Test seeds generated from molecular graph."""
+        atoms = np.array([[-2, -2, 0], [2, -2, 0], [0, 1, 0]])
+        seeds = Topo.chemical_seeds(atoms, bond_cutoff=4.5)
+        # three bond midpoints & one ring centroid
+        ref = np.array([[0, -2, 0], [-1, -0.5, 0], [1, -0.5, 0], [0, -1, 0]])
+        assert_allclose(seeds, ref)
+        assert_allclose(Topo.chemical_seeds(atoms, bond_cutoff=3.0), np.zeros((0, 3)))
+        # tetrahedron: six bonds, four rings & one cage
+        atoms = np.array([[1, 1, 1], [1, -1, -1], [-1, 1, -1], [-1, -1, 1]]) * 0.9
+        seeds = Topo.chemical_seeds(atoms)
+        assert seeds.shape == (11, 3)
+        assert_allclose(seeds[-1], [0, 0, 0], atol=1e-10)
+        # six-membered ring is only found with large enough max_ring_size
+        atoms = np.array([[np.cos(t), np.sin(t), 0] for t in np.arange(6) * np.pi / 3])
+        assert Topo.chemical_seeds(2.6 * atoms).shape == (7, 3)
+        assert Topo.chemical_seeds(2.6 * atoms, max_ring_size=5).shape == (6, 3)
+
+    def test_find_critical_pts_adaptive(self):
+        """Test critical point search from chemical seeds with refinement."""
+        # tetrahedron
+        atoms = np.array([[1, 1, 1], [1, -1, -1], [-1, 1, -1], [-1, -1, 1]]) * 0.9
+        fun_d, fun_d2 = self.gauss_sum_funcs(atoms)
+        tp_ins = Topo(atoms, None, fun_d, fun_d2, np.zeros((4, 3)), vectorized=True)
+        tp_ins.find_critical_pts_adaptive()
+        assert len(tp_ins._crit_bond) == 6
+        assert len(tp_ins._crit_ring) == 4
+        assert len(tp_ins._crit_cage) == 1
+        assert len(tp_ins._crit_max) == 0
+        assert_allclose(tp_ins._crit_cage[0].point, [0, 0, 0], atol=1e-10)
+        # triangle without bonds in molecular graph needs refinement around atoms
+        atoms = np.array([[-2, -2, 0], [2, -2, 0], [0, 1, 0]])
+        fun_d, fun_d2 = self.gauss_sum_funcs(atoms)
+        tp_ins = Topo(atoms, None, fun_d, fun_d2, np.zeros((4, 3)), vectorized=True)
+        tp_ins.find_critical_pts_adaptive(bond_cutoff=1.0)
+        assert len(tp_ins._crit_bond) == 3
+        assert len(tp_ins._crit_ring) == 1
+        assert tp_ins._kdtree.data.shape[0] > 3 * 26
+        # no refinement gives warning
+        tp_ins = Topo(atoms, None, fun_d, fun_d2, np.zeros((4, 3)), vectorized=True)
+        with warnings.catch_warnings(record=True) as record:
+            warnings.simplefilter("always")
+            tp_ins.find_critical_pts_adaptive(bond_cutoff=1.0, nrefine=0)
+        assert len(record) == 1
+        assert len(tp_ins._found_ct) == 0
+
+    def test_check_not_same_pt_many(self):
+        """Test deduplication of many critical points against brute force."""
+        coors = np.array([[1, 1, 1], [-1, -1, -1]])
+        topo = Topo(coors, self.gauss_func, self.gauss_deriv, self.gauss_deriv2, np.zeros((4, 3)))
+        pts = np.random.rand(1000, 3) * 0.05
+        types = np.random.choice([-1, 1], 1000)
+        for pt, ct_type in zip(pts, types):
+            # brute force check
+            dis = np.linalg.norm(pt - topo._found_ct, axis=-1)
+            ref = ct_type not in topo._found_ct_type[dis < 1e-3]
+            assert topo.check_not_same_pt(CriticalPoint(pt, None, None), ct_type) == ref
+            if ref:
+                topo._add_critical_point(CriticalPoint(pt, None, None), ct_type)
+        assert len(topo._found_ct) == len(topo._crit_bond) + len(topo._crit_ring)
+        assert topo._found_ct.shape == (len(topo._found_ct_type), 3)
+        # points within tolerance across voxel boundaries
+        pt = np.array([10.0, 10.0, 10.0])
+        topo._add_critical_point(CriticalPoint(pt, None, None), -1)
+        for shift, ct_type, ref in [(0.9e-3, -1, False), (0.9e-3, 3, True), (1.1e-3, -1, True)]:
+            new_pt = CriticalPoint(pt + shift * np.array([1, 0, 0]), None, None)
+            assert topo.check_not_same_pt(new_pt, ct_type) == ref
+
+    def test_trace_bond_paths(self):
+        """Test bond paths of three atom ring."""
+        atoms = np.array([[-2, -2, 0], [2, -2, 0], [0, 1, 0]])
+        fun_d, fun_d2 = self.gauss_sum_funcs(atoms)
+        tp_ins = Topo(atoms, None, fun_d, fun_d2, np.zeros((4, 3)), vectorized=True)
+        tp_ins.find_critical_pts_adaptive(bond_cutoff=4.5)
+        paths, ends = tp_ins.trace_bond_paths()
+        assert paths.npaths == 3
+        assert_allclose(np.sort(ends, axis=1), [[0, 1], [0, 2], [1, 2]])
+        for path, (atom1, atom2), bond in zip(paths, ends, tp_ins._crit_bond):
+            assert_allclose(path[0], atoms[atom1])
+            assert_allclose(path[-1], atoms[atom2])
+            assert np.min(np.linalg.norm(path - bond.point, axis=1)) < 1e-10
+        # straight bond paths
+        assert_allclose(paths.lengths, np.linalg.norm(atoms[ends[:, 0]] - atoms[ends[:, 1]],
+                                                      axis=1), atol=1e-3)
+        # ellipticity along bond paths
+        ellipticity = paths.compute_ellipticity(tp_ins.get_hessian)
+        assert ellipticity.shape == (len(paths.points),)
+        # no bond critical points
+        tp_ins = Topo(atoms, None, fun_d, fun_d2, np.zeros((4, 3)), vectorized=True)
+        paths, ends = tp_ins.trace_bond_paths()
+        assert paths.npaths == 0
+        assert ends.shape == (0, 2)
@@ -27,7 +27,7 @@ import warnings
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_raises, assert_equal
 
-from chemtools.topology.eigenvalues import EigenValueTool
+from chemtools.topology.eigenvalues import EigenValueTool, compute_hessian_descriptors
 try:
     from importlib_resources import path
 except ImportError:
@@ -94,3 +94,40 @@ def test_ellipticity_h2o_nuclei():
         data = np.load(str(fname))
     result = EigenValueTool(data['nuc_hess_eigval']).ellipticity
     assert_almost_equal(result, data['nuc_ellipticity'], decimal=5)
+
+
+def test_compute_hessian_descriptors():
+    class HessMolecule(object):
+        """Molecule with hessian of density given by random symmetric matrices."""
+        def __init__(self, hessian):
+            self.hessian = hessian
+
+        def compute_hessian(self, points, spin="ab", index=None, output=None):
+            indices = np.round(points[:, 0]).astype(int)
+            output[:] = self.hessian[indices]
+            return output
+
+    np.random.seed(42)
+    hessian = np.random.uniform(-1., 1., (25, 6))
+    hessian[3] = [1., 0., 0., 2., 0., 3.]
+    points = np.zeros((25, 3))
+    points[:, 0] = np.arange(25)
+    matrix = np.zeros((25, 3, 3))
+    matrix[:, [0, 0, 0, 1, 1, 2], [0, 1, 2, 1, 2, 2]] = hessian
+    tool = EigenValueTool(np.linalg.eigvalsh(matrix, UPLO="U"))
+    result = compute_hessian_descriptors(HessMolecule(hessian), points, block_size=7)
+    assert_almost_equal(result["ellipticity"], tool.ellipticity, decimal=8)
+    assert_almost_equal(result["bond_descriptor"], tool.bond_descriptor, decimal=8)
+    assert_almost_equal(result["eccentricity"], tool.eccentricity, decimal=8)
+    assert_equal(result["index"], tool.index)
+    assert_equal(result["rank"], tool.rank)
+    assert_equal(result["signature"], tool.signature)
+    # compute some of the descriptors
+    result = compute_hessian_descriptors(HessMolecule(hessian), points, ["rank"])
+    assert_equal(sorted(result.keys()), ["rank"])
+    assert_equal(result["rank"], tool.rank)
+    # check raises
+    assert_raises(ValueError, compute_hessian_descriptors, HessMolecule(hessian), points,
+                  ["morse"])
+    assert_raises(ValueError, compute_hessian_descriptors, HessMolecule(hessian), points,
+                  None, block_size=0)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.topology.paths module."""
+
+
+import numpy as np
+from numpy.testing import assert_raises, assert_equal, assert_allclose
+
+from chemtools.topology.paths import GradientPaths, trace_gradient_paths
+
+
+def gaussian_gradient(points, center=np.zeros(3), alpha=1.0):
+    """Return gradient of an s-type gaussian evaluated on points."""
+    dist = points - center
+    return -2 * alpha * dist * np.exp(-alpha * np.sum(dist**2, axis=1))[:, None]
+
+
+def test_gradient_paths():
+    points = np.array([[0., 0., 0.], [1., 0., 0.], [1., 1., 0.], [5., 5., 5.], [0., 0., 0.],
+                       [0., 0., 2.]])
+    paths = GradientPaths(points, np.array([0, 3, 3, 4, 6]))
+    assert_equal(paths.npaths, 4)
+    assert_equal(len(paths), 4)
+    assert_allclose(paths.lengths, [2., 0., 0., 2.])
+    assert_allclose(paths[0], points[:3])
+    assert_equal(paths[1].shape, (0, 3))
+    assert_allclose(paths[-1], points[4:])
+    assert_equal(len(list(paths)), 4)
+
+    # ellipticity from hessian with eigenvalues -2, -1 & 1
+    def hess(pts):
+        return np.tile(np.diag([-1., 1., -2.]), (len(pts), 1, 1))
+
+    assert_allclose(paths.compute_ellipticity(hess), np.ones(6))
+    # check raises
+    assert_raises(IndexError, paths.__getitem__, 4)
+    assert_raises(ValueError, GradientPaths, points[:, :2], np.array([0, 6]))
+    assert_raises(ValueError, GradientPaths, points, np.array([1, 6]))
+    assert_raises(ValueError, GradientPaths, points, np.array([0, 5]))
+    assert_raises(ValueError, GradientPaths, points, np.array([0, 4, 3, 6]))
+
+
+def test_trace_gradient_paths_gaussian():
+    starts = np.array([[2., 0., 0.], [0., -1., 1.], [1., 1., 1.]])
+    attractors = np.array([[0., 0., 0.], [10., 10., 10.]])
+    # ascent paths are straight lines ending at the center of gaussian
+    paths, ends = trace_gradient_paths(starts, gaussian_gradient, attractors)
+    assert_equal(ends, [0, 0, 0])
+    assert_equal(paths.npaths, 3)
+    for path, start in zip(paths, starts):
+        assert_allclose(path[0], start)
+        assert_allclose(path[-1], [0., 0., 0.])
+        # points on the line from start to center
+        assert_allclose(np.cross(path, start), 0., atol=1.e-6)
+    assert_allclose(paths.lengths, np.linalg.norm(starts, axis=1), atol=1.e-6)
+    # descent paths end at max_length or when the gradient vanishes
+    paths, ends = trace_gradient_paths(starts, gaussian_gradient, attractors, ascent=False,
+                                       max_length=1.0)
+    assert_equal(ends, [-1, -1, -1])
+    assert np.all(paths.lengths >= 1.0)
+    assert np.all(paths.lengths < 1.5)
+    paths, ends = trace_gradient_paths(starts, gaussian_gradient, ascent=False, gtol=1.e-3)
+    norms = np.linalg.norm(gaussian_gradient(paths.points[paths.offsets[1:] - 1]), axis=1)
+    assert np.all(norms < 1.e-3)
+    # check raises
+    assert_raises(ValueError, trace_gradient_paths, starts[:, :2], gaussian_gradient)
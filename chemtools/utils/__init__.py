@@ -25,4 +25,6 @@
 
 from chemtools.utils.cube import *
 from chemtools.utils.utils import *
+from chemtools.utils.spline import *
+from chemtools.utils.cache import *
 from chemtools.utils.mesh import plane_mesh
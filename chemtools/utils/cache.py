@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Content-Addressed On-Disk Cache Module."""
+
+
+import os
+import hashlib
+import logging
+
+import numpy as np
+
+
+__all__ = ['DiskCache']
+
+
+class DiskCache(object):
+    """Content-addressed on-disk cache of arrays and files.
+
+    Each entry is stored in a file named by the SHA-1 hash of the content it depends on, so an
+    entry is reused only when all of its inputs are identical. Files are written to a temporary
+    name and then renamed, so concurrent processes never read an incomplete entry.
+
+    The total size of cache files is limited, and the least recently used files are removed
+    when it is exceeded. Failing to write a cache file (e.g. on a read-only or full disk) is
+    logged, and the computation continues without caching.
+    """
+
+    def __init__(self, directory=None, max_bytes=2**30):
+        """Initialize the cache.
+
+        Parameters
+        ----------
+        directory : str, optional
+            Directory of cache files. If None, the ``CHEMTOOLS_CACHE`` environment variable is
+            used, and if that is not set, ``~/.cache/chemtools``.
+        max_bytes : int, optional
+            Maximum total size of cache files in bytes. If None, the size is not limited.
+        """
+        if directory is None:
+            directory = os.environ.get('CHEMTOOLS_CACHE',
+                                       os.path.join(os.path.expanduser('~'), '.cache', 'chemtools'))
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError('Argument max_bytes cannot be negative! '
+                             'max_bytes={0}'.format(max_bytes))
+        self._directory = str(directory)
+        self._max_bytes = max_bytes
+
+    @property
+    def directory(self):
+        """Directory of cache files."""
+        return self._directory
+
+    @property
+    def max_bytes(self):
+        """Maximum total size of cache files in bytes."""
+        return self._max_bytes
+
+    @staticmethod
+    def key(*items):
+        """Return hash key of the given items.
+
+        Parameters
+        ----------
+        items : np.ndarray, str, number, None or sequence/dict of these
+            Content identifying the cache entry. Arrays are hashed by dtype, shape and data.
+        """
+        sha = hashlib.sha1()
+
+        def update(item):
+            if isinstance(item, np.ndarray):
+                sha.update(repr((item.dtype.str, item.shape)).encode('utf-8'))
+                sha.update(np.ascontiguousarray(item).tobytes())
+            elif isinstance(item, (list, tuple)):
+                sha.update(b'(')
+                for value in item:
+                    update(value)
+                sha.update(b')')
+            elif isinstance(item, dict):
+                update([(key, item[key]) for key in sorted(item.keys(), key=str)])
+            else:
+                sha.update(repr(item).encode('utf-8'))
+            sha.update(b',')
+
+        for item in items:
+            update(item)
+        return sha.hexdigest()
+
+    def path(self, key, ext='.npz'):
+        """Return path of the cache file of the given key & extension."""
+        return os.path.join(self._directory, key + ext)
+
+    def load(self, key):
+        """Return dictionary of arrays stored with the given key, or None if not cached.
+
+        Parameters
+        ----------
+        key : str
+            Hash key of cache entry, see `key`.
+        """
+        fname = self.path(key)
+        if not os.path.exists(fname):
+            return None
+        try:
+            with np.load(fname) as data:
+                arrays = dict([(name, data[name]) for name in data.files])
+            # mark as most recently used
+            os.utime(fname, None)
+        except (IOError, OSError, ValueError) as error:
+            # entry removed by another process, or not readable
+            logging.warning('Cache file {0} is not loaded: {1}'.format(fname, error))
+            return None
+        return arrays
+
+    def dump(self, key, **arrays):
+        """Store arrays with the given key.
+
+        Parameters
+        ----------
+        key : str
+            Hash key of cache entry, see `key`.
+        arrays : np.ndarray
+            Arrays stored by name.
+        """
+        def write(fname):
+            with open(fname, 'wb') as f:
+                np.savez(f, **arrays)
+        return self.dump_file(key, '.npz', write)
+
+    def dump_file(self, key, ext, write):
+        """Write cache file of the given key & extension, and return its path.
+
+        If the cache file cannot be written, a warning is logged and None is returned.
+
+        Parameters
+        ----------
+        key : str
+            Hash key of cache entry, see `key`.
+        ext : str
+            Extension of cache file.
+        write : callable
+            Function writing the content of cache file to the file name it is given.
+        """
+        fname = self.path(key, ext)
+        tmpname = '{0}.{1}.tmp'.format(fname, os.getpid())
+        try:
+            if not os.path.isdir(self._directory):
+                try:
+                    os.makedirs(self._directory)
+                except OSError:
+                    # directory made by another process
+                    if not os.path.isdir(self._directory):
+                        raise
+            write(tmpname)
+            os.rename(tmpname, fname)
+        except (IOError, OSError) as error:
+            logging.warning('Cache file {0} is not written: {1}'.format(fname, error))
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            return None
+        self._evict(fname)
+        return fname
+
+    def _evict(self, keep):
+        """Remove least recently used cache files until their total size is within the limit."""
+        if self._max_bytes is None:
+            return
+        try:
+            entries = []
+            for name in os.listdir(self._directory):
+                fname = os.path.join(self._directory, name)
+                if name.endswith('.tmp') or fname == keep or not os.path.isfile(fname):
+                    continue
+                stat = os.stat(fname)
+                entries.append((stat.st_mtime, stat.st_size, fname))
+            total = os.path.getsize(keep) + sum(entry[1] for entry in entries)
+            for _, size, fname in sorted(entries):
+                if total <= self._max_bytes:
+                    break
+                os.remove(fname)
+                total -= size
+        except OSError as error:
+            # files removed by another process
+            logging.warning('Cache directory {0} is not cleaned: {1}'.format(self._directory,
+                                                                            error))
@@ -23,6 +23,7 @@
 """The Cube Module."""
 
 
+import os
 import logging
 import numpy as np
 
@@ -71,24 +72,12 @@ class UniformGrid(object):
         if shape.shape[0] != 3:
             raise ValueError('Argument shape should be an np.ndarray with shape=(3,)')
         self._shape = shape
-        #
-        # Make cubic grid
-        #
         # Number of points along x, y and z axis
         npoints_x, npoints_y, npoints_z = self._shape
         # Total number of grid points
         self._npoints = npoints_x * npoints_y * npoints_z
-        # Make an array to store coordinates of grid points
-        self._points = np.zeros((self._npoints, 3))
-        coords = np.array(
-            np.meshgrid(np.arange(npoints_x), np.arange(npoints_y), np.arange(npoints_z))
-        )
-        coords = np.swapaxes(coords, 1, 2)
-        coords = coords.reshape(3, -1)
-        coords = coords.T
-        self._points = coords.dot(self._axes)
-        # Compute coordinates of grid points relative to the origin
-        self._points += self._origin
+        # coordinates of grid points are computed when first needed
+        self._points = None
 
         # log information
         self._log_init()
@@ -243,8 +232,33 @@ class UniformGrid(object):
     @property
     def points(self):
         """Cartesian coordinates of the cubic grid points."""
+        if self._points is None:
+            self._points = self._compute_points(0, self._npoints)
         return self._points
 
+    def iter_points(self, block_size=10000):
+        """Yield Cartesian coordinates of consecutive blocks of cubic grid points.
+
+        The points are generated block by block, so the coordinates of all grid points are
+        never stored. The blocks follow the order of `points` and the data of cube files.
+
+        Parameters
+        ----------
+        block_size : int, optional
+            Number of grid points in each block.
+        """
+        if not (isinstance(block_size, int) and block_size > 0):
+            raise ValueError('Argument block_size should be a positive integer! '
+                             'block_size={0}'.format(block_size))
+        for start in range(0, self._npoints, block_size):
+            yield self._compute_points(start, min(start + block_size, self._npoints))
+
+    def _compute_points(self, start, stop):
+        """Return Cartesian coordinates of grid points with flat index in [start, stop)."""
+        # x is the outer loop, y is the middle loop and z is the inner loop
+        index = np.array(np.unravel_index(np.arange(start, stop), tuple(self._shape))).T
+        return index.dot(self._axes) + self._origin
+
     def _log_init(self):
         """Log an overview of the cube's properties."""
         logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -262,16 +276,34 @@ class UniformGrid(object):
         ----------
         fname : str
             Cube file name with \*.cube extension.
-        data : np.ndarray, shape=(npoints,)
-            An array containing the evaluated scalar property on the grid points.
+        data : np.ndarray, shape=(npoints,) or iterable of np.ndarray
+            An array containing the evaluated scalar property on the grid points, or an
+            iterable of arrays containing the property on consecutive blocks of grid points
+            (e.g. the blocks of `iter_points`). The blocks are written as they are generated,
+            so the whole data is never stored.
         """
         if not fname.endswith('.cube'):
             raise ValueError('Argument fname should be a cube file with `*.cube` extension!')
-        if data.size != self._npoints:
-            raise ValueError('Argument data should have the same size as the grid. ' +
-                             '{0}!={1}'.format(data.size, self._npoints))
-
-        # Write data into the cube file
+        if isinstance(data, np.ndarray):
+            if data.size != self._npoints:
+                raise ValueError('Argument data should have the same size as the grid. ' +
+                                 '{0}!={1}'.format(data.size, self._npoints))
+            data = [data]
+
+        # Write data into a temporary file, which replaces the cube file once its size is checked
+        tmpname = '{0}.{1}.tmp'.format(fname, os.getpid())
+        try:
+            size = self._write_cube(tmpname, data)
+            if size != self._npoints:
+                raise ValueError('Argument data should have the same size as the grid. ' +
+                                 '{0}!={1}'.format(size, self._npoints))
+            os.rename(tmpname, fname)
+        finally:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+
+    def _write_cube(self, fname, data):
+        """Write the cube header & data blocks into the file, and return the number of values."""
         with open(fname, 'w') as f:
             # writing the cube header:
             f.write('Cubefile created with HORTON CHEMTOOLS\n')
@@ -284,12 +316,21 @@ class UniformGrid(object):
                 f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(i, x, y, z))
             for i, q, (x, y, z) in zip(self._numbers, self._pseudo_numbers, self._coordinates):
                 f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f} {4:11.6f}\n'.format(i, q, x, y, z))
-            # writing the cube data:
+            # writing the cube data, carrying values of incomplete rows over to the next block
             num_chunks = 6
-            for i in range(0, data.size, num_chunks):
-                row_data = data.flat[i:i+num_chunks]
-                f.write((row_data.size*' {:12.5E}').format(*row_data))
+            size, rest = 0, np.zeros(0)
+            for block in data:
+                size += np.size(block)
+                block = np.concatenate((rest, np.ravel(block)))
+                stop = block.size - block.size % num_chunks
+                for i in range(0, stop, num_chunks):
+                    f.write((num_chunks * ' {:12.5E}').format(*block[i:i + num_chunks]))
+                    f.write('\n')
+                rest = block[stop:]
+            if rest.size:
+                f.write((rest.size * ' {:12.5E}').format(*rest))
                 f.write('\n')
+        return size
 
     def weights(self, method='R'):
         """
@@ -402,3 +443,26 @@ class UniformGrid(object):
                     pseudo_numbers[i] = numbers[i]
 
         return numbers, pseudo_numbers, coordinates, origin, axes, shape
+
+    @staticmethod
+    def _read_cube_data(fname, npoints):
+        """
+        Return data of the given cube file.
+
+        Parameters
+        ----------
+        fname : str
+            Cube file name with *.cube extension.
+        npoints : int
+            Number of grid points.
+        """
+        with open(fname) as f:
+            # skip the title, second line and the grid specifications
+            for _ in range(2):
+                f.readline()
+            natom = abs(int(f.readline().split()[0]))
+            for _ in range(3 + natom):
+                f.readline()
+            data = np.array(f.read().split(), float)
+        # skip the orbital indices (if any) written before the data
+        return data[data.size - npoints:]
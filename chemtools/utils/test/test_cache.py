@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.utils.cache."""
+
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from numpy.testing import assert_equal, assert_raises
+
+from chemtools.utils.cache import DiskCache
+
+
+_ENVIRON = {}
+
+
+def setup_temporary_cache():
+    """Point the default cache to a temporary directory, keeping test files out of user's cache.
+
+    This is the `setup_module` of test modules caching pro-atom databases & atomic weights.
+    """
+    _ENVIRON["CHEMTOOLS_CACHE"] = os.environ.get("CHEMTOOLS_CACHE")
+    _ENVIRON["directory"] = tempfile.mkdtemp("chemtools.test.cache")
+    os.environ["CHEMTOOLS_CACHE"] = _ENVIRON["directory"]
+
+
+def teardown_temporary_cache():
+    """Restore the default cache & remove the temporary directory of `setup_temporary_cache`."""
+    if _ENVIRON["CHEMTOOLS_CACHE"] is None:
+        del os.environ["CHEMTOOLS_CACHE"]
+    else:
+        os.environ["CHEMTOOLS_CACHE"] = _ENVIRON["CHEMTOOLS_CACHE"]
+    shutil.rmtree(_ENVIRON["directory"])
+
+
+def test_disk_cache_key():
+    array = np.arange(6.)
+    key = DiskCache.key("weights", array, {"b": 1, "a": None})
+    assert_equal(key, DiskCache.key("weights", array.copy(), {"a": None, "b": 1}))
+    assert key != DiskCache.key("weights", array.reshape(2, 3), {"b": 1, "a": None})
+    assert key != DiskCache.key("weights", array.astype(np.float32), {"b": 1, "a": None})
+    assert key != DiskCache.key("weights", array + 1.e-12, {"b": 1, "a": None})
+    assert key != DiskCache.key("weights", array, {"b": 2, "a": None})
+    assert DiskCache.key(("a", "b"), "c") != DiskCache.key("a", ("b", "c"))
+
+
+def test_disk_cache_load_dump():
+    dn = tempfile.mkdtemp('chemtools.test.test_cache')
+    try:
+        cache = DiskCache(os.path.join(dn, 'cache'))
+        key = cache.key("test", np.arange(3))
+        assert cache.load(key) is None
+        fname = cache.dump(key, a=np.arange(3.), b=np.array(5))
+        assert_equal(fname, cache.path(key))
+        data = cache.load(key)
+        assert_equal(sorted(data.keys()), ["a", "b"])
+        assert_equal(data["a"], np.arange(3.))
+        assert_equal(data["b"][()], 5)
+        # file written by callable
+        fname = cache.dump_file(key, '.txt', lambda name: open(name, 'w').write('content'))
+        with open(fname) as f:
+            assert_equal(f.read(), 'content')
+        assert_equal(sorted(os.listdir(cache.directory)), [key + '.npz', key + '.txt'])
+    finally:
+        shutil.rmtree(dn)
+
+
+def test_disk_cache_write_failure():
+    dn = tempfile.mkdtemp('chemtools.test.test_cache')
+    try:
+        # cache directory cannot be made, because a file with the same name exists
+        fname = os.path.join(dn, 'cache')
+        open(fname, 'w').close()
+        cache = DiskCache(fname)
+        key = cache.key("test")
+        assert cache.dump(key, a=np.arange(3.)) is None
+        assert cache.load(key) is None
+        # failing writer leaves no temporary file behind
+        cache = DiskCache(os.path.join(dn, 'other'))
+
+        def write(name):
+            open(name, 'w').close()
+            raise IOError('disk is full')
+
+        assert cache.dump_file(key, '.txt', write) is None
+        assert_equal(os.listdir(cache.directory), [])
+    finally:
+        shutil.rmtree(dn)
+
+
+def test_disk_cache_eviction():
+    dn = tempfile.mkdtemp('chemtools.test.test_cache')
+    try:
+        assert_raises(ValueError, DiskCache, dn, -1)
+        # cache with room for two entries
+        cache = DiskCache(dn)
+        size = os.path.getsize(cache.dump(cache.key(0), a=np.arange(100.)))
+        os.remove(cache.path(cache.key(0)))
+        cache = DiskCache(dn, max_bytes=2 * size)
+        keys = [cache.key(index) for index in range(3)]
+        for index, key in enumerate(keys[:2]):
+            cache.dump(key, a=np.arange(100.))
+            os.utime(cache.path(key), (index, index))
+        # loading marks entry as most recently used, so the other one is evicted
+        assert cache.load(keys[0]) is not None
+        cache.dump(keys[2], a=np.arange(100.))
+        assert_equal(sorted(os.listdir(dn)), sorted([keys[0] + '.npz', keys[2] + '.npz']))
+        # entry larger than the limit is kept until the next entry is written
+        cache = DiskCache(dn, max_bytes=0)
+        cache.dump(keys[1], a=np.arange(100.))
+        assert_equal(os.listdir(dn), [keys[1] + '.npz'])
+    finally:
+        shutil.rmtree(dn)
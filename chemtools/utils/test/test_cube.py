@@ -23,6 +23,7 @@
 """Test chemtools.utils.cube."""
 
 
+import os
 import shutil
 import tempfile
 from contextlib import contextmanager
@@ -177,3 +178,28 @@ def test_uniformgrid_points_h2o():
                          [ 1.59848155e-01, -2.00000000e+00, -1.99360191e+00],
                          [ 1.59848155e-01, -4.99999997e-09, -1.99360191e+00]])
     assert_allclose(cube.points, expected, rtol=1.e-7, atol=1.e-7)
+
+
+def test_uniformgrid_iter_points_generate_cube_blocks():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as fpath:
+        cube = UniformGrid.from_file(fpath, spacing=0.5, extension=1.0, rotate=True)
+    # points generated block by block
+    blocks = list(cube.iter_points(block_size=7))
+    assert all([len(block) == 7 for block in blocks[:-1]])
+    assert_allclose(np.concatenate(blocks), cube.points, rtol=1.e-10, atol=1.e-10)
+    assert_raises(ValueError, list, cube.iter_points(block_size=0))
+    # cube file streamed from blocks of data matches cube file of data
+    data = np.exp(-np.linalg.norm(cube.points, axis=1))
+    with tmpdir('chemtools.test.test_cube.test_generate_cube_blocks') as dn:
+        fname1, fname2 = '%s/%s' % (dn, 'data.cube'), '%s/%s' % (dn, 'blocks.cube')
+        cube.generate_cube(fname1, data)
+        cube.generate_cube(fname2, (np.exp(-np.linalg.norm(points, axis=1))
+                                    for points in cube.iter_points(block_size=7)))
+        with open(fname1) as f1, open(fname2) as f2:
+            assert f1.read() == f2.read()
+        # streamed data of wrong size leaves existing cube file as is, and no other file behind
+        assert_raises(ValueError, cube.generate_cube, fname2, [data[:-1]])
+        assert_raises(ValueError, cube.generate_cube, fname2, [data, data[:1]])
+        with open(fname1) as f1, open(fname2) as f2:
+            assert f1.read() == f2.read()
+        assert sorted(os.listdir(dn)) == ['blocks.cube', 'data.cube']
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.utils.spline."""
+
+
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+from numpy.testing import assert_raises, assert_allclose
+
+from chemtools.utils.cube import UniformGrid
+from chemtools.utils.spline import UniformGridSpline
+from chemtools.topology.critical_pts import Topo
+
+
+@contextmanager
+def tmpdir(name):
+    """Create temporary directory that gets deleted after accessing it."""
+    dn = tempfile.mkdtemp(name)
+    try:
+        yield dn
+    finally:
+        shutil.rmtree(dn)
+
+
+def make_grid(coordinates, origin, axes, shape):
+    """Return cubic grid with hydrogen atoms at the given coordinates."""
+    numbers = np.ones(len(coordinates), int)
+    return UniformGrid(numbers, numbers.astype(float), coordinates, np.array(origin, float),
+                       np.array(axes, float), np.array(shape))
+
+
+def gaussians(points, centers, alpha):
+    """Return value, gradient & hessian of a sum of s-type gaussians evaluated on points."""
+    value, grad, hess = np.zeros(len(points)), np.zeros((len(points), 3)), 0.
+    for center in centers:
+        dist = points - center
+        func = np.exp(-alpha * np.sum(dist**2, axis=1))
+        value += func
+        grad += -2 * alpha * dist * func[:, None]
+        hess += (4 * alpha**2 * dist[:, :, None] * dist[:, None, :] -
+                 2 * alpha * np.eye(3)) * func[:, None, None]
+    return value, grad, hess
+
+
+def test_spline_gaussian_skewed_grid():
+    coords = np.array([[0.1, -0.2, 0.3]])
+    grid = make_grid(coords, [-4., -4., -4.], [[0.2, 0., 0.], [0.05, 0.2, 0.], [0., 0., 0.25]],
+                     [41, 40, 33])
+    spline = UniformGridSpline(grid, gaussians(grid.points, coords, 1.)[0])
+    assert spline.grid is grid
+    assert not spline.periodic
+    assert spline.coefficients.shape == (41, 40, 33)
+    # spline interpolates data on the grid points
+    assert_allclose(spline.compute_value(grid.points), gaussians(grid.points, coords, 1.)[0],
+                    atol=1.e-12)
+    # compare value, gradient & hessian with analytic ones
+    points = np.random.uniform(-2., 2., (200, 3))
+    value, grad, hess = gaussians(points, coords, 1.)
+    assert_allclose(spline.compute_value(points), value, atol=5.e-4)
+    assert_allclose(spline.compute_gradient(points), grad, atol=5.e-3)
+    assert_allclose(spline.compute_hessian(points), hess, atol=5.e-2)
+    # check block size
+    result = spline.compute_derivatives(points, block_size=7)
+    assert_allclose(result[0], spline.compute_value(points), rtol=1.e-12)
+    assert_allclose(result[1], spline.compute_gradient(points), rtol=1.e-12)
+    assert_allclose(result[2], spline.compute_hessian(points), rtol=1.e-12)
+
+
+def test_spline_periodic_memmap_cube():
+    coords = np.array([[0., 0., 0.]])
+    axes = np.diag([0.25, 0.3, 0.2])
+    grid = make_grid(coords, [0., 0., 0.], axes, [24, 20, 30])
+    # periodic function with the cell of the grid
+    recip = 2 * np.pi * np.linalg.inv(grid.shape[:, None] * axes).T
+    data = np.cos(np.dot(grid.points, recip[0])) + np.sin(np.dot(grid.points, recip[2]))
+    points = np.random.uniform(-5., 5., (100, 3))
+    expected = np.cos(np.dot(points, recip[0])) + np.sin(np.dot(points, recip[2]))
+    with tmpdir('chemtools_test_spline') as dn:
+        spline = UniformGridSpline(grid, data, periodic=True, mmap=dn + '/coeffs.npy')
+        assert spline.periodic
+        assert isinstance(spline.coefficients, np.memmap)
+        assert_allclose(spline.compute_value(points), expected, atol=1.e-4)
+        # translation by a lattice vector
+        assert_allclose(spline.compute_value(points + 24 * axes[0]),
+                        spline.compute_value(points), atol=1.e-12)
+        # spline from cube file
+        grid.generate_cube(dn + '/data.cube', data)
+        spline = UniformGridSpline.from_cube(dn + '/data.cube', periodic=True)
+        assert_allclose(spline.compute_value(points), expected, atol=1.e-4)
+
+
+def test_spline_critical_points():
+    coords = np.array([[0., 0., -1.], [0., 0., 1.]])
+    grid = make_grid(coords, [-3., -3., -4.], np.diag([0.15] * 3), [41, 41, 54])
+    spline = UniformGridSpline(grid, gaussians(grid.points, coords, 3.)[0])
+    # spline methods are used directly as Topo's callables
+    points = np.array(list(np.ndindex(5, 5, 7))) * 0.3 - np.array([0.6, 0.6, 0.9])
+    topo = Topo(coords, spline.compute_value, spline.compute_gradient, spline.compute_hessian,
+                points=points, vectorized=True)
+    topo.find_critical_pts()
+    assert len(topo._crit_bond) == 1
+    assert len(topo._crit_ring) == 0
+    assert len(topo._crit_cage) == 0
+    assert_allclose(topo._crit_bond[0].point, [0., 0., 0.], atol=1.e-2)
+
+
+def test_spline_raises():
+    coords = np.array([[0., 0., 0.]])
+    grid = make_grid(coords, [-1., -1., -1.], np.diag([0.5] * 3), [5, 5, 5])
+    data = gaussians(grid.points, coords, 1.)[0]
+    assert_raises(ValueError, UniformGridSpline, grid.points, data)
+    assert_raises(ValueError, UniformGridSpline, grid, data[:-1])
+    grid = make_grid(coords, [-1., -1., -1.], np.diag([0.5] * 3), [5, 1, 5])
+    assert_raises(ValueError, UniformGridSpline, grid, data[:25])
+    grid = make_grid(coords, [-1., -1., -1.], np.diag([0.5] * 3), [5, 5, 5])
+    spline = UniformGridSpline(grid, data)
+    assert_raises(ValueError, spline.compute_value, np.zeros((2, 2)))
+    assert_raises(ValueError, spline.compute_gradient, np.zeros(3))
+    assert_raises(ValueError, spline.compute_hessian, np.zeros((2, 3)), block_size=0)